@@ -0,0 +1,186 @@
+"""
+Vanta - Art Export
+Streaming PNG encoder and background export jobs
+"""
+import queue
+import struct
+import zlib
+from threading import Thread
+from typing import BinaryIO, Callable, Optional
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+IDAT_CHUNK_SIZE = 64 * 1024
+
+ProgressCallback = Callable[[float], None]
+DoneCallback = Callable[[bool], None]
+ErrorCallback = Callable[[Exception], None]
+
+
+class PNGWriter:
+    """
+    Incremental 8-bit RGBA PNG writer. Rows are fed top to bottom in
+    any number of calls, so the full image never has to be in memory.
+    """
+
+    def __init__(self, fileobj: BinaryIO, width: int, height: int, level: int = 6):
+        self.width = width
+        self.height = height
+        self.stride = width * 4
+        self.rows_written = 0
+        self._f = fileobj
+        self._z = zlib.compressobj(level)
+        self._pending = bytearray()
+
+        self._f.write(PNG_SIGNATURE)
+        # 8-bit depth, color type 6 (RGBA), deflate, adaptive filter, no interlace
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+
+    def _chunk(self, tag: bytes, data: bytes) -> None:
+        self._f.write(struct.pack('>I', len(data)))
+        self._f.write(tag)
+        self._f.write(data)
+        self._f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(tag)) & 0xffffffff))
+
+    def _flush_idat(self, final: bool = False) -> None:
+        while len(self._pending) >= IDAT_CHUNK_SIZE or (final and self._pending):
+            data = bytes(self._pending[:IDAT_CHUNK_SIZE])
+            del self._pending[:IDAT_CHUNK_SIZE]
+            self._chunk(b'IDAT', data)
+
+    def write_rows(self, pixels: bytes, rows: int, bottom_up: bool = False) -> None:
+        """Append `rows` rows of tightly packed RGBA pixels"""
+        stride = self.stride
+        order = range(rows - 1, -1, -1) if bottom_up else range(rows)
+        view = memoryview(pixels)
+        raw = b''.join(b'\x00' + view[r * stride:(r + 1) * stride] for r in order)
+        self._pending += self._z.compress(raw)
+        self.rows_written += rows
+        self._flush_idat()
+
+    def close(self) -> None:
+        if self.rows_written != self.height:
+            raise ValueError(f"Expected {self.height} rows, got {self.rows_written}")
+        self._pending += self._z.flush()
+        self._flush_idat(final=True)
+        self._chunk(b'IEND', b'')
+
+
+def encode_png(pixels: bytes, width: int, height: int, filename: str,
+               bottom_up: bool = True, band_rows: int = 64,
+               on_progress: Optional[ProgressCallback] = None) -> None:
+    """Encode a full RGBA buffer (GL readback is bottom-up) to a PNG file"""
+    stride = width * 4
+    with open(filename, 'wb') as f:
+        writer = PNGWriter(f, width, height)
+        for top in range(0, height, band_rows):
+            rows = min(band_rows, height - top)
+            if bottom_up:
+                # Image row `top` is the last GL row
+                start = (height - top - rows) * stride
+            else:
+                start = top * stride
+            writer.write_rows(pixels[start:start + rows * stride], rows, bottom_up)
+            if on_progress:
+                on_progress(writer.rows_written / height)
+        writer.close()
+
+
+def export_async(pixels: bytes, width: int, height: int, filename: str,
+                 on_progress: Optional[ProgressCallback] = None,
+                 on_done: Optional[DoneCallback] = None) -> Thread:
+    """
+    Encode already-captured pixels on a worker thread.
+    Callbacks run on the worker; marshal to the UI thread yourself.
+    """
+    def run():
+        try:
+            encode_png(pixels, width, height, filename, on_progress=on_progress)
+            ok = True
+        except Exception as e:
+            print(f"Export error: {e}")
+            ok = False
+        if on_done:
+            on_done(ok)
+
+    thread = Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+class TiledExportJob:
+    """
+    Receives rendered tiles (in band order, left to right) and writes
+    them as PNG rows on a worker thread. Only one band of pixels is
+    held at a time. Once `finished` is set no more tiles are taken;
+    `error` then says why, if the export failed.
+    """
+
+    def __init__(self, filename: str, width: int, height: int,
+                 on_progress: Optional[ProgressCallback] = None,
+                 on_done: Optional[DoneCallback] = None,
+                 on_error: Optional[ErrorCallback] = None):
+        self.filename = filename
+        self.width = width
+        self.height = height
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=4)
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put_tile(self, x: int, width: int, rows: int, pixels: bytes, last_in_band: bool) -> None:
+        """Queue a bottom-up RGBA tile covering columns [x, x + width)"""
+        if not self.finished:
+            self._queue.put((x, width, rows, pixels, last_in_band))
+
+    def accepting(self) -> bool:
+        """False while the encoder is behind; producers should wait a frame"""
+        return not self.finished and not self._queue.full()
+
+    def fail(self, error: Exception = None) -> None:
+        """Abort from the producer side (e.g. a tile failed to render)"""
+        if error is not None and self.error is None:
+            self.error = error
+        while not self.finished:
+            try:
+                self._queue.put(None, timeout=0.1)
+                return
+            except queue.Full:
+                pass  # encoder busy, or it just died: check again
+
+    def _run(self) -> None:
+        ok = False
+        try:
+            with open(self.filename, 'wb') as f:
+                writer = PNGWriter(f, self.width, self.height)
+                stride = self.width * 4
+                band = None
+                while writer.rows_written < self.height:
+                    item = self._queue.get()
+                    if item is None:
+                        raise self.error or RuntimeError("Tile rendering aborted")
+                    x, w, rows, pixels, last_in_band = item
+                    if band is None or len(band) != rows * stride:
+                        band = bytearray(rows * stride)
+                    tile_stride = w * 4
+                    for r in range(rows):
+                        band[r * stride + x * 4:r * stride + (x + w) * 4] = \
+                            pixels[r * tile_stride:(r + 1) * tile_stride]
+                    if last_in_band:
+                        writer.write_rows(band, rows, bottom_up=True)
+                        if self.on_progress:
+                            self.on_progress(writer.rows_written / self.height)
+                writer.close()
+            ok = True
+        except Exception as e:
+            print(f"Tiled export error: {e}")
+            self.error = e
+        # Producers stop on this instead of waiting for a queue that never drains
+        self.finished = True
+        if self.error is not None and self.on_error:
+            self.on_error(self.error)
+        if self.on_done:
+            self.on_done(ok)
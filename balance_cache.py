@@ -0,0 +1,150 @@
+"""
+Vanta - Balance Cache
+Block-aware wallet balances, refreshed on a background thread
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+CACHE_FILE = Path("balance_cache.json")
+
+
+@dataclass
+class BalanceEntry:
+    network: str
+    address: str
+    block: int
+    balance: float
+    nonce: int
+    symbol: str
+    updated_at: float
+
+
+class BalanceCache:
+    """
+    Last known balance per (network, address), tagged with the block it
+    was read at. Reads never touch the network; refresh() fetches on a
+    worker and only replaces an entry with one from a newer block, so a
+    lagging endpoint can't roll the displayed balance back. Entries are
+    persisted so the first screen after a restart has something to show.
+    """
+
+    def __init__(self, wallet_manager, cache_file: Path = CACHE_FILE):
+        self.wm = wallet_manager
+        self.cache_file = cache_file
+        # Refresh on new blocks only while someone is looking
+        self.live = False
+        self.min_refresh_interval = 4.0
+        self._last_block_refresh = 0.0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], BalanceEntry] = {}
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._listeners: List[Callable[[BalanceEntry], None]] = []
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vanta-balance")
+        self._load()
+
+    def add_listener(self, callback: Callable[[BalanceEntry], None]):
+        """Called on a worker thread whenever a newer balance arrives"""
+        self._listeners.append(callback)
+
+    def _notify(self, entry: BalanceEntry):
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                print(f"Listener error: {e}")
+
+    def get(self, network: str = None, address: str = None) -> Optional[BalanceEntry]:
+        """Cached entry for the current (or given) network and address; no RPC"""
+        key = (network or self.wm.current_network, address or self.wm.address)
+        with self._lock:
+            return self._entries.get(key)
+
+    def refresh(self, network: str = None) -> bool:
+        """Fetch in the background; False if a refresh is already running"""
+        key = (network or self.wm.current_network, self.wm.address)
+        if not key[1]:
+            return False
+        with self._lock:
+            if key in self._in_flight:
+                return False
+            self._in_flight.add(key)
+        self._executor.submit(self._fetch, key)
+        return True
+
+    def on_new_block(self, network: str, number: int) -> None:
+        """BlockWatcher listener: refresh the shown balance once it is behind"""
+        if not self.live or network != self.wm.current_network:
+            return
+        entry = self.get(network)
+        if entry is not None and entry.block >= number:
+            return
+        now = time.monotonic()
+        if now - self._last_block_refresh < self.min_refresh_interval:
+            return
+        self._last_block_refresh = now
+        self.refresh(network)
+
+    def _fetch(self, key: Tuple[str, str]) -> None:
+        network, address = key
+        try:
+            state = self.wm.get_account_state(network, address)
+        except Exception as e:
+            print(f"Balance error ({network}): {e}")
+            return
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+
+        if (state["network"], state["address"]) != key:
+            return  # never store one account's balance under another's key
+        entry = BalanceEntry(network, address, state["block"], state["balance"],
+                             state["nonce"], state["symbol"], time.time())
+        with self._lock:
+            current = self._entries.get(key)
+            if current and current.block > entry.block:
+                return  # answer from an endpoint behind the one we saw last
+            changed = (current is None or current.balance != entry.balance
+                       or current.nonce != entry.nonce)
+            self._entries[key] = entry
+        if changed:
+            self._save()
+            self._notify(entry)
+
+    # ---------- Persistence ----------
+
+    def _load(self) -> None:
+        if not self.cache_file.exists():
+            return
+        try:
+            for item in json.loads(self.cache_file.read_text(encoding="utf-8")):
+                entry = BalanceEntry(**item)
+                self._entries[(entry.network, entry.address)] = entry
+        except Exception as e:
+            print(f"⚠️ Balance cache load error: {e}")
+
+    def _save(self) -> None:
+        with self._lock:
+            data = [asdict(e) for e in self._entries.values()]
+        with self._save_lock:
+            try:
+                self.cache_file.write_text(json.dumps(data), encoding="utf-8")
+            except Exception as e:
+                print(f"⚠️ Balance cache save error: {e}")
+
+
+_balance_cache: Optional[BalanceCache] = None
+
+
+def get_balance_cache(wallet_manager) -> BalanceCache:
+    global _balance_cache
+    if _balance_cache is None:
+        _balance_cache = BalanceCache(wallet_manager)
+    return _balance_cache
@@ -0,0 +1,264 @@
+"""
+Vanta - Batch Signer
+Pre-signs many transactions or EIP-712 messages in a process pool and
+streams the signed payloads out in input order
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing.context import SpawnContext, SpawnProcess
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fee_oracle import get_fee_oracle
+from tx_manager import FEE_FIELDS
+from wallet_manager import NonceKey
+
+KIND_TX = "tx"
+KIND_TYPED = "typed"
+
+# Listing approvals, matching the fields /api/list receives
+LISTING_TYPES = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Listing": [
+        {"name": "seller", "type": "address"},
+        {"name": "tokenURI", "type": "string"},
+        {"name": "price", "type": "uint256"},
+        {"name": "nonce", "type": "uint256"},
+        {"name": "deadline", "type": "uint256"},
+    ],
+}
+
+
+@dataclass
+class SignedPayload:
+    """One signed item; `index` is its position in the input"""
+    index: int
+    kind: str
+    hash: str
+    signature: str = ""
+    raw_transaction: str = ""
+    nonce: Optional[int] = None
+    error: Optional[str] = None
+
+
+def listing_message(seller: str, token_uri: str, price_wei: int, nonce: int,
+                    chain_id: int, contract: str, deadline: int = None) -> Dict[str, Any]:
+    """EIP-712 listing approval for BatchSigner.sign_all"""
+    return {
+        "types": LISTING_TYPES,
+        "primaryType": "Listing",
+        "domain": {"name": "Vanta", "version": "1", "chainId": chain_id, "verifyingContract": contract},
+        "message": {
+            "seller": seller,
+            "tokenURI": token_uri,
+            "price": price_wei,
+            "nonce": nonce,
+            "deadline": deadline if deadline is not None else int(time.time()) + 30 * 24 * 3600,
+        },
+    }
+
+
+# ---------- Worker side (runs in pool processes) ----------
+
+_start_lock = threading.Lock()
+
+
+class _WorkerProcess(SpawnProcess):
+    """
+    Spawned without re-running the main script: a child only needs this
+    module, and the app's main.py would open a Kivy window in each one.
+    """
+
+    def start(self):
+        main = sys.modules.get("__main__")
+        if main is None:
+            return super().start()
+        # multiprocessing finds the script through these two
+        with _start_lock:
+            spec, path = getattr(main, "__spec__", None), main.__dict__.pop("__file__", None)
+            main.__spec__ = None
+            try:
+                super().start()
+            finally:
+                main.__spec__ = spec
+                if path is not None:
+                    main.__file__ = path
+
+
+class _WorkerContext(SpawnContext):
+    """
+    'spawn', never 'fork': forking the app mid-flight (block watcher,
+    executors, SQLite threads) can leave a child stuck on a lock some
+    other thread held at fork time
+    """
+    Process = _WorkerProcess
+
+
+_worker_key: Optional[bytes] = None
+
+
+def _init_worker(key: bytes) -> None:
+    global _worker_key
+    _worker_key = key
+
+
+def _sign_chunk(chunk: List[Tuple[int, str, Dict]], key: bytes = None) -> List[SignedPayload]:
+    from eth_account import Account
+    from eth_account.messages import encode_typed_data
+
+    key = key or _worker_key
+    results = []
+    for index, kind, item in chunk:
+        try:
+            if kind == KIND_TX:
+                signed = Account.sign_transaction(item, key)
+                results.append(SignedPayload(index, kind, signed.hash.hex(),
+                                             signature=_signature_hex(signed.v, signed.r, signed.s),
+                                             raw_transaction=signed.rawTransaction.hex(),
+                                             nonce=item.get("nonce")))
+            else:
+                signed = Account.sign_message(encode_typed_data(full_message=item), key)
+                results.append(SignedPayload(index, kind, signed.messageHash.hex(),
+                                             signature=signed.signature.hex(),
+                                             nonce=item["message"].get("nonce")))
+        except Exception as e:
+            results.append(SignedPayload(index, kind, "", error=str(e)))
+    return results
+
+
+def _signature_hex(v: int, r: int, s: int) -> str:
+    return "0x" + r.to_bytes(32, "big").hex() + s.to_bytes(32, "big").hex() + format(v, "02x")
+
+
+# ---------- Batch signer ----------
+
+class BatchSigner:
+    """
+    sign_all() takes tx dicts and/or full EIP-712 messages ({"types",
+    "primaryType", "domain", "message"}) and yields SignedPayloads in
+    input order as they are ready, signing `chunk_size` items per task
+    on `workers` processes. Nothing is broadcast.
+
+    Transactions without a nonce get the next ones: from `nonce_start`
+    when given (fully offline), else from the wallet's NonceManager, so
+    pre-signed transactions never collide with ones the app sends. Fee
+    fields missing from a tx come from one fee oracle lookup per batch.
+
+    Where processes aren't available (or workers=0) items are signed
+    inline on the calling thread.
+    """
+
+    def __init__(self, wallet_manager, workers: int = None, chunk_size: int = 32):
+        self.wm = wallet_manager
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self._pool: Optional[Executor] = None
+        self._pool_key: Optional[bytes] = None
+
+    def __enter__(self) -> "BatchSigner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the worker processes (they hold a copy of the key)"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pool_key = None
+
+    def sign_all(self, items: Iterable[Dict], nonce_start: int = None,
+                 speed: str = "standard") -> Iterator[SignedPayload]:
+        account = self.wm.account
+        if account is None:
+            raise RuntimeError("Wallet is locked")
+        key = bytes(account.key)
+        pool = self._get_pool(key)
+
+        next_nonce = itertools.count(nonce_start) if nonce_start is not None else None
+        defaults: Dict[str, Any] = {}
+        allocated: Dict[int, Tuple[int, NonceKey]] = {}
+
+        def prepare(index: int, item: Dict) -> Tuple[int, str, Dict]:
+            if "primaryType" in item:
+                return index, KIND_TYPED, item
+            tx = {k: v for k, v in item.items() if k != "from"}
+            tx.setdefault("chainId", self.wm.get_chain_id())
+            tx.setdefault("value", 0)
+            if not any(f in tx for f in FEE_FIELDS):
+                if not defaults:
+                    defaults.update(get_fee_oracle(self.wm).tx_fee_params(speed))
+                tx.update(defaults)
+            if "nonce" not in tx:
+                if next_nonce is not None:
+                    tx["nonce"] = next(next_nonce)
+                else:
+                    nonce_key, tx["nonce"] = self.wm.nonces.allocate()
+                    allocated[index] = (tx["nonce"], nonce_key)
+            return index, KIND_TX, tx
+
+        chunks = _chunked((prepare(i, item) for i, item in enumerate(items)), self.chunk_size)
+        try:
+            if pool is None:
+                for chunk in chunks:
+                    yield from self._settle(_sign_chunk(chunk, key), allocated)
+                return
+
+            # Bounded window: a huge (or endless) input isn't all queued at once
+            window: Deque[Future] = deque()
+            for chunk in chunks:
+                window.append(pool.submit(_sign_chunk, chunk))
+                if len(window) >= self.workers * 2:
+                    yield from self._settle(window.popleft().result(), allocated)
+            while window:
+                yield from self._settle(window.popleft().result(), allocated)
+        finally:
+            # Abandoned or failed mid-way: give back nonces never handed out
+            for nonce, nonce_key in sorted(allocated.values(), reverse=True):
+                self.wm.nonces.release(nonce, nonce_key)
+
+    def _settle(self, results: List[SignedPayload],
+                allocated: Dict[int, Tuple[int, NonceKey]]) -> Iterator[SignedPayload]:
+        for payload in results:
+            nonce = allocated.pop(payload.index, None)
+            if payload.error and nonce is not None:
+                self.wm.nonces.release(*nonce)
+            yield payload
+
+    def _get_pool(self, key: bytes) -> Optional[Executor]:
+        if self.workers <= 0:
+            return None
+        if self._pool is not None and self._pool_key != key:
+            self.close()  # the account changed since the pool started
+        if self._pool is None:
+            try:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=_WorkerContext(),
+                                                 initializer=_init_worker, initargs=(key,))
+                self._pool_key = key
+            except (ImportError, NotImplementedError, OSError) as e:
+                print(f"⚠️ No process pool ({e}): signing inline")
+                self.workers = 0
+                return None
+        return self._pool
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,53 @@
+"""
+Vanta - Batch Signing Benchmark
+Signatures/sec for pre-signing transactions and EIP-712 listing
+messages: one at a time through WalletManager.sign_transaction versus
+BatchSigner inline and on 1..N worker processes.
+
+Process workers only pay off with more than one core; the ECC backend
+(pure Python unless coincurve is installed) sets the per-core rate.
+
+Usage: python benchmarks/bench_batch_signer.py [count]
+"""
+import os
+import sys
+import time
+
+from common import scratch_dir
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    scratch_dir()
+
+    from batch_signer import BatchSigner, listing_message
+    from wallet_manager import wallet_manager
+
+    wallet_manager.import_private_key("0x" + "42" * 32)
+    txs = [{"to": "0x" + "22" * 20, "gas": 90000, "maxFeePerGas": 60 * 10 ** 9,
+            "maxPriorityFeePerGas": 30 * 10 ** 9, "data": "0x" + "ab" * 100} for _ in range(count)]
+    listings = [listing_message(wallet_manager.address, f"ipfs://bafy{i}", 10 ** 17, i, 137, "0x" + "33" * 20)
+                for i in range(count)]
+    cpus = os.cpu_count() or 1
+    print(f"{count} items per run, {cpus} CPU(s)")
+
+    started = time.perf_counter()
+    for nonce, tx in enumerate(txs):
+        wallet_manager.sign_transaction(dict(tx, nonce=nonce, chainId=137))
+    print(f"{'sign_transaction loop':<24} {count / (time.perf_counter() - started):8.0f} tx/s")
+
+    for workers in sorted({0, 1, cpus}):
+        label = "BatchSigner inline" if workers == 0 else f"BatchSigner {workers} proc"
+        with BatchSigner(wallet_manager, workers=workers) as signer:
+            list(signer.sign_all(txs[:8], nonce_start=0))  # start the workers
+            rates = []
+            for items in (txs, listings):
+                started = time.perf_counter()
+                signed = list(signer.sign_all(items, nonce_start=0))
+                assert not any(p.error for p in signed)
+                rates.append(len(signed) / (time.perf_counter() - started))
+        print(f"{label:<24} {rates[0]:8.0f} tx/s  {rates[1]:8.0f} EIP-712/s")
+
+
+if __name__ == "__main__":
+    main()
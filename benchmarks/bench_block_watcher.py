@@ -0,0 +1,67 @@
+"""
+Vanta - Block Watcher Benchmark
+New-head delivery delay and RPC load per source (websocket newHeads,
+eth_newBlockFilter, eth_blockNumber polling) against the local stub
+node, then a run where the websocket dies and the watcher falls back.
+
+Usage: python benchmarks/bench_block_watcher.py [seconds_per_mode] [block_time_ms]
+"""
+import sys
+import time
+
+from common import scratch_dir, use_rpc_stub
+from rpc_stub import RPCStub
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    block_time = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.5
+
+    stub = RPCStub(block_time=block_time, websocket=True).start()
+    use_rpc_stub(stub, websocket=True)
+    scratch_dir()
+
+    from block_watcher import (BlockWatcher, MODE_FILTER, MODE_POLL, MODE_WEBSOCKET)
+    from wallet_manager import wallet_manager
+
+    print(f"block time {block_time * 1000:.0f} ms, {seconds:.0f} s per source, poll interval 1 s")
+
+    def run(modes, label, during=None):
+        delays = []
+
+        def on_block(network, number):
+            mined = stub.mined_at.get(number)
+            if mined:
+                delays.append(time.perf_counter() - mined)
+
+        watcher = BlockWatcher(wallet_manager, poll_interval=1.0, ws_timeout=2.0)
+        watcher.modes = modes
+        watcher.add_listener(on_block)
+        first_block, stub.requests = stub.block_number, 0
+        watcher.start()
+        if during:
+            time.sleep(seconds / 2)
+            during()
+            time.sleep(seconds / 2)
+        else:
+            time.sleep(seconds)
+        mode = watcher.mode("polygon")
+        watcher.stop()
+        mined = stub.block_number - first_block
+        mean = sum(delays) / len(delays) * 1000 if delays else float("nan")
+        print(f"{label:<22} {mean:7.1f} ms delay  {len(delays):3d}/{mined:3d} blocks  "
+              f"{stub.requests / max(mined, 1):5.2f} HTTP req/block  (ended on {mode})")
+
+    run((MODE_WEBSOCKET,), "websocket newHeads")
+    run((MODE_FILTER,), "newBlockFilter")
+    run((MODE_POLL,), "blockNumber polling")
+
+    def kill_websocket():
+        stub.ws_server.shutdown()
+
+    run((MODE_WEBSOCKET, MODE_FILTER, MODE_POLL), "websocket dies midway", during=kill_websocket)
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
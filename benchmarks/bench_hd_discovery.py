@@ -0,0 +1,63 @@
+"""
+Vanta - HD Account Discovery Benchmark
+Gap-limit account discovery against the local stub node: deriving each
+index from the mnemonic and checking it with two calls, one at a time,
+versus WalletManager.discover_accounts (cached seed and parent node,
+worker-pool derivation, one batched request per window).
+
+Usage: python benchmarks/bench_hd_discovery.py [latency_ms] [used_indexes]
+"""
+import sys
+import time
+
+from common import scratch_dir, use_rpc_stub
+from rpc_stub import RPCStub
+
+MNEMONIC = "test test test test test test test test test test test junk"
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.05
+    used = [int(i) for i in sys.argv[2].split(",")] if len(sys.argv) > 2 else [0, 1, 2, 7]
+
+    stub = RPCStub(latency=latency).start()
+    use_rpc_stub(stub)
+    scratch_dir()
+
+    from wallet_manager import GAP_LIMIT, HDKeyring, _account_class, wallet_manager
+
+    Account = _account_class()
+    keyring = HDKeyring(MNEMONIC)
+    stub.accounts = {keyring.account(i).address.lower(): (10 ** 17, 1) for i in used}
+    w3 = wallet_manager.get_web3_for("polygon")
+    w3.eth.block_number  # open the connection before timing
+    print(f"RPC latency {latency * 1000:.0f} ms, used indexes {used}, gap limit {GAP_LIMIT}")
+
+    stub.requests = 0
+    started = time.perf_counter()
+    found, gap, index = [], 0, 0
+    while gap < GAP_LIMIT:
+        address = Account.from_mnemonic(MNEMONIC, account_path=f"m/44'/60'/0'/0/{index}").address
+        if w3.eth.get_transaction_count(address) or w3.eth.get_balance(address):
+            found.append(index)
+            gap = 0
+        else:
+            gap += 1
+        index += 1
+    print(f"one at a time      {time.perf_counter() - started:6.2f} s  {stub.requests:3d} HTTP requests  found {found}")
+
+    stub.requests = 0
+    started = time.perf_counter()
+    wallet_manager.import_mnemonic(MNEMONIC, discover=False)
+    found = wallet_manager.discover_accounts()
+    print(f"discover_accounts  {time.perf_counter() - started:6.2f} s  {stub.requests:3d} HTTP requests  found {found}")
+
+    started = time.perf_counter()
+    for index in used:
+        wallet_manager.switch_account(index)
+    print(f"switch_account     {(time.perf_counter() - started) / len(used) * 1000:6.2f} ms each")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
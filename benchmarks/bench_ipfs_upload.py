@@ -0,0 +1,76 @@
+"""
+Vanta - IPFS Upload Benchmark
+Time to get artworks pinned on a local pinning-service stand-in with
+per-request and per-connection (TLS) latency: image then metadata as
+two requests, one CAR bundle per artwork, and one CAR for the drop.
+
+Usage: python benchmarks/bench_ipfs_upload.py [latency_ms] [artworks]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+from common import scratch_dir
+from pin_stub import PinStub
+
+IMAGE_SIZE = 400_000
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.1
+    artworks = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    stub = PinStub(latency=latency, handshake=latency).start()
+    scratch_dir()
+
+    from ipfs_manager import IPFSManager
+    from storage_backends import NFTStorageBackend
+
+    def manager():
+        return IPFSManager(NFTStorageBackend("bench", url=stub.url))
+
+    def images(label):
+        paths = []
+        for i in range(artworks):
+            path = Path(f"{label}_{i}.png")
+            path.write_bytes(os.urandom(IMAGE_SIZE))  # fresh content: nothing is pinned yet
+            paths.append(str(path))
+        return paths
+
+    def two_requests(m, paths):
+        for path in paths:
+            metadata = m.create_metadata(path, "bench", m.upload_image(path))
+            assert m.upload_metadata(metadata)
+
+    def bundles(m, paths):
+        for path in paths:
+            assert m.upload_bundle(path, path, "bench")
+
+    def collection(m, paths):
+        arts = [{"image_path": p, "name": p, "description": "bench"} for p in paths]
+        assert m.upload_collection(arts)
+
+    print(f"{artworks} artworks of {IMAGE_SIZE // 1000} kB, {latency * 1000:.0f} ms latency "
+          f"+ {latency * 1000:.0f} ms per new connection")
+    print(f"{'approach':<14} {'requests':>8} {'conns':>6} {'total':>9} {'per artwork':>12}")
+    for label, run in (("two requests", two_requests), ("CAR each", bundles), ("CAR per drop", collection)):
+        m, paths = manager(), images(label.replace(" ", "_"))
+        stub.reset()
+        start = time.perf_counter()
+        run(m, paths)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<14} {stub.requests:8d} {stub.connections:6d} {elapsed:8.2f}s "
+              f"{elapsed / artworks * 1000:9.0f} ms")
+
+        stub.reset()
+        start = time.perf_counter()
+        run(m, paths)  # same content again: answered from the pin index
+        print(f"{'  repeat':<14} {stub.requests:8d} {stub.connections:6d} "
+              f"{time.perf_counter() - start:8.2f}s")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
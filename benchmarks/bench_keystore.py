@@ -0,0 +1,54 @@
+"""
+Vanta - Keystore Benchmark
+Unlock time (KDF + decrypt) and scrypt memory for every KDF profile,
+and the cost of signing from the unlocked session versus decrypting
+the keystore for each signature.
+
+Numbers scale with single-core speed: to estimate a low-end phone,
+multiply by the ratio of its single-core score to this machine's.
+
+Usage: python benchmarks/bench_keystore.py [rounds]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keystore import KDF_PROFILES, KeySession, SCRYPT_R, decrypt_secret, encrypt_secret
+from wallet_manager import _account_class
+
+TX = {"to": "0x" + "22" * 20, "value": 0, "gas": 21000, "gasPrice": 10 ** 9, "nonce": 0, "chainId": 137}
+
+
+def timed(fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    Account = _account_class()
+    account = Account.create()
+
+    print(f"{'profile':<10} {'kdf':<7} {'memory':>8} {'unlock':>10}")
+    keystores = {}
+    for name, settings in KDF_PROFILES.items():
+        keystore = keystores[name] = encrypt_secret(account.key, "password", name, address=account.address)
+        memory = f"{128 * SCRYPT_R * settings['n'] // 2 ** 20} MiB" if settings["kdf"] == "scrypt" else "-"
+        ms = timed(lambda: Account.from_key(decrypt_secret(keystore, "password")), rounds)
+        print(f"{name:<10} {settings['kdf']:<7} {memory:>8} {ms:8.0f} ms")
+
+    keystore = keystores["low"]
+    per_sign = timed(lambda: Account.from_key(decrypt_secret(keystore, "password")).sign_transaction(TX), rounds)
+    session = KeySession()
+    session.open(Account.from_key(decrypt_secret(keystore, "password")))
+    cached = timed(lambda: session.get().sign_transaction(TX), rounds * 10)
+    print(f"\nsign, decrypting each time ('low')  {per_sign:8.1f} ms")
+    print(f"sign from the unlocked session      {cached:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
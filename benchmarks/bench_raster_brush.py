@@ -0,0 +1,54 @@
+"""
+Vanta - Raster Brush Benchmark
+Headless rendering throughput in strokes/sec for typical canvas sizes.
+
+Usage: python benchmarks/bench_raster_brush.py [strokes]
+"""
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from raster_brush import RasterBrush
+from stroke_log import Stroke
+
+CANVASES = [(512, 512), (1024, 768), (2048, 1536)]
+POINTS_PER_STROKE = 120
+
+
+def synthetic_strokes(size, count, seed=7):
+    rng = random.Random(seed)
+    strokes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, size[0]), rng.uniform(0, size[1])
+        heading = rng.uniform(0, 2 * math.pi)
+        pts = []
+        for _ in range(POINTS_PER_STROKE):
+            heading += rng.uniform(-0.3, 0.3)
+            x += 3 * math.cos(heading)
+            y += 3 * math.sin(heading)
+            pts += [x, y]
+        color = (rng.random(), rng.random(), rng.random(), 1.0)
+        strokes.append(Stroke.create(color, 4, pts))
+    return strokes
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{count} strokes x {POINTS_PER_STROKE} points, width 4")
+    for size in CANVASES:
+        strokes = synthetic_strokes(size, count)
+        for antialias in (False, True):
+            brush = RasterBrush(size, antialias=antialias)
+            t0 = time.perf_counter()
+            brush.draw_all(strokes)
+            elapsed = time.perf_counter() - t0
+            label = "aa" if antialias else "hard"
+            print(f"{size[0]:>5}x{size[1]:<5} {label:<5} {count / elapsed:8.0f} strokes/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Vanta - Receipt Tracking Benchmark
+RPC load while N transactions wait for receipts against the local stub
+node: one wait_for_transaction_receipt poller per hash versus the shared
+ReceiptTracker driven by new-head notifications.
+
+Usage: python benchmarks/bench_receipts.py [block_time_ms] [blocks]
+"""
+import sys
+import threading
+import time
+
+from common import scratch_dir, use_rpc_stub
+from rpc_stub import RPCStub
+
+
+def main():
+    block_time = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.5
+    blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    stub = RPCStub().start()
+    use_rpc_stub(stub)
+    scratch_dir()
+
+    from receipt_tracker import ReceiptTracker
+    from wallet_manager import wallet_manager
+
+    wallet_manager.set_network("polygon")
+    w3 = wallet_manager.get_web3_for("polygon")
+    print(f"block time {block_time * 1000:.0f} ms, pending hashes mined evenly over {blocks} blocks")
+    print(f"{'pending':>7}  {'approach':<12} {'HTTP req/block':>14} {'RPC calls/block':>15} {'delay':>9}")
+
+    runs = iter(range(1, 1000))
+
+    def run(pending, label, wait, on_block=None):
+        first = next(runs) * 10 ** 6
+        hashes = ["0x%064x" % (first + i) for i in range(pending)]
+        per_block = -(-pending // blocks)
+        queue = [hashes[i:i + per_block] for i in range(0, pending, per_block)]
+        mined_at, resolved_at = {}, {}
+
+        def waiter(tx_hash):
+            wait(tx_hash)
+            resolved_at[tx_hash] = time.perf_counter()
+
+        threads = [threading.Thread(target=waiter, args=(h,), daemon=True) for h in hashes]
+        stub.requests, stub.methods = 0, {}
+        for thread in threads:
+            thread.start()
+        mined = 0
+        while len(resolved_at) < pending and mined < blocks * 4:
+            time.sleep(block_time)
+            batch = queue.pop(0) if queue else []
+            number = stub.mine(batch)
+            for h in batch:
+                mined_at[h] = stub.mined_at[number]
+            if on_block:
+                on_block("polygon", number)
+            mined += 1
+        for thread in threads:
+            thread.join(timeout=5)
+        calls = sum(stub.methods.values())
+        delays = [resolved_at[h] - mined_at[h] for h in resolved_at if h in mined_at]
+        mean = sum(delays) / len(delays) * 1000 if delays else float("nan")
+        print(f"{pending:7d}  {label:<12} {stub.requests / mined:14.1f} {calls / mined:15.1f} {mean:7.0f} ms"
+              + ("" if len(resolved_at) == pending else f"  ({pending - len(resolved_at)} unresolved)"))
+
+    for pending in (1, 10, 50):
+        run(pending, "per-hash", lambda h: w3.eth.wait_for_transaction_receipt(h, timeout=60))
+        tracker = ReceiptTracker(wallet_manager)
+        run(pending, "tracker", lambda h: tracker.track(h, "polygon").result(timeout=60),
+            tracker.on_new_block)
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
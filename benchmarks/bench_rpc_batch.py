@@ -0,0 +1,65 @@
+"""
+Vanta - RPC Batch Benchmark
+Full wallet refresh (balance, nonce, block on every network) as
+separate calls vs. one batch request per network in parallel.
+
+Usage: python benchmarks/bench_rpc_batch.py [networks] [latency_ms]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from web3 import Web3
+
+from rpc import RoutedHTTPProvider
+from rpc_stub import RPCStub
+
+ADDRESS = "0x" + "11" * 20
+ROUNDS = 10
+
+
+def main():
+    networks = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 30.0 / 1000
+    stubs = [RPCStub(latency=latency).start() for _ in range(networks)]
+    # Long probe interval: only measure refresh traffic
+    providers = [Web3(RoutedHTTPProvider([s.url], probe_interval=3600)) for s in stubs]
+
+    def per_call():
+        for w3 in providers:
+            w3.eth.get_balance(ADDRESS)
+            w3.eth.get_transaction_count(ADDRESS, "pending")
+            w3.eth.block_number
+
+    def batched():
+        def fetch(w3):
+            return w3.provider.batch([
+                ("eth_getBalance", [ADDRESS, "latest"]),
+                ("eth_getTransactionCount", [ADDRESS, "pending"]),
+                ("eth_blockNumber", []),
+            ])
+        with ThreadPoolExecutor(max_workers=networks) as pool:
+            list(pool.map(fetch, providers))
+
+    batched()  # warm connections and probes
+    print(f"{networks} networks, stub latency {latency * 1000:.0f} ms, {ROUNDS} refreshes")
+    for label, fn in (("separate calls", per_call), ("batched per network", batched)):
+        for s in stubs:
+            s.requests = 0
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            fn()
+        elapsed = (time.perf_counter() - start) / ROUNDS * 1000
+        requests = sum(s.requests for s in stubs) / ROUNDS
+        print(f"{label:<22} {elapsed:8.1f} ms/refresh  {requests:5.1f} HTTP requests")
+
+    for s in stubs:
+        s.stop()
+
+
+if __name__ == "__main__":
+    main()
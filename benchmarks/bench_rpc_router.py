@@ -0,0 +1,70 @@
+"""
+Vanta - RPC Router Benchmark
+Routes get_balance calls across local JSON-RPC stubs with different
+latencies and error rates, then takes the fastest one down mid-run to
+show failover. Compares against always using the first endpoint.
+
+Usage: python benchmarks/bench_rpc_router.py [calls]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from web3 import Web3
+
+from rpc import PooledHTTPProvider, RoutedHTTPProvider
+from rpc_stub import RPCStub
+
+ADDRESS = "0x" + "11" * 20
+
+
+def run(w3: Web3, calls: int):
+    """(ms per call, failed calls)"""
+    failed = 0
+    start = time.perf_counter()
+    for _ in range(calls):
+        try:
+            w3.eth.get_balance(ADDRESS)
+        except Exception:
+            failed += 1
+    return (time.perf_counter() - start) / calls * 1000, failed
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    stubs = [
+        RPCStub(latency=0.040, error_rate=0.2).start(),  # configured primary: slow and flaky
+        RPCStub(latency=0.015).start(),
+        RPCStub(latency=0.005).start(),
+    ]
+    urls = [s.url for s in stubs]
+    for s, label in zip(stubs, ("40 ms, 20% errors", "15 ms", "5 ms")):
+        print(f"  {s.url}  {label}")
+
+    primary = Web3(PooledHTTPProvider(urls[0]))
+    ms, failed = run(primary, calls)
+    print(f"primary only       {ms:7.2f} ms/call  {failed:4d} failed")
+
+    routed_provider = RoutedHTTPProvider(urls, probe_interval=1.0)
+    routed = Web3(routed_provider)
+    ms, failed = run(routed, calls)
+    print(f"routed             {ms:7.2f} ms/call  {failed:4d} failed")
+
+    # Fastest endpoint goes down: calls fail over, it gets benched
+    stubs[2].stop()
+    ms, failed = run(routed, calls)
+    print(f"routed, 5 ms down  {ms:7.2f} ms/call  {failed:4d} failed")
+
+    for s in routed_provider.router.stats():
+        print(f"  {s['url']}  {s['latency_ms']:6.1f} ms  err {s['error_rate']:.2f}  "
+              f"{'healthy' if s['healthy'] else 'benched'}")
+
+    for s in stubs[:2]:
+        s.stop()
+
+
+if __name__ == "__main__":
+    main()
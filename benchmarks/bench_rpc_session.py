@@ -0,0 +1,84 @@
+"""
+Vanta - RPC Session Benchmark
+Repeated get_balance latency against a local JSON-RPC stub: a provider
+rebuilt per network switch and per worker thread (old WalletManager
+behaviour) vs. persistent providers on one pooled session.
+
+Usage: python benchmarks/bench_rpc_session.py [calls] [latency_ms]
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from web3 import Web3
+
+from rpc import PooledHTTPProvider
+from rpc_stub import RPCStub
+from utils import pooled_session
+
+ADDRESS = "0x" + "11" * 20
+
+
+def timed(label: str, stub: RPCStub, calls: int, fn) -> None:
+    stub.connections = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed / calls * 1000:7.3f} ms/call  {stub.connections:5d} connections")
+
+
+def on_new_thread(fn):
+    """Run fn on a fresh thread, as pool workers and callbacks do"""
+    def run(i):
+        t = threading.Thread(target=fn, args=(i,))
+        t.start()
+        t.join()
+    return run
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    stubs = [RPCStub(latency=latency).start() for _ in range(2)]
+    urls = [s.url for s in stubs]
+    stub = stubs[0]
+
+    print(f"{calls} get_balance calls, stub latency {latency * 1000:.1f} ms")
+
+    def reconnect(i):
+        # Old set_network: new provider, is_connected probe, then the call
+        w3 = Web3(Web3.HTTPProvider(urls[0], request_kwargs={'timeout': 10}))
+        w3.is_connected()
+        w3.eth.get_balance(ADDRESS)
+
+    session = pooled_session()
+    providers = [Web3(PooledHTTPProvider(url, session=session)) for url in urls]
+
+    def pointer_swap(i):
+        providers[i % 2].eth.get_balance(ADDRESS)
+
+    default = Web3(Web3.HTTPProvider(urls[0]))
+
+    def default_provider(i):
+        default.eth.get_balance(ADDRESS)
+
+    def pooled_provider(i):
+        providers[0].eth.get_balance(ADDRESS)
+
+    timed("rebuild provider per switch", stub, calls, reconnect)
+    stubs[1].connections = 0
+    timed("persistent providers, switching", stub, calls, pointer_swap)
+    timed("default provider, new threads", stub, calls, on_new_thread(default_provider))
+    timed("pooled provider, new threads", stub, calls, on_new_thread(pooled_provider))
+
+    for s in stubs:
+        s.stop()
+
+
+if __name__ == "__main__":
+    main()
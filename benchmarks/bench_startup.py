@@ -0,0 +1,82 @@
+"""
+Vanta - Startup Benchmark
+Time from process launch to the first rendered frame, with the RPC
+reachable (local JSON-RPC stub) and unreachable (a socket that never
+answers), for the lazy startup and for the old eager one (wallet load,
+web3 import and connection probe before the app builds).
+
+Usage: python benchmarks/bench_startup.py [runs]
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT
+from rpc_stub import RPCStub
+
+DRIVER = r'''
+import json, sys, time
+t0, mode, root = float(sys.argv[1]), sys.argv[2], sys.argv[3]
+sys.path.insert(0, root)
+if mode == "eager":
+    from wallet_manager import wallet_manager
+    wallet_manager.warm_up()
+    import nft_contract, ipfs_manager
+import main
+from kivy.app import App
+from kivy.core.window import Window
+
+def first_frame(*args):
+    Window.unbind(on_flip=first_frame)
+    print(json.dumps({"first_frame": time.time() - t0, "web3": "web3" in sys.modules}), flush=True)
+    App.get_running_app().stop()
+
+Window.bind(on_flip=first_frame)
+main.VantaApp().run()
+'''
+
+
+def launch(mode: str, rpc_url: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "offscreen")
+    env["KIVY_NO_ARGS"] = "1"
+    for name in ("ETHEREUM", "POLYGON", "MUMBAI"):
+        env[f"VANTA_RPC_{name}"] = rpc_url
+        env[f"VANTA_WS_{name}"] = ""
+    with tempfile.TemporaryDirectory() as cwd:
+        start = time.time()
+        out = subprocess.run([sys.executable, "-c", DRIVER, str(start), mode, str(ROOT)],
+                             cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(out.stderr[-2000:])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    stub = RPCStub(latency=0.05).start()
+    # Accepts connections (via the backlog) but never answers
+    blackhole = socket.socket()
+    blackhole.bind(("127.0.0.1", 0))
+    blackhole.listen(16)
+    dead_url = f"http://127.0.0.1:{blackhole.getsockname()[1]}"
+
+    print(f"time to first frame, best of {runs}")
+    for rpc, url in (("reachable", stub.url), ("unreachable", dead_url)):
+        for mode in ("lazy", "eager"):
+            results = [launch(mode, url) for _ in range(runs)]
+            best = min(r["first_frame"] for r in results)
+            web3 = "web3 imported" if results[0]["web3"] else "no web3 yet"
+            print(f"{rpc:<12} {mode:<6} {best * 1000:8.0f} ms   ({web3})")
+
+    stub.stop()
+    blackhole.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Vanta - Stroke Buffer Benchmark
+Drives the real PaintWidget headless (offscreen SDL window) with a
+synthetic 10k-point stroke and reports per-frame latency: the
+on_touch_move handler alone, and handler + canvas draw + buffer flip.
+Compared against the old path, one Line whose points list is rebuilt
+on every move.
+
+Usage: python benchmarks/bench_stroke_buffer.py [points]
+"""
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+os.environ["KIVY_NO_ARGS"] = "1"
+os.environ["KIVY_NO_CONSOLELOG"] = "1"
+
+from kivy.core.window import Window
+
+from main import PaintWidget
+
+
+class ListRebuildWidget(PaintWidget):
+    """PaintWidget with the original move handler: one Line, points += [x, y]"""
+
+    def on_touch_move(self, touch):
+        if 'line' in touch.ud:
+            touch.ud['line'].points += [touch.x - self.x, touch.y - self.y]
+
+
+class _Touch:
+    """The parts of a MotionEvent PaintWidget reads"""
+
+    def __init__(self, x: float, y: float):
+        self.ud = {}
+        self.move(x, y)
+
+    def move(self, x: float, y: float):
+        self.x, self.y = x, y
+        self.pos = (x, y)
+
+
+def synthetic_stroke(n: int):
+    """Spiral with jitter-free spacing of ~3px"""
+    pts = []
+    for i in range(n):
+        t = i * 0.02
+        r = 50 + i * 0.05
+        pts.append((512 + r * math.cos(t), 384 + r * math.sin(t)))
+    return pts
+
+
+def replay(widget_class, points):
+    """(handler times, frame times) in seconds, one entry per move event"""
+    widget = widget_class(size=(1024, 768))
+    Window.add_widget(widget)
+    try:
+        touch = _Touch(*points[0])
+        widget.on_touch_down(touch)
+        # First frame compiles shaders and uploads textures: keep it out
+        Window.dispatch('on_draw')
+        Window.flip()
+        handler, frame = [], []
+        for x, y in points[1:]:
+            touch.move(x, y)
+            t0 = time.perf_counter()
+            widget.on_touch_move(touch)
+            t1 = time.perf_counter()
+            Window.dispatch('on_draw')
+            Window.flip()
+            t2 = time.perf_counter()
+            handler.append(t1 - t0)
+            frame.append(t2 - t0)
+        widget.on_touch_up(touch)
+        return handler, frame
+    finally:
+        Window.remove_widget(widget)
+
+
+def report(label, times):
+    times = sorted(times)
+    mean = sum(times) / len(times) * 1e3
+    p99 = times[int(len(times) * 0.99) - 1] * 1e3
+    print(f"{label:<28} mean {mean:8.4f} ms   p99 {p99:8.4f} ms   max {times[-1] * 1e3:8.3f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    points = synthetic_stroke(n)
+    print(f"Replaying {n} points through PaintWidget ({Window.size[0]}x{Window.size[1]} window)")
+    for label, widget_class in (("list rebuild", ListRebuildWidget), ("StrokeBuffer", PaintWidget)):
+        handler, frame = replay(widget_class, points)
+        report(f"{label} on_touch_move", handler)
+        report(f"{label} frame", frame)
+
+
+if __name__ == '__main__':
+    main()
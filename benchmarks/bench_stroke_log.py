@@ -0,0 +1,65 @@
+"""
+Vanta - Stroke Log Benchmark
+Measures memory per stroke and save/load time for a large artwork.
+
+Usage: python benchmarks/bench_stroke_log.py [strokes] [points_per_stroke]
+"""
+import math
+import sys
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from stroke_log import Stroke, StrokeLog
+
+
+def synthetic_points(i: int, n: int) -> array:
+    pts = array('f')
+    for j in range(n):
+        pts.append(200 + 150 * math.cos(i + j * 0.05))
+        pts.append(200 + 150 * math.sin(i * 0.3 + j * 0.05))
+    return pts
+
+
+def main():
+    strokes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    sources = [synthetic_points(i, points) for i in range(strokes)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    log = StrokeLog((1024, 768))
+    for pts in sources:
+        log.add(Stroke.create((0.8, 0.0, 1.0, 1.0), 4, pts))
+    traced = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    raw_floats = points * 2 * 4
+    print(f"{strokes} strokes x {points} points")
+    print(f"memory        {traced / strokes:8.0f} B/stroke (points alone: {raw_floats} B)")
+    print(f"memory_usage  {log.memory_usage() / 1e6:8.2f} MB total")
+
+    t0 = time.perf_counter()
+    raw = log.to_bytes()
+    t1 = time.perf_counter()
+    restored = StrokeLog.from_bytes(raw)
+    t2 = time.perf_counter()
+    assert len(restored) == strokes
+
+    print(f"file size     {len(raw) / 1e6:8.2f} MB")
+    print(f"encode        {(t1 - t0) * 1e3:8.1f} ms")
+    print(f"decode        {(t2 - t1) * 1e3:8.1f} ms")
+
+    t0 = time.perf_counter()
+    for _ in range(strokes):
+        log.undo()
+    for _ in range(strokes):
+        log.redo()
+    print(f"undo+redo     {(time.perf_counter() - t0) / (2 * strokes) * 1e6:8.2f} us/op")
+
+
+if __name__ == '__main__':
+    main()
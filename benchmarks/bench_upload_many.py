@@ -0,0 +1,71 @@
+"""
+Vanta - Batch Upload Benchmark
+Files/sec through IPFSManager.upload_many at several concurrency levels
+against the local pinning-service stand-in, then against one that caps
+concurrent uploads and answers the rest with 429s, and finally against
+the app's own local pin server (blocks written to disk, no latency).
+
+Usage: python benchmarks/bench_upload_many.py [latency_ms] [files]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+from common import scratch_dir
+from pin_stub import PinStub
+
+FILE_SIZE = 200_000
+
+
+def main():
+    latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.1
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 48
+
+    stub = PinStub(latency=latency, handshake=latency).start()
+    scratch_dir()
+
+    from ipfs_manager import IPFSManager
+    from storage_backends import LocalBackend, NFTStorageBackend
+
+    runs = iter(range(1, 1000))
+
+    def run(label, workers, max_per_host, backend=None):
+        m = IPFSManager(backend or NFTStorageBackend("bench", url=stub.url))
+        m.max_per_host = max_per_host
+        run_id = next(runs)
+        paths = []
+        for i in range(files):
+            path = Path(f"run{run_id}_{i}.png")
+            path.write_bytes(os.urandom(FILE_SIZE))  # fresh content: nothing is pinned yet
+            paths.append(str(path))
+        stub.reset()
+        start = time.perf_counter()
+        first = None
+        uploaded = 0
+        for _, uri in m.upload_many(paths, workers=workers):
+            first = first or time.perf_counter() - start
+            uploaded += bool(uri)
+        elapsed = time.perf_counter() - start
+        service = f"{stub.peak_in_flight:9d} {stub.rejected:5d}" if backend is None else f"{'-':>9} {'-':>5}"
+        print(f"{label:<22} {workers:7d} {uploaded / elapsed:9.1f} {first * 1000:8.0f} ms {service}"
+              + ("" if uploaded == files else f"  ({files - uploaded} failed)"))
+
+    print(f"{files} files of {FILE_SIZE // 1000} kB, {latency * 1000:.0f} ms latency "
+          f"+ {latency * 1000:.0f} ms per new connection")
+    print(f"{'service':<22} {'workers':>7} {'files/s':>9} {'first':>11} {'in flight':>9} {'429s':>5}")
+    for workers in (1, 2, 4, 8, 16):
+        run("unlimited", workers, max_per_host=workers)
+
+    stub.max_concurrent, stub.retry_after = 4, 0.5
+    run("4 at a time, 429", 8, max_per_host=8)
+    run("4 at a time, 429", 8, max_per_host=4)
+    stub.stop()
+
+    local = LocalBackend()  # in-process, stores under ./ipfs_blocks
+    for workers in (1, 4):
+        run("local pin server", workers, max_per_host=workers, backend=local)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Vanta - Benchmark Helpers
+Setup shared by the benchmark scripts: importing this puts the repo
+root on sys.path (the scripts' own directory is already there).
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def scratch_dir() -> Path:
+    """Work from a fresh temp directory, so wallet files, the pin index and caches stay out of the repo"""
+    path = Path(tempfile.mkdtemp(prefix="vanta-bench-"))
+    os.chdir(path)
+    return path
+
+
+def use_rpc_stub(stub, network: str = "polygon", websocket: bool = False) -> None:
+    """Point the wallet's `network` at the stub node (before wallet_manager is imported)"""
+    os.environ[f"VANTA_RPC_{network.upper()}"] = stub.url
+    os.environ[f"VANTA_WS_{network.upper()}"] = stub.ws_url if websocket else ""
@@ -0,0 +1,186 @@
+"""
+Vanta - Pinning Service Stub
+Minimal local stand-in for NFT.Storage's /upload (keep-alive, latency
+per request and per new connection, a concurrency cap answered with
+429s, CAR and raw bodies). Answers with
+the CID the content gets: a CAR's root, checked block by block, or the
+UnixFS import of a raw body.
+
+Usage: python benchmarks/pin_stub.py [port] [latency_ms]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ipfs_car import CarError, read_car
+from ipfs_cid import UnixFSFile, cid_str
+
+
+class PinStub:
+    """
+    Runs on a daemon thread. `latency` (seconds) is added to every
+    request and `handshake` to every new connection, standing in for
+    the TLS setup a fresh connection to the real service pays. Past
+    `max_concurrent` uploads in flight, requests get a 429 (with
+    `retry_after` as Retry-After when set).
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, handshake: float = 0.0,
+                 max_concurrent: int = 0, retry_after: float = None):
+        self.latency = latency
+        self.handshake = handshake
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.bytes_received = 0
+        self.pinned = set()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/upload"
+
+    def start(self) -> "PinStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = self.connections = self.bytes_received = 0
+            self.rejected = self.peak_in_flight = 0
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+                if stub.handshake:
+                    time.sleep(stub.handshake)
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                reader = _BodyReader(self.rfile, self.headers)
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    limited = stub.max_concurrent and stub.in_flight > stub.max_concurrent
+                try:
+                    if limited:
+                        self._reject(reader)
+                    else:
+                        self._pin(reader)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _reject(self, reader):
+                while reader.read(65536):
+                    pass
+                with stub._lock:
+                    stub.rejected += 1
+                data = b'{"ok": false, "error": {"message": "Too Many Requests"}}'
+                self.send_response(429)
+                if stub.retry_after is not None:
+                    self.send_header("Retry-After", str(stub.retry_after))
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _pin(self, reader):
+                try:
+                    if self.headers.get("Content-Type") == "application/car":
+                        cid = _read_car(reader)
+                    else:
+                        importer = UnixFSFile()
+                        for block in iter(lambda: reader.read(65536), b""):
+                            importer.update(block)
+                        cid = cid_str(importer.finish())
+                    status, response = 200, {"ok": True, "value": {"cid": cid}}
+                except (CarError, ValueError) as e:
+                    status, response = 400, {"ok": False, "error": {"message": str(e)}}
+                    self.close_connection = True
+                with stub._lock:
+                    stub.requests += 1
+                    stub.bytes_received += reader.received
+                    if status == 200:
+                        stub.pinned.add(cid)
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class _BodyReader:
+    """Request body with Content-Length or chunked transfer encoding"""
+
+    def __init__(self, rfile, headers):
+        self.rfile = rfile
+        self.chunked = headers.get("Transfer-Encoding", "").lower() == "chunked"
+        self.remaining = int(headers.get("Content-Length", 0))
+        self.received = 0
+
+    def read(self, size: int) -> bytes:
+        if self.chunked and self.remaining == 0:
+            line = self.rfile.readline().strip()
+            self.remaining = int(line.split(b";")[0] or b"0", 16)
+            if self.remaining == 0:
+                self.rfile.readline()
+                self.chunked = False
+        data = self.rfile.read(min(size, self.remaining)) if self.remaining else b""
+        self.remaining -= len(data)
+        self.received += len(data)
+        if self.chunked and self.remaining == 0:
+            self.rfile.readline()  # CRLF after the chunk
+        return data
+
+
+def _read_car(reader: _BodyReader) -> str:
+    """Root of a CAR, once every block has been checked"""
+    root, sections = read_car(reader)
+    if root not in {cid for cid, _ in sections}:
+        raise CarError("Root block missing")
+    return cid_str(root)
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5050
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    stub = PinStub(port, latency).start()
+    print(f"Pinning stub on {stub.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,250 @@
+"""
+Vanta - JSON-RPC Stub
+Minimal local Ethereum JSON-RPC server for benchmarks (keep-alive,
+batch requests, configurable latency and error rate, block filters,
+blocks that include given transactions, and an optional websocket
+endpoint with newHeads subscriptions).
+
+Usage: python benchmarks/rpc_stub.py [port] [latency_ms]
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from websockets.sync.server import serve as ws_serve
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    ws_serve = None
+    WEBSOCKET_AVAILABLE = False
+
+CHAIN_ID = 137
+
+
+class RPCStub:
+    """
+    Runs on a daemon thread. `latency` (seconds) is added to every HTTP
+    request; `error_rate` is the share of requests answered with a 503.
+    A new block is mined every `block_time` seconds (0 = only by mine()).
+    """
+
+    def __init__(self, port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 block_time: float = 0.0, websocket: bool = False):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.block_time = block_time
+        self.requests = 0
+        self.connections = 0
+        self.block_number = 1000
+        self.mined_at = {}
+        self.block_txs = {}  # block number -> tx hashes mined in it
+        self.accounts = None  # {address: (balance_wei, nonce)}; None = every address funded
+        self.methods = {}    # method -> calls, batched ones included
+        self.down = False  # drop every request without answering
+        self._lock = threading.Lock()
+        self._filters = {}
+        self._subscribers = []
+        self._stopped = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        self.ws_server = None
+        if websocket:
+            if not WEBSOCKET_AVAILABLE:
+                raise RuntimeError("websockets is required for the websocket endpoint")
+            self.ws_server = ws_serve(self._ws_handler, "127.0.0.1", 0)
+            self._threads.append(threading.Thread(target=self.ws_server.serve_forever, daemon=True))
+        if block_time:
+            self._threads.append(threading.Thread(target=self._mine_loop, daemon=True))
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.ws_server.socket.getsockname()[1]}"
+
+    def start(self) -> "RPCStub":
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        # Kept-alive connections outlive shutdown(); make them fail too
+        self.down = True
+        self._stopped.set()
+        self.server.shutdown()
+        self.server.server_close()
+        if self.ws_server:
+            self.ws_server.shutdown()
+
+    # ---------- Blocks ----------
+
+    def mine(self, tx_hashes=()) -> int:
+        """Produce a block (including tx_hashes) and push it to websocket subscribers"""
+        with self._lock:
+            self.block_number += 1
+            number = self.block_number
+            self.mined_at[number] = time.perf_counter()
+            self.block_txs[number] = [h.lower() for h in tx_hashes]
+            subscribers = list(self._subscribers)
+        head = {"number": hex(number), "hash": "0x%064x" % number}
+        for ws, sub_id in subscribers:
+            message = {"jsonrpc": "2.0", "method": "eth_subscription",
+                       "params": {"subscription": sub_id, "result": head}}
+            try:
+                ws.send(json.dumps(message))
+            except Exception:
+                with self._lock:
+                    if (ws, sub_id) in self._subscribers:
+                        self._subscribers.remove((ws, sub_id))
+        return number
+
+    def _mine_loop(self) -> None:
+        while not self._stopped.wait(self.block_time):
+            self.mine()
+
+    def _ws_handler(self, ws) -> None:
+        for raw in ws:
+            request = json.loads(raw)
+            if request.get("method") == "eth_subscribe" and request.get("params") == ["newHeads"]:
+                sub_id = "0x%x" % (len(self._subscribers) + 1)
+                ws.send(json.dumps({"jsonrpc": "2.0", "id": request.get("id"), "result": sub_id}))
+                with self._lock:
+                    self._subscribers.append((ws, sub_id))
+            else:
+                ws.send(json.dumps(self._reply(request)))
+
+    def _receipt(self, tx_hash: str):
+        for number, hashes in self.block_txs.items():
+            if tx_hash.lower() in hashes:
+                return {
+                    "transactionHash": tx_hash, "transactionIndex": hex(hashes.index(tx_hash.lower())),
+                    "blockHash": "0x%064x" % number, "blockNumber": hex(number),
+                    "from": "0x" + "11" * 20, "to": "0x" + "22" * 20,
+                    "cumulativeGasUsed": hex(21000), "gasUsed": hex(21000),
+                    "effectiveGasPrice": hex(30 * 10 ** 9), "contractAddress": None,
+                    "logs": [], "logsBloom": "0x" + "00" * 256, "status": "0x1", "type": "0x2",
+                }
+        return None
+
+    def answer(self, method: str, params: list):
+        with self._lock:
+            self.methods[method] = self.methods.get(method, 0) + 1
+        if method == "web3_clientVersion":
+            return "VantaStub/1.0"
+        if method == "eth_chainId":
+            return hex(CHAIN_ID)
+        if method == "net_version":
+            return str(CHAIN_ID)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_getBalance":
+            if self.accounts is not None:
+                return hex(self.accounts.get(params[0].lower(), (0, 0))[0])
+            return hex(10 ** 18)
+        if method == "eth_getTransactionCount":
+            if self.accounts is not None:
+                return hex(self.accounts.get(params[0].lower(), (0, 0))[1])
+            return hex(7)
+        if method == "eth_gasPrice":
+            return hex(30 * 10 ** 9)
+        if method == "eth_feeHistory":
+            blocks = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+            return {
+                "oldestBlock": hex(self.block_number - blocks + 1),
+                "baseFeePerGas": [hex(30 * 10 ** 9)] * (blocks + 1),
+                "gasUsedRatio": [0.5] * blocks,
+                "reward": [[hex(10 ** 9 * (i + 1)) for i in range(len(params[2]))]] * blocks,
+            }
+        if method == "eth_getTransactionReceipt":
+            return self._receipt(params[0])
+        if method == "eth_getBlockByNumber":
+            number = self.block_number if params[0] == "latest" else int(params[0], 16)
+            if number > self.block_number:
+                return None
+            return {"number": hex(number), "hash": "0x%064x" % number,
+                    "transactions": self.block_txs.get(number, [])}
+        if method == "eth_newBlockFilter":
+            with self._lock:
+                filter_id = hex(len(self._filters) + 1)
+                self._filters[filter_id] = self.block_number
+            return filter_id
+        if method == "eth_getFilterChanges":
+            with self._lock:
+                if params[0] not in self._filters:
+                    raise LookupError("filter not found")
+                seen, self._filters[params[0]] = self._filters[params[0]], self.block_number
+            return ["0x%064x" % n for n in range(seen + 1, self.block_number + 1)]
+        raise KeyError(method)
+
+    def _reply(self, request: dict) -> dict:
+        try:
+            result = self.answer(request["method"], request.get("params", []))
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+        except KeyError:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        except LookupError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": -32000, "message": str(e)}}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if stub.down:
+                    self.close_connection = True
+                    return
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub.error_rate and random.random() < stub.error_rate:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                request = json.loads(body)
+                if isinstance(request, list):
+                    response = [stub._reply(r) for r in request]
+                else:
+                    response = stub._reply(request)
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8545
+    latency = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+    stub = RPCStub(port, latency).start()
+    print(f"JSON-RPC stub on {stub.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
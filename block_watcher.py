@@ -0,0 +1,214 @@
+"""
+Vanta - Block Watcher
+One shared new-head stream for the current network, fanned out to listeners
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    from websockets.sync.client import connect as ws_connect
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    ws_connect = None
+    WEBSOCKET_AVAILABLE = False
+
+from wallet_manager import NETWORKS
+
+MODE_WEBSOCKET = "websocket"
+MODE_FILTER = "filter"
+MODE_POLL = "poll"
+
+BlockListener = Callable[[str, int], None]
+
+
+class BlockWatcher:
+    """
+    Follows the wallet's current network and reports every new block
+    number to listeners, on the watcher thread.
+
+    Sources, best first: eth_subscribe("newHeads") over the network's
+    ws_urls, then an eth_newBlockFilter, then eth_blockNumber polling.
+    A source that errors (or a websocket that goes quiet for
+    `ws_timeout`) drops to the next one; after `upgrade_after` seconds on
+    a fallback the better sources are tried again.
+    """
+
+    def __init__(self, wallet_manager, poll_interval: float = 4.0,
+                 ws_timeout: float = 60.0, upgrade_after: float = 300.0):
+        self.wm = wallet_manager
+        self.poll_interval = poll_interval
+        self.ws_timeout = ws_timeout
+        self.upgrade_after = upgrade_after
+        self.modes = (MODE_WEBSOCKET, MODE_FILTER, MODE_POLL)
+        self._lock = threading.Lock()
+        self._listeners: List[BlockListener] = []
+        self._latest: Dict[str, int] = {}
+        self._heard_at: Dict[str, float] = {}
+        self._mode: Dict[str, str] = {}
+        self._network: Optional[str] = None
+        self._stop: Optional[threading.Event] = None
+        self._started = False
+
+    def add_listener(self, callback: BlockListener):
+        """callback(network, block_number), called on the watcher thread"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: BlockListener):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def latest(self, network: str = None, max_age: float = None) -> Optional[int]:
+        """
+        Newest block seen on a network, without an RPC. With `max_age`,
+        None unless a new block was reported within that many seconds
+        (the network isn't followed any more, or its stream stalled).
+        """
+        network = network or self.wm.current_network
+        with self._lock:
+            if max_age is not None and time.monotonic() - self._heard_at.get(network, float("-inf")) > max_age:
+                return None
+            return self._latest.get(network)
+
+    def mode(self, network: str = None) -> Optional[str]:
+        with self._lock:
+            return self._mode.get(network or self.wm.current_network)
+
+    # ---------- Lifecycle ----------
+
+    def start(self) -> None:
+        """Watch the current network and follow network switches"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self.wm.add_listener(self._on_wallet_change)
+        self._watch(self.wm.current_network)
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._stop:
+                self._stop.set()
+            self._stop = None
+            self._network = None
+
+    def _on_wallet_change(self):
+        if self._stop is not None and self.wm.current_network != self._network:
+            self._watch(self.wm.current_network)
+
+    def _watch(self, network: str) -> None:
+        stop = threading.Event()
+        with self._lock:
+            if self._stop:
+                self._stop.set()
+            self._stop = stop
+            self._network = network
+        threading.Thread(target=self._run, args=(network, stop),
+                         name=f"vanta-blocks-{network}", daemon=True).start()
+
+    def _run(self, network: str, stop: threading.Event) -> None:
+        streams = {
+            MODE_WEBSOCKET: self._stream_websocket,
+            MODE_FILTER: self._stream_filter,
+            MODE_POLL: self._stream_poll,
+        }
+        while not stop.is_set():
+            for i, mode in enumerate(self.modes):
+                # Fallback sources return after upgrade_after to retry the better ones
+                better_exists = i > 0
+                with self._lock:
+                    self._mode[network] = mode
+                try:
+                    streams[mode](network, stop, better_exists)
+                    break
+                except Exception as e:
+                    print(f"⚠️ Block {mode} stream on {network} unavailable: {e}")
+            else:
+                stop.wait(self.poll_interval)
+
+    # ---------- Sources ----------
+
+    def _stream_websocket(self, network: str, stop: threading.Event, better_exists: bool) -> None:
+        urls = NETWORKS[network].ws_urls
+        if not WEBSOCKET_AVAILABLE or not urls:
+            raise ConnectionError("no websocket endpoint")
+
+        last_error: Optional[Exception] = None
+        for url in urls:
+            try:
+                with ws_connect(url, open_timeout=10, close_timeout=1) as ws:
+                    ws.send(json.dumps({"jsonrpc": "2.0", "id": 1,
+                                        "method": "eth_subscribe", "params": ["newHeads"]}))
+                    reply = json.loads(ws.recv(timeout=10))
+                    if reply.get("error"):
+                        raise ConnectionError(reply["error"])
+                    heard = time.monotonic()
+                    while not stop.is_set():
+                        try:
+                            message = json.loads(ws.recv(timeout=1.0))
+                        except TimeoutError:
+                            if time.monotonic() - heard > self.ws_timeout:
+                                raise TimeoutError("no new heads")
+                            continue
+                        head = (message.get("params") or {}).get("result") or {}
+                        if "number" in head:
+                            heard = time.monotonic()
+                            self._emit(network, int(head["number"], 16))
+                    return
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def _stream_filter(self, network: str, stop: threading.Event, better_exists: bool) -> None:
+        w3 = self.wm.get_web3_for(network)
+        filter_id = w3.eth.filter("latest").filter_id
+        self._emit(network, w3.eth.block_number)
+        started = time.monotonic()
+        while not stop.wait(self.poll_interval):
+            # Raises once the node forgets the filter (or the router picked
+            # another endpoint): the poller takes over
+            if w3.eth.get_filter_changes(filter_id):
+                self._emit(network, w3.eth.block_number)
+            if better_exists and time.monotonic() - started > self.upgrade_after:
+                return
+
+    def _stream_poll(self, network: str, stop: threading.Event, better_exists: bool) -> None:
+        w3 = self.wm.get_web3_for(network)
+        started = time.monotonic()
+        while True:
+            try:
+                self._emit(network, w3.eth.block_number)
+            except Exception as e:
+                print(f"Block poll error ({network}): {e}")
+            if stop.wait(self.poll_interval):
+                return
+            if better_exists and time.monotonic() - started > self.upgrade_after:
+                return
+
+    def _emit(self, network: str, number: int) -> None:
+        with self._lock:
+            if number <= self._latest.get(network, -1):
+                return
+            self._latest[network] = number
+            self._heard_at[network] = time.monotonic()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(network, number)
+            except Exception as e:
+                print(f"Block listener error: {e}")
+
+
+_block_watcher: Optional[BlockWatcher] = None
+
+
+def get_block_watcher(wallet_manager) -> BlockWatcher:
+    global _block_watcher
+    if _block_watcher is None:
+        _block_watcher = BlockWatcher(wallet_manager)
+    return _block_watcher
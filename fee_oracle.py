@@ -0,0 +1,173 @@
+"""
+Vanta - Fee Oracle
+EIP-1559 fee suggestions from eth_feeHistory, cached per block and network
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from statistics import median
+from typing import Callable, Dict, Optional, Tuple
+
+GWEI = 10 ** 9
+
+# Reward percentile used for each speed
+SPEED_PERCENTILES = {"slow": 20, "standard": 50, "fast": 85}
+
+# Some chains reject tips below a floor (Polygon PoS enforces ~30 gwei)
+MIN_PRIORITY_FEE = {
+    "polygon": 30 * GWEI,
+    "mumbai": 30 * GWEI,
+}
+DEFAULT_MIN_PRIORITY_FEE = 1 * GWEI
+
+# Replacement txs must raise both fee fields by >= 10% (geth); use 12.5%
+REPLACEMENT_BUMP = 1.125
+
+
+@dataclass
+class FeeSuggestion:
+    block_number: int
+    base_fee: int
+    max_priority_fee_per_gas: int
+    max_fee_per_gas: int
+    legacy: bool = False  # chain without EIP-1559: max_fee_per_gas is the gasPrice
+
+    def tx_params(self) -> dict:
+        if self.legacy:
+            return {'gasPrice': self.max_fee_per_gas}
+        return {
+            'maxFeePerGas': self.max_fee_per_gas,
+            'maxPriorityFeePerGas': self.max_priority_fee_per_gas,
+        }
+
+
+class FeeOracle:
+    """
+    Fee and gas-limit suggestions per network.
+
+    Fees come from one eth_feeHistory call per new block; every caller
+    within the same block reuses it. The block comes from the
+    BlockWatcher's head when it has a recent one, so a cache hit costs
+    no RPC at all; otherwise from eth_blockNumber. Gas limits are estimated once per
+    (network, function key) and padded by `gas_margin`.
+    """
+
+    def __init__(self, wallet_manager, history_blocks: int = 10,
+                 base_fee_multiplier: float = 2.0, gas_margin: float = 1.25,
+                 max_head_age: float = 30.0):
+        self.wm = wallet_manager
+        self.history_blocks = history_blocks
+        self.base_fee_multiplier = base_fee_multiplier
+        self.gas_margin = gas_margin
+        # Older watcher heads are not trusted: ask the node instead
+        self.max_head_age = max_head_age
+        self._lock = threading.Lock()
+        self._fees: Dict[str, Tuple[int, Dict[str, FeeSuggestion]]] = {}
+        self._gas: Dict[Tuple[str, str], int] = {}
+
+    # ---------- Fees ----------
+
+    def suggest(self, speed: str = "standard", w3=None) -> FeeSuggestion:
+        w3 = w3 or self.wm.get_web3()
+        if w3 is None:
+            raise RuntimeError("No blockchain connection")
+
+        network = self.wm.current_network
+        block = self._head(network)
+        if block is None:
+            block = w3.eth.block_number
+        with self._lock:
+            cached = self._fees.get(network)
+            if cached and cached[0] == block:
+                return cached[1][speed]
+
+        suggestions = self._compute(w3, network, block)
+        with self._lock:
+            self._fees[network] = (block, suggestions)
+        return suggestions[speed]
+
+    def _head(self, network: str) -> Optional[int]:
+        """Recent head from the BlockWatcher, if one is running"""
+        from block_watcher import get_block_watcher
+        return get_block_watcher(self.wm).latest(network, max_age=self.max_head_age)
+
+    def _compute(self, w3, network: str, block: int) -> Dict[str, FeeSuggestion]:
+        min_tip = MIN_PRIORITY_FEE.get(network, DEFAULT_MIN_PRIORITY_FEE)
+        percentiles = sorted(SPEED_PERCENTILES.values())
+        try:
+            history = w3.eth.fee_history(self.history_blocks, 'latest', percentiles)
+            # Last entry is the base fee of the block being built next
+            base_fee = int(history['baseFeePerGas'][-1])
+            rewards = history.get('reward') or []
+        except Exception as e:
+            print(f"⚠️ feeHistory unavailable ({e}), using legacy gasPrice")
+            gas_price = int(w3.eth.gas_price)
+            return {
+                speed: FeeSuggestion(block, 0, 0, gas_price, legacy=True)
+                for speed in SPEED_PERCENTILES
+            }
+
+        suggestions = {}
+        for speed, pct in SPEED_PERCENTILES.items():
+            col = percentiles.index(pct)
+            samples = [int(r[col]) for r in rewards if len(r) > col and int(r[col]) > 0]
+            tip = max(int(median(samples)) if samples else 0, min_tip)
+            max_fee = int(base_fee * self.base_fee_multiplier) + tip
+            suggestions[speed] = FeeSuggestion(block, base_fee, tip, max_fee)
+        return suggestions
+
+    def tx_fee_params(self, speed: str = "standard", w3=None) -> dict:
+        """Fee fields ready to merge into a tx dict"""
+        return self.suggest(speed, w3).tx_params()
+
+    def replacement_params(self, old_tx: dict, speed: str = "fast") -> dict:
+        """
+        Fees for a same-nonce replacement: the current `speed` suggestion,
+        but never less than the old fees bumped by REPLACEMENT_BUMP.
+        """
+        current = self.suggest(speed)
+        if 'gasPrice' in old_tx and 'maxFeePerGas' not in old_tx:
+            bumped = int(int(old_tx['gasPrice']) * REPLACEMENT_BUMP) + 1
+            price = max(bumped, current.max_fee_per_gas)
+            if current.legacy:
+                return {'gasPrice': price}
+            tip = max(bumped, current.max_priority_fee_per_gas)
+            return {'maxFeePerGas': max(price, tip), 'maxPriorityFeePerGas': tip}
+
+        tip = max(int(int(old_tx['maxPriorityFeePerGas']) * REPLACEMENT_BUMP) + 1,
+                  current.max_priority_fee_per_gas)
+        max_fee = max(int(int(old_tx['maxFeePerGas']) * REPLACEMENT_BUMP) + 1,
+                      current.max_fee_per_gas, tip)
+        return {'maxFeePerGas': max_fee, 'maxPriorityFeePerGas': tip}
+
+    # ---------- Gas limits ----------
+
+    def gas_limit(self, key: str, estimate: Callable[[], int]) -> int:
+        """Cached, padded gas estimate for one kind of call"""
+        cache_key = (self.wm.current_network, key)
+        with self._lock:
+            if cache_key in self._gas:
+                return self._gas[cache_key]
+        gas = int(estimate() * self.gas_margin)
+        with self._lock:
+            self._gas[cache_key] = gas
+        return gas
+
+    def invalidate_gas(self, key: Optional[str] = None) -> None:
+        """Drop cached estimates (e.g. after an out-of-gas revert)"""
+        with self._lock:
+            if key is None:
+                self._gas.clear()
+            else:
+                self._gas = {k: v for k, v in self._gas.items() if k[1] != key}
+
+
+_fee_oracle: Optional[FeeOracle] = None
+
+
+def get_fee_oracle(wallet_manager) -> FeeOracle:
+    global _fee_oracle
+    if _fee_oracle is None:
+        _fee_oracle = FeeOracle(wallet_manager)
+    return _fee_oracle
@@ -0,0 +1,252 @@
+"""
+Vanta - CAR Bundles
+Packs files and directories into a CAR v1 stream, so a whole UnixFS
+DAG (an artwork with its metadata, or a full drop) goes up in one
+request, and reads CARs back (for the local pin server)
+"""
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from ipfs_cid import (CHUNK_SIZE, CODEC_DAG_PB, CODEC_RAW, UnixFSFile, cid_str,
+                      dag_pb_directory, make_cid, varint)
+
+
+class CarError(Exception):
+    """CAR packing error"""
+    pass
+
+
+class _File:
+    """
+    A file imported once up front for its CID; the leaf blocks are read
+    again when the CAR is streamed, so only the CIDs stay in memory
+    """
+
+    def __init__(self, path: Optional[Path] = None, data: Optional[bytes] = None):
+        self.path = path
+        self.data = data
+        self.leaves: List[Tuple[bytes, int]] = []
+        self.nodes: List[Tuple[bytes, bytes]] = []
+        importer = UnixFSFile(on_block=self._record)
+        with self._open() as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                importer.update(chunk)
+        self.cid = importer.finish()
+        self.tsize = importer.tsize
+        self.size = importer.size
+
+    def _record(self, cid: bytes, block: bytes) -> None:
+        if cid[1] == CODEC_RAW:  # CIDv1: version byte, then the codec
+            self.leaves.append((cid, len(block)))
+        else:
+            self.nodes.append((cid, block))
+
+    def _open(self) -> BinaryIO:
+        return open(self.path, "rb") if self.data is None else io.BytesIO(self.data)
+
+    def block_sizes(self) -> Iterator[Tuple[bytes, int]]:
+        yield from self.leaves
+        for cid, block in self.nodes:
+            yield cid, len(block)
+
+    def blocks(self) -> Iterator[Tuple[bytes, bytes]]:
+        with self._open() as f:
+            for cid, size in self.leaves:
+                chunk = f.read(CHUNK_SIZE)
+                if len(chunk) != size or make_cid(CODEC_RAW, chunk) != cid:
+                    raise CarError(f"{self.path} changed while packing")
+                yield cid, chunk
+        yield from self.nodes
+
+
+class CarDirectory:
+    """
+    UnixFS directory being packed. Files are hashed as they are added;
+    the directory's own node is built when its CID is first needed.
+    """
+
+    def __init__(self, parent: Optional[CarDirectory] = None):
+        self.entries: Dict[str, Union[_File, CarDirectory]] = {}
+        self._parent = parent
+        self._node: Optional[bytes] = None
+        self._cid: Optional[bytes] = None
+        self._tsize = 0
+
+    def add_file(self, name: str, path: Union[str, Path]) -> str:
+        """Add a file from disk; returns its CID"""
+        return cid_str(self._add(name, _File(path=Path(path))).cid)
+
+    def add_bytes(self, name: str, data: bytes) -> str:
+        return cid_str(self._add(name, _File(data=data)).cid)
+
+    def add_directory(self, name: str) -> CarDirectory:
+        return self._add(name, CarDirectory(parent=self))
+
+    def remove(self, name: str) -> None:
+        """Drop an entry (e.g. a file found to be pinned already)"""
+        del self.entries[name]
+        self._invalidate()
+
+    @property
+    def cid(self) -> bytes:
+        self._build()
+        return self._cid
+
+    @property
+    def tsize(self) -> int:
+        self._build()
+        return self._tsize
+
+    def block_sizes(self) -> Iterator[Tuple[bytes, int]]:
+        for _, entry in sorted(self.entries.items()):
+            yield from entry.block_sizes()
+        yield self.cid, len(self._node)
+
+    def blocks(self) -> Iterator[Tuple[bytes, bytes]]:
+        for _, entry in sorted(self.entries.items()):
+            yield from entry.blocks()
+        yield self.cid, self._node
+
+    def _add(self, name: str, entry):
+        if not name or "/" in name or name in (".", ".."):
+            raise CarError(f"Invalid name: {name!r}")
+        if name in self.entries:
+            raise CarError(f"Duplicate name: {name}")
+        self.entries[name] = entry
+        self._invalidate()
+        return entry
+
+    def _invalidate(self) -> None:
+        self._node = None
+        if self._parent is not None:
+            self._parent._invalidate()
+
+    def _build(self) -> None:
+        if self._node is not None:
+            return
+        links = [(name, entry.cid, entry.tsize) for name, entry in self.entries.items()]
+        self._node = dag_pb_directory(links)
+        self._cid = make_cid(CODEC_DAG_PB, self._node)
+        self._tsize = len(self._node) + sum(tsize for _, _, tsize in links)
+
+
+def car_header(root: bytes) -> bytes:
+    """CAR v1 header: dag-cbor {"roots": [root], "version": 1}, length-prefixed"""
+    link = b"\x00" + root  # tag 42 payload: multibase identity prefix + CID
+    header = (b"\xa2"                      # map(2), keys in dag-cbor order
+              + b"\x65roots" + b"\x81"     # "roots": array(1)
+              + b"\xd8\x2a" + b"\x58" + bytes([len(link)]) + link
+              + b"\x67version" + b"\x01")  # "version": 1
+    return varint(len(header)) + header
+
+
+class CarStream:
+    """
+    Read-only file object over the CAR of a directory, for use as a
+    request body: the length is known up front (so no chunked encoding)
+    and blocks are read from disk as they are sent. A block shared by
+    several files is written once.
+    """
+
+    def __init__(self, root: CarDirectory):
+        self.root = cid_str(root.cid)
+        self._root = root
+        self._header = car_header(root.cid)
+        self.length = len(self._header) + sum(
+            len(varint(len(cid) + size)) + len(cid) + size
+            for cid, size in _unique(root.block_sizes()))
+        self._chunks = self._generate()
+        self._chunk = b""
+        self._offset = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def read(self, size: int = -1) -> bytes:
+        """Up to `size` bytes (all that is left if negative); b"" at the end"""
+        if size < 0:
+            rest = [self._chunk[self._offset:]] + list(self._chunks)
+            self._chunk, self._offset = b"", 0
+            return b"".join(rest)
+        while self._offset >= len(self._chunk):
+            self._chunk, self._offset = next(self._chunks, None), 0
+            if self._chunk is None:
+                self._chunk = b""
+                return b""
+        out = self._chunk[self._offset:self._offset + size]
+        self._offset += len(out)
+        return out
+
+    def _generate(self) -> Iterator[bytes]:
+        yield self._header
+        for cid, block in _unique(self._root.blocks()):
+            yield varint(len(cid) + len(block)) + cid
+            yield block
+
+
+def _unique(blocks: Iterator[Tuple[bytes, object]]) -> Iterator[Tuple[bytes, object]]:
+    seen: Set[bytes] = set()
+    for cid, block in blocks:
+        if cid not in seen:
+            seen.add(cid)
+            yield cid, block
+
+
+def read_car(stream: BinaryIO) -> Tuple[bytes, Iterator[Tuple[bytes, bytes]]]:
+    """
+    Root CID of a CAR v1 stream (anything with read()), and an iterator
+    over its (cid, block) sections, each checked against its sha2-256 CID
+    """
+    header = _read_exact(stream, _read_varint(stream))
+    prefix = b"\xa2\x65roots\x81\xd8\x2a\x58"
+    if not header.startswith(prefix) or not header.endswith(b"\x67version\x01"):
+        raise CarError("Unsupported CAR header")
+    root = header[len(prefix) + 2:len(prefix) + 1 + header[len(prefix)]]
+
+    def sections() -> Iterator[Tuple[bytes, bytes]]:
+        while True:
+            size = _read_varint(stream, allow_eof=True)
+            if size is None:
+                return
+            section = _read_exact(stream, size)
+            cid_len = _cid_length(section)
+            cid, block = section[:cid_len], section[cid_len:]
+            if make_cid(cid[1], block) != cid:
+                raise CarError(f"Block does not match its CID: {cid_str(cid)}")
+            yield cid, block
+
+    return root, sections()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    out = bytearray()
+    while len(out) < size:
+        data = stream.read(size - len(out))
+        if not data:
+            raise CarError("Truncated CAR")
+        out += data
+    return bytes(out)
+
+
+def _read_varint(stream: BinaryIO, allow_eof: bool = False) -> Optional[int]:
+    shift = value = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if allow_eof and shift == 0:
+                return None
+            raise CarError("Truncated CAR")
+        value |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return value
+        shift += 7
+
+
+def _cid_length(section: bytes) -> int:
+    """Length of the CIDv1 at the start of a section (one-byte codec, sha2-256)"""
+    if section[:1] != b"\x01" or section[2:4] != b"\x12\x20":
+        raise CarError("Only CIDv1 with sha2-256 is supported")
+    return 4 + 32
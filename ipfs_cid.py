@@ -0,0 +1,173 @@
+"""
+Vanta - IPFS CIDs
+Local CIDv1 computation, matching what NFT.Storage / ipfs-car import
+produces: sha2-256, raw leaves, 1 MiB fixed-size chunks, balanced
+dag-pb UnixFS tree with up to 1024 links per node
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple, Union
+
+CHUNK_SIZE = 1024 * 1024
+MAX_LINKS = 1024
+
+CODEC_RAW = 0x55
+CODEC_DAG_PB = 0x70
+SHA2_256 = 0x12
+
+# UnixFS Data.DataType
+UNIXFS_DIRECTORY = 1
+UNIXFS_FILE = 2
+
+BlockCallback = Callable[[bytes, bytes], None]  # (cid, block)
+
+
+# ---------- Encoding ----------
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def make_cid(codec: int, block: bytes) -> bytes:
+    """Binary CIDv1 of a block"""
+    digest = hashlib.sha256(block).digest()
+    return varint(1) + varint(codec) + varint(SHA2_256) + varint(len(digest)) + digest
+
+
+def cid_str(cid: bytes) -> str:
+    """Multibase base32 (lowercase, unpadded): 'bafy...' / 'bafk...'"""
+    return "b" + base64.b32encode(cid).decode("ascii").lower().rstrip("=")
+
+
+def cid_bytes(cid: str) -> bytes:
+    """Inverse of cid_str (CIDv1, base32 only)"""
+    if not cid.startswith("b"):
+        raise ValueError(f"Not a base32 CIDv1: {cid}")
+    body = cid[1:].upper()
+    return base64.b32decode(body + "=" * (-len(body) % 8))
+
+
+def _field(number: int, payload: bytes) -> bytes:
+    """Length-delimited protobuf field"""
+    return varint(number << 3 | 2) + varint(len(payload)) + payload
+
+
+def _uint(number: int, value: int) -> bytes:
+    return varint(number << 3) + varint(value)
+
+
+def dag_pb_node(links: List[Tuple[bytes, int]], blocksizes: List[int]) -> bytes:
+    """
+    dag-pb node of a UnixFS file: links [(cid, tsize)] with empty names,
+    then Data {Type: File, filesize, blocksizes} (canonical field order)
+    """
+    out = bytearray()
+    for cid, tsize in links:
+        out += _field(2, _field(1, cid) + _field(2, b"") + _uint(3, tsize))
+    data = _uint(1, UNIXFS_FILE) + _uint(3, sum(blocksizes))
+    for size in blocksizes:
+        data += _uint(4, size)
+    out += _field(1, data)
+    return bytes(out)
+
+
+def dag_pb_directory(links: List[Tuple[str, bytes, int]]) -> bytes:
+    """
+    dag-pb node of a basic (unsharded) UnixFS directory; links are
+    [(name, cid, tsize)] and are written sorted by name
+    """
+    out = bytearray()
+    for name, cid, tsize in sorted(links, key=lambda link: link[0].encode("utf-8")):
+        out += _field(2, _field(1, cid) + _field(2, name.encode("utf-8")) + _uint(3, tsize))
+    out += _field(1, _uint(1, UNIXFS_DIRECTORY))
+    return bytes(out)
+
+
+# ---------- Importer ----------
+
+class UnixFSFile:
+    """
+    Incremental importer: feed bytes with update(), get the root CID from
+    finish(). Memory is one chunk plus one (cid, size) per leaf. Every
+    block (leaves first, root last) goes to `on_block` if given.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, max_links: int = MAX_LINKS,
+                 on_block: Optional[BlockCallback] = None):
+        self.chunk_size = chunk_size
+        self.max_links = max_links
+        self.on_block = on_block
+        self.size = 0
+        self.tsize = 0  # bytes of every block in the DAG, once finished
+        self._buffer = bytearray()
+        # (cid, tsize, file bytes) per node of the current level
+        self._leaves: List[Tuple[bytes, int, int]] = []
+        self._cid: Optional[bytes] = None
+
+    def update(self, data: bytes) -> None:
+        self.size += len(data)
+        self._buffer += data
+        while len(self._buffer) >= self.chunk_size:
+            self._leaf(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+
+    def finish(self) -> bytes:
+        """Root CID (binary); a file that fits one chunk is its raw leaf"""
+        if self._cid is not None:
+            return self._cid
+        if self._buffer or not self._leaves:
+            self._leaf(bytes(self._buffer))
+            self._buffer.clear()
+
+        level = self._leaves
+        while len(level) > 1:
+            parents = []
+            for start in range(0, len(level), self.max_links):
+                group = level[start:start + self.max_links]
+                node = dag_pb_node([(cid, tsize) for cid, tsize, _ in group],
+                                   [filesize for _, _, filesize in group])
+                cid = self._emit(CODEC_DAG_PB, node)
+                parents.append((cid, len(node) + sum(tsize for _, tsize, _ in group),
+                                sum(filesize for _, _, filesize in group)))
+            level = parents
+        self._cid, self.tsize = level[0][0], level[0][1]
+        return self._cid
+
+    def _leaf(self, chunk: bytes) -> None:
+        self._leaves.append((self._emit(CODEC_RAW, chunk), len(chunk), len(chunk)))
+
+    def _emit(self, codec: int, block: bytes) -> bytes:
+        cid = make_cid(codec, block)
+        if self.on_block:
+            self.on_block(cid, block)
+        return cid
+
+
+def bytes_cid(data: bytes) -> str:
+    importer = UnixFSFile()
+    importer.update(data)
+    return cid_str(importer.finish())
+
+
+def file_cid(source: Union[str, Path, BinaryIO], read_size: int = CHUNK_SIZE) -> str:
+    """CID of a file, streamed (path or binary file object)"""
+    importer = UnixFSFile()
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(read_size), b""):
+                importer.update(block)
+    else:
+        for block in iter(lambda: source.read(read_size), b""):
+            importer.update(block)
+    return cid_str(importer.finish())
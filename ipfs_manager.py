@@ -1,60 +1,217 @@
 """
 Vanta - IPFS Manager
-Upload images to IPFS via NFT.Storage (real)
+Upload images to IPFS via NFT.Storage (real), an IPFS node or the local pin server
 """
-import requests
+import io
 import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Callable, Deque, Iterable, Iterator, Optional, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from ipfs_car import CarDirectory, CarStream
+from ipfs_cid import bytes_cid, file_cid
+from storage_backends import CAR_TYPE, StorageBackend, backend_from_env
+from utils import pooled_session, retry
+
+PIN_INDEX_FILE = Path("ipfs_pins.json")
+
+# Uploads are read and sent UPLOAD_CHUNK bytes at a time. Rather than a
+# total deadline, an upload fails when the link stalls for STALL_TIMEOUT
+# or averages under MIN_THROUGHPUT over THROUGHPUT_WINDOW seconds, so a
+# big image on a slow but working connection still gets through.
+UPLOAD_CHUNK = 64 * 1024
+CONNECT_TIMEOUT = 10.0
+STALL_TIMEOUT = 30.0
+MIN_THROUGHPUT = 8 * 1024  # bytes/s
+THROUGHPUT_WINDOW = 30.0
+SERVER_RATE = 1024 * 1024  # bytes/s the service takes to process what it got
+PROGRESS_INTERVAL = 0.1
+
+# Rate limiting: at most MAX_PER_HOST uploads in flight to one service;
+# a 429 pauses them all for Retry-After, or an exponential backoff
+MAX_PER_HOST = 4
+RATE_LIMIT_RETRIES = 5
+BACKOFF_BASE = 1.0
+
+# Dropped connections and 5xx answers are retried through utils.retry
+UPLOAD_ATTEMPTS = 3
+RETRY_DELAY = 2.0
+
+ProgressCallback = Callable[[int, int], None]  # (bytes sent, total)
+
+
+class IPFSUploadError(Exception):
+    """Upload aborted"""
+    pass
+
+
+class _HostLimiter:
+    """Upload slots for one host, and the time it asked us to wait until"""
+    
+    def __init__(self, limit: int):
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+    
+    @contextmanager
+    def slot(self):
+        with self._slots:
+            while True:
+                with self._lock:
+                    delay = self._resume_at - time.monotonic()
+                if delay <= 0:
+                    break
+                time.sleep(delay)
+            yield
+    
+    def back_off(self, delay: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+
+
+class _UploadBody:
+    """
+    Request body read in UPLOAD_CHUNK pieces (memory stays flat), with
+    progress reports and the minimum-throughput check
+    """
+    
+    def __init__(self, source, length: int, on_progress: Optional[ProgressCallback] = None):
+        self.source = source
+        self.length = length
+        self.on_progress = on_progress
+        self.sent = 0
+        self._samples: Deque[Tuple[float, int]] = deque([(time.monotonic(), 0)])
+        self._reported = 0.0
+    
+    def __len__(self) -> int:
+        return self.length
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(UPLOAD_CHUNK if size is None or size < 0 else min(size, UPLOAD_CHUNK))
+        self.sent += len(data)
+        now = time.monotonic()
+        self._check_throughput(now)
+        if self.on_progress and (not data or now - self._reported >= PROGRESS_INTERVAL):
+            self._reported = now
+            self.on_progress(self.sent, self.length)
+        return data
+    
+    def _check_throughput(self, now: float) -> None:
+        if now - self._samples[-1][0] >= 1.0:
+            self._samples.append((now, self.sent))
+        # Oldest sample kept is the newest one at least a window old
+        while len(self._samples) > 1 and now - self._samples[1][0] >= THROUGHPUT_WINDOW:
+            self._samples.popleft()
+        start, sent = self._samples[0]
+        if now - start >= THROUGHPUT_WINDOW and (self.sent - sent) / (now - start) < MIN_THROUGHPUT:
+            raise IPFSUploadError(f"Upload too slow: {(self.sent - sent) / (now - start) / 1024:.1f} KiB/s")
+
+
+class PinIndex:
+    """
+    Content already pinned, per backend, keyed by the locally computed
+    CID. Uploading is skipped for anything found here, so minting the
+    same artwork (or identical metadata) twice sends zero bytes.
+    """
+    
+    def __init__(self, index_file: Path = PIN_INDEX_FILE):
+        self.index_file = index_file
+        self._lock = threading.Lock()
+        self._pins: Dict[str, Dict[str, Dict]] = {}
+        self._load()
+    
+    def get(self, cid: str, backend: str) -> Optional[str]:
+        """ipfs:// URI the content was pinned under on `backend`, if it was"""
+        with self._lock:
+            pin = self._pins.get(backend, {}).get(cid)
+        return pin["uri"] if pin else None
+    
+    def add(self, cid: str, backend: str, uri: str, size: int) -> None:
+        with self._lock:
+            self._pins.setdefault(backend, {})[cid] = {"uri": uri, "size": size, "pinned_at": time.time()}
+            data = json.dumps(self._pins)
+        try:
+            self.index_file.write_text(data, encoding="utf-8")
+        except Exception as e:
+            print(f"⚠️ Pin index save error: {e}")
+    
+    def _load(self) -> None:
+        if not self.index_file.exists():
+            return
+        try:
+            pins = json.loads(self.index_file.read_text(encoding="utf-8"))
+            if any("uri" in pin for pin in pins.values()):
+                pins = {"nft.storage": pins}  # written before there were backends
+            self._pins = pins
+        except Exception as e:
+            print(f"⚠️ Pin index load error: {e}")
+
 
 class IPFSManager:
-    def __init__(self):
-        self.nft_storage_url = "https://api.nft.storage/upload"
-        # ⬇️ API KEY خودت رو اینجا بذار از nft.storage
-        self.nft_storage_key = "eyJhbGciOiJIUzI1NiIs..."  # توکن خودت
+    def __init__(self, backend: StorageBackend = None):
+        # ⚠️ API KEY خودت رو اینجا بذار از 
+        self.nft_storage_key = os.environ.get("VANTA_NFT_STORAGE_KEY", "eyJhbGciOiJIUzI1NiIs...")  # توکن خودت
+        if backend is None:
+            has_key = self.nft_storage_key and self.nft_storage_key != "eyJhbGciOiJIUzI1NiIs..."
+            backend = backend_from_env(self.nft_storage_key if has_key else None)
+        self.backend = backend  # None: mock mode
+        self._pins: Optional[PinIndex] = None
+        self._session = None
+        self.max_per_host = MAX_PER_HOST
+        self._limiters: Dict[str, _HostLimiter] = {}
+        self._limiters_lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """Shared keep-alive session: one TLS handshake for many uploads"""
+        if self._session is None:
+            self._session = pooled_session(pool_size=4)
+        return self._session
     
-    def upload_image(self, image_path: str) -> Optional[str]:
-        """Upload image to IPFS, return CID"""
+    @property
+    def pins(self) -> PinIndex:
+        if self._pins is None:
+            self._pins = PinIndex()
+        return self._pins
+    
+    @property
+    def mock_mode(self) -> bool:
+        return self.backend is None
+    
+    def _pinned_uri(self, cid: str) -> Optional[str]:
+        return None if self.backend is None else self.pins.get(cid, self.backend.name)
+    
+    def upload_image(self, image_path: str, on_progress: ProgressCallback = None) -> Optional[str]:
+        """Upload image to IPFS, return ipfs:// URI"""
         if not Path(image_path).exists():
             print(f"❌ File not found: {image_path}")
             return None
         
-        if not self.nft_storage_key or self.nft_storage_key == "eyJhbGciOiJIUzI1NiIs...":
-            print("⚠️ No API key - using mock mode")
-            return self._mock_upload(image_path)
+        cid = file_cid(image_path)
+        pinned = self._pinned_uri(cid)
+        if pinned:
+            print(f"♻️ Already pinned: {cid}")
+            return pinned
         
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.nft_storage_key}",
-                "Accept": "application/json"
-            }
-            
-            with open(image_path, 'rb') as f:
-                response = requests.post(
-                    self.nft_storage_url,
-                    headers=headers,
-                    data=f,
-                    timeout=60
-                )
-            
-            if response.status_code == 200:
-                cid = response.json()['value']['cid']
-                print(f"✅ Uploaded to NFT.Storage: {cid}")
-                return f"ipfs://{cid}"
-            else:
-                print(f"❌ NFT.Storage error: {response.text}")
-                return None
-                
-        except Exception as e:
-            print(f"❌ Upload failed: {e}")
+        if self.mock_mode:
+            print(f"🧪 No storage backend - mock mode, local CID: {cid}")
+            return f"ipfs://{cid}"
+        
+        size = Path(image_path).stat().st_size
+        remote_cid = self._upload(lambda: open(image_path, 'rb'), size, None,
+                                  label="Image", on_progress=on_progress)
+        if not remote_cid:
             return None
-    
-    def _mock_upload(self, image_path: str) -> str:
-        """Mock upload for testing"""
-        import hashlib
-        fake_cid = hashlib.md5(image_path.encode()).hexdigest()[:16]
-        print(f"🧪 Mock IPFS CID: {fake_cid}")
-        return f"ipfs://{fake_cid}"
+        uri = self._pinned(cid, remote_cid, size)
+        print(f"✅ Uploaded to {self.backend.name}: {uri}")
+        return uri
     
     def create_metadata(self, name: str, description: str, image_uri: str, 
                        attributes: list = None) -> Dict:
@@ -70,36 +227,200 @@ class IPFSManager:
     
     def upload_metadata(self, metadata: Dict) -> Optional[str]:
         """Upload metadata JSON to IPFS"""
-        if not self.nft_storage_key or self.nft_storage_key == "eyJhbGciOiJIUzI1NiIs...":
-            import hashlib
-            fake_cid = hashlib.md5(json.dumps(metadata).encode()).hexdigest()[:16]
-            return f"ipfs://{fake_cid}"
+        # The exact bytes that are hashed are the bytes that are sent
+        payload = json.dumps(metadata).encode("utf-8")
+        cid = bytes_cid(payload)
+        pinned = self._pinned_uri(cid)
+        if pinned:
+            print(f"♻️ Metadata already pinned: {cid}")
+            return pinned
         
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.nft_storage_key}",
-                "Content-Type": "application/json"
-            }
+        if self.mock_mode:
+            return f"ipfs://{cid}"
+        
+        remote_cid = self._upload(lambda: io.BytesIO(payload), len(payload), "application/json", label="Metadata")
+        if not remote_cid:
+            return None
+        uri = self._pinned(cid, remote_cid, len(payload))
+        print(f"✅ Metadata uploaded: {uri}")
+        return uri
+    
+    def upload_bundle(self, image_path: str, name: str, description: str,
+                      attributes: list = None, on_progress: ProgressCallback = None) -> Optional[Tuple[str, str]]:
+        """
+        Upload an image and its metadata in one request, as a CAR holding
+        a directory with both. Returns (image_uri, metadata_uri).
+        """
+        results = self.upload_collection([{
+            "image_path": image_path, "name": name,
+            "description": description, "attributes": attributes,
+        }], nested=False, on_progress=on_progress)
+        return results[0] if results else None
+    
+    def upload_collection(self, artworks: List[Dict], nested: bool = True,
+                          on_progress: ProgressCallback = None) -> Optional[List[Tuple[str, str]]]:
+        """
+        Upload many artworks ({image_path, name, description, attributes})
+        as one CAR, each in its own numbered directory. The metadata points
+        at the image's own CID; returns [(image_uri, metadata_uri)] in order.
+        Images and metadata already in the pin index are left out of the CAR.
+        """
+        root = CarDirectory()
+        # Per artwork: [image_uri, metadata_uri, metadata path in the CAR]
+        entries = []
+        # (local CID, path in the CAR or None for ipfs://<cid>, size), pinned once uploaded
+        new_pins = []
+        for i, art in enumerate(artworks):
+            image_path = Path(art["image_path"])
+            if not image_path.exists():
+                print(f"❌ File not found: {image_path}")
+                return None
+            folder = root.add_directory(str(i)) if nested else root
+            prefix = f"{i}/" if nested else ""
             
-            response = requests.post(
-                self.nft_storage_url,
-                headers=headers,
-                json=metadata,
-                timeout=30
-            )
+            image_name = "image" + image_path.suffix.lower()
+            image_cid = folder.add_file(image_name, image_path)
+            image_uri = self._pinned_uri(image_cid)
+            if image_uri:
+                print(f"♻️ Already pinned: {image_cid}")
+                folder.remove(image_name)
+            else:
+                image_uri = f"ipfs://{image_cid}"
+                new_pins.append((image_cid, None, image_path.stat().st_size))
             
-            if response.status_code == 200:
-                cid = response.json()['value']['cid']
-                print(f"✅ Metadata uploaded: {cid}")
-                return f"ipfs://{cid}"
+            metadata = self.create_metadata(art["name"], art["description"], image_uri,
+                                            art.get("attributes"))
+            payload = json.dumps(metadata).encode("utf-8")
+            metadata_cid = folder.add_bytes("metadata.json", payload)
+            metadata_uri = self._pinned_uri(metadata_cid)
+            if metadata_uri:
+                print(f"♻️ Metadata already pinned: {metadata_cid}")
+                folder.remove("metadata.json")
             else:
-                print(f"❌ Metadata upload error: {response.text}")
+                new_pins.append((metadata_cid, prefix + "metadata.json", len(payload)))
+            if nested and not folder.entries:
+                root.remove(str(i))
+            entries.append([image_uri, metadata_uri, prefix + "metadata.json"])
+        
+        if not root.entries:
+            return [(image_uri, metadata_uri) for image_uri, metadata_uri, _ in entries]
+        
+        car = CarStream(root)
+        uri = self._pinned_uri(car.root)
+        if uri:
+            print(f"♻️ Bundle already pinned: {car.root}")
+        elif self.mock_mode:
+            print(f"🧪 No storage backend - mock mode, bundle root: {car.root}")
+            uri = f"ipfs://{car.root}"
+        else:
+            remote_cid = self._upload(lambda: CarStream(root), len(car), CAR_TYPE, label="Bundle",
+                                      on_progress=on_progress)
+            if not remote_cid:
+                return None
+            uri = self._pinned(car.root, remote_cid, len(car))
+            for cid, path, size in new_pins:
+                self.pins.add(cid, self.backend.name, f"{uri}/{path}" if path else f"ipfs://{cid}", size)
+            print(f"✅ Bundle uploaded ({len(artworks)} artworks, {len(car)} bytes): {uri}")
+        return [(image_uri, metadata_uri or f"{uri}/{path}") for image_uri, metadata_uri, path in entries]
+    
+    def upload_many(self, paths: Iterable[str], workers: int = MAX_PER_HOST) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Upload images concurrently on `workers` threads (still at most
+        max_per_host requests at a time to the service). Yields (path,
+        ipfs:// URI or None) as each one finishes, not in input order.
+        """
+        paths = iter(paths)
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vanta-upload") as pool:
+            try:
+                while True:
+                    # Bounded window: a long list isn't all queued at once
+                    for path in paths:
+                        running[pool.submit(self.upload_image, path)] = path
+                        if len(running) >= workers * 2:
+                            break
+                    if not running:
+                        return
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = running.pop(future)
+                        try:
+                            yield path, future.result()
+                        except Exception as e:
+                            print(f"❌ Upload failed: {e}")
+                            yield path, None
+            finally:
+                # Abandoned mid-way: drop whatever hasn't started
+                for future in running:
+                    future.cancel()
+    
+    def _limiter(self, url: str) -> _HostLimiter:
+        host = urlsplit(url).netloc
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = _HostLimiter(self.max_per_host)
+            return self._limiters[host]
+    
+    def _upload(self, open_source: Callable, length: int, content_type: Optional[str], label: str,
+                on_progress: ProgressCallback = None) -> Optional[str]:
+        """
+        Stream `length` bytes of open_source() to the backend; returns the
+        CID it was stored under. The source is reopened for every attempt.
+        on_progress(sent, total) runs on this thread.
+        """
+        backend = self.backend
+        limiter = self._limiter(backend.url)
+        try:
+            for attempt in range(RATE_LIMIT_RETRIES + 1):
+                response = self._send(backend, limiter, open_source, length, content_type, on_progress)
+                if response.status_code == 429 and attempt < RATE_LIMIT_RETRIES:
+                    delay = _retry_after(response) or BACKOFF_BASE * 2 ** attempt * (0.5 + random.random())
+                    print(f"⏳ {label} upload rate limited, retrying in {delay:.1f}s")
+                    limiter.back_off(delay)
+                    continue
+                if response.status_code == 200:
+                    return backend.cid(response, content_type)
+                print(f"❌ {label} upload error: {response.text}")
                 return None
-                
         except Exception as e:
-            print(f"❌ Metadata upload failed: {e}")
+            print(f"❌ {label} upload failed: {e}")
             return None
+    
+    @retry(max_attempts=UPLOAD_ATTEMPTS, delay=RETRY_DELAY)
+    def _send(self, backend: StorageBackend, limiter: _HostLimiter, open_source: Callable,
+              length: int, content_type: Optional[str], on_progress: ProgressCallback):
+        """One request; raises on a dropped connection or a 5xx so it is retried"""
+        with limiter.slot():
+            source = open_source()
+            try:
+                response = backend.post(
+                    self.session, _UploadBody(source, length, on_progress), length, content_type,
+                    # Waiting for the answer also covers the service digesting the upload
+                    timeout=(CONNECT_TIMEOUT, STALL_TIMEOUT + length / SERVER_RATE)
+                )
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+        if response.status_code >= 500:
+            raise IPFSUploadError(f"{backend.name} answered {response.status_code}")
+        return response
+    
+    def _pinned(self, local_cid: str, remote_cid: str, size: int) -> str:
+        """Record a finished upload; the service's CID is the one used"""
+        if remote_cid != local_cid:
+            print(f"⚠️ Service CID {remote_cid} differs from local {local_cid}")
+        uri = f"ipfs://{remote_cid}"
+        self.pins.add(local_cid, self.backend.name, uri, size)
+        return uri
+
+
+def _retry_after(response) -> Optional[float]:
+    """Retry-After in seconds (the HTTP-date form is ignored)"""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
 
 
 # Singleton
-ipfs_manager = IPFSManager()
\ No newline at end of file
+ipfs_manager = IPFSManager()
@@ -0,0 +1,195 @@
+"""
+Vanta - Keystore
+Web3 Secret Storage (v3) encryption for wallet secrets, and the
+in-memory session that keeps an unlocked wallet usable
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+# scrypt runs with r=8, p=1, so it needs n KiB of memory. Unlock takes
+# about 50 / 200 / 950 ms for low / standard / high on one desktop core;
+# budget roughly 5-10x that on an entry-level phone.
+KDF_PROFILES: Dict[str, Dict[str, Any]] = {
+    "low": {"kdf": "scrypt", "n": 2 ** 14},       # phones, old tablets
+    "standard": {"kdf": "scrypt", "n": 2 ** 16},  # laptops, recent phones
+    "high": {"kdf": "scrypt", "n": 2 ** 18},      # desktops (geth's default)
+    "pbkdf2": {"kdf": "pbkdf2", "c": 600_000},    # where scrypt's memory is a problem
+}
+SCRYPT_R = 8
+SCRYPT_P = 1
+DKLEN = 32
+
+# Secret kinds stored by the app; "key" files are plain v3 keystores
+SECRET_KEY = "key"
+SECRET_MNEMONIC = "mnemonic"
+
+
+class KeystoreError(Exception):
+    """Keystore encryption/decryption error"""
+    pass
+
+
+def default_profile() -> str:
+    """VANTA_KDF_PROFILE if set, else 'low' on mobile and 'standard' elsewhere"""
+    name = os.environ.get("VANTA_KDF_PROFILE", "")
+    if name in KDF_PROFILES:
+        return name
+    if "ANDROID_ARGUMENT" in os.environ or sys.platform == "ios":
+        return "low"
+    return "standard"
+
+
+def _derive(password: bytes, kdf: str, params: Dict[str, Any]) -> bytes:
+    salt = bytes.fromhex(params["salt"])
+    if kdf == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r, dklen=params["dklen"])
+    if kdf == "pbkdf2":
+        if params.get("prf", "hmac-sha256") != "hmac-sha256":
+            raise KeystoreError(f"Unsupported PRF: {params['prf']}")
+        return hashlib.pbkdf2_hmac("sha256", password, salt, params["c"], params["dklen"])
+    raise KeystoreError(f"Unsupported KDF: {kdf}")
+
+
+def encrypt_secret(secret: bytes, password: str, profile: str = None,
+                   kind: str = SECRET_KEY, address: str = None) -> Dict[str, Any]:
+    """
+    Encrypt `secret` into a v3 keystore dict (aes-128-ctr, keccak MAC).
+    Slow on purpose: call it off the UI thread.
+    """
+    from eth_keyfile.keyfile import encrypt_aes_ctr
+    from eth_utils import keccak
+
+    settings = dict(KDF_PROFILES[profile or default_profile()])
+    kdf = settings.pop("kdf")
+    params = dict(settings, dklen=DKLEN, salt=os.urandom(16).hex())
+    if kdf == "scrypt":
+        params.update(r=SCRYPT_R, p=SCRYPT_P)
+    else:
+        params["prf"] = "hmac-sha256"
+
+    derived = _derive(password.encode("utf-8"), kdf, params)
+    iv = os.urandom(16)
+    ciphertext = encrypt_aes_ctr(secret, derived[:16], int.from_bytes(iv, "big"))
+    keystore = {
+        "crypto": {
+            "cipher": "aes-128-ctr",
+            "cipherparams": {"iv": iv.hex()},
+            "ciphertext": ciphertext.hex(),
+            "kdf": kdf,
+            "kdfparams": params,
+            "mac": keccak(derived[16:32] + ciphertext).hex(),
+        },
+        "id": str(uuid.uuid4()),
+        "version": 3,
+    }
+    if address:
+        keystore["address"] = address.lower().replace("0x", "")
+    if kind != SECRET_KEY:
+        keystore["vanta"] = {"secret": kind}
+    return keystore
+
+
+def decrypt_secret(keystore: Dict[str, Any], password: str) -> bytes:
+    """Secret of a v3 keystore; raises KeystoreError on a wrong password"""
+    from eth_keyfile.keyfile import decrypt_aes_ctr
+    from eth_utils import keccak
+
+    if keystore.get("version") != 3:
+        raise KeystoreError(f"Unsupported keystore version: {keystore.get('version')}")
+    crypto = keystore.get("crypto") or keystore.get("Crypto")
+    if crypto.get("cipher") != "aes-128-ctr":
+        raise KeystoreError(f"Unsupported cipher: {crypto.get('cipher')}")
+
+    derived = _derive(password.encode("utf-8"), crypto["kdf"], crypto["kdfparams"])
+    ciphertext = bytes.fromhex(crypto["ciphertext"])
+    if keccak(derived[16:32] + ciphertext).hex().replace("0x", "") != crypto["mac"].replace("0x", ""):
+        raise KeystoreError("Wrong password")
+    iv = int(crypto["cipherparams"]["iv"], 16)
+    return decrypt_aes_ctr(ciphertext, derived[:16], iv)
+
+
+def secret_kind(keystore: Dict[str, Any]) -> str:
+    return (keystore.get("vanta") or {}).get("secret", SECRET_KEY)
+
+
+class KeySession:
+    """
+    Whatever an unlock produced (keys, keyrings), kept in memory so
+    signing doesn't pay the KDF again. Dropped on lock(), or once it has
+    gone unused for `idle_timeout` seconds (None = until lock()).
+    """
+
+    def __init__(self, idle_timeout: Optional[float] = 300.0,
+                 on_expire: Optional[Callable[[], None]] = None):
+        self.idle_timeout = idle_timeout
+        self.on_expire = on_expire
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._last_used = 0.0
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._value is not None and not self._expired()
+
+    def open(self, value: Any) -> None:
+        with self._lock:
+            self._value = value
+            self._last_used = time.monotonic()
+        self._arm(self.idle_timeout)
+
+    def get(self) -> Any:
+        """The unlocked value (None when locked); counts as use"""
+        with self._lock:
+            if self._value is None:
+                return None
+            if not self._expired():
+                self._last_used = time.monotonic()
+                return self._value
+        self.lock()
+        return None
+
+    def lock(self) -> None:
+        with self._lock:
+            was_open = self._value is not None
+            self._value = None
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        if was_open and self.on_expire:
+            self.on_expire()
+
+    def _expired(self) -> bool:
+        return (self.idle_timeout is not None
+                and time.monotonic() - self._last_used > self.idle_timeout)
+
+    def _arm(self, delay: Optional[float]) -> None:
+        """One timer per session, re-armed for the remaining idle time"""
+        if delay is None:
+            return
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _check(self) -> None:
+        with self._lock:
+            if self._value is None:
+                return
+            remaining = self.idle_timeout - (time.monotonic() - self._last_used)
+        if remaining > 0:
+            self._arm(remaining + 0.01)
+        else:
+            self.lock()
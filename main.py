@@ -19,7 +19,10 @@ from kivy.uix.widget import Widget
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
-from kivy.graphics import Rectangle, Line, Color, RoundedRectangle
+from kivy.graphics import (
+    Rectangle, Line, Color, RoundedRectangle, Fbo, ClearColor, ClearBuffers,
+    InstructionGroup, PushMatrix, PopMatrix, Translate, Scale
+)
 from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.factory import Factory
@@ -29,14 +32,18 @@ from kivy.core.clipboard import Clipboard
 from kivy.properties import ListProperty, StringProperty, ObjectProperty
 
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Callable
 
 # App modules
 from wallet_manager import wallet_manager, NETWORKS
-from ipfs_manager import ipfs_manager
-from nft_contract import get_contract_manager
+from balance_cache import get_balance_cache
+from mint_queue import get_mint_queue, STAGE_CONFIRMED, STAGE_FAILED
+from stroke_buffer import StrokeBuffer
+from stroke_log import Stroke, StrokeLog
+from art_export import encode_png, export_async, TiledExportJob
 from utils import ErrorHandler, log_execution
 
 # Theme
@@ -149,48 +156,250 @@ Builder.load_string('''
 class PaintWidget(Widget):
     line_color = ListProperty([0.8, 0.0, 1.0, 1])
     line_width = 4
+    min_point_distance = 2.0   # px; closer samples are dropped
+    chunk_points = 128         # max points re-tessellated per move
+    bg_color = (0.03, 0.03, 0.05, 1)
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.bind(pos=self._update_bg, size=self._update_bg)
-        self._update_bg()
-    
-    def _update_bg(self, *args):
-        self.canvas.before.clear()
+        self.history = StrokeLog()
+        # Finished strokes live in one offscreen texture; only strokes
+        # still under a finger are kept as canvas instructions.
+        # All points are stored in widget-local coordinates.
+        self._layer = None
         with self.canvas.before:
-            Color(0.03, 0.03, 0.05, 1)
-            Rectangle(pos=self.pos, size=self.size)
+            Color(1, 1, 1, 1)
+            self._layer_rect = Rectangle(pos=self.pos, size=self.size)
+        with self.canvas:
+            PushMatrix()
+            self._live_offset = Translate(*self.pos)
+            self._live = InstructionGroup()
+            PopMatrix()
+        self.bind(pos=self._update_layer_pos, size=self._resize_layer)
+        self._resize_layer()
+    
+    def _update_layer_pos(self, *args):
+        self._layer_rect.pos = self.pos
+        self._live_offset.xy = self.pos
+    
+    def _resize_layer(self, *args):
+        """Reallocate the layer and repaint it from the stroke log"""
+        size = (max(int(self.width), 1), max(int(self.height), 1))
+        self._layer = Fbo(size=size)
+        self._layer.add_reload_observer(self._on_layer_reload)
+        self.history.size = size
+        self._render_history()
+        self._layer_rect.texture = self._layer.texture
+        self._layer_rect.pos = self.pos
+        self._layer_rect.size = size
+    
+    def _on_layer_reload(self, *args):
+        # GL context was lost (e.g. Android resume): texture is blank
+        Clock.schedule_once(lambda dt: self._render_history(), 0)
+    
+    def _flush_layer(self):
+        """Render pending layer instructions once, then drop them"""
+        self._layer.draw()
+        self._layer.clear()
+    
+    def _add_stroke_instructions(self, stroke: Stroke):
+        Color(*stroke.color)
+        Line(
+            points=stroke.points.tolist(),
+            width=stroke.width,
+            cap='round',
+            joint='round'
+        )
+    
+    def _bake_stroke(self, stroke: Stroke):
+        """Rasterize one finished stroke into the layer"""
+        with self._layer:
+            self._add_stroke_instructions(stroke)
+        self._flush_layer()
+    
+    def _render_history(self):
+        """Repaint the layer from scratch with every visible stroke"""
+        with self._layer:
+            ClearColor(*self.bg_color)
+            ClearBuffers()
+            for stroke in self.history:
+                self._add_stroke_instructions(stroke)
+        self._flush_layer()
+    
+    def _new_line(self, group, color, points):
+        """Start a Line chunk for the active stroke"""
+        group.add(Color(*color))
+        line = Line(
+            points=points,
+            width=self.line_width,
+            cap='round',
+            joint='round'
+        )
+        group.add(line)
+        return line
     
     def on_touch_down(self, touch):
         if not self.collide_point(*touch.pos):
             return False
         
-        with self.canvas:
-            Color(*self.line_color)
-            touch.ud['line'] = Line(
-                points=[touch.x, touch.y],
-                width=self.line_width,
-                cap='round',
-                joint='round'
-            )
+        stroke = StrokeBuffer(min_distance=self.min_point_distance)
+        stroke.append(touch.x - self.x, touch.y - self.y)
+        group = InstructionGroup()
+        self._live.add(group)
+        touch.ud['stroke'] = stroke
+        touch.ud['group'] = group
+        touch.ud['color'] = list(self.line_color)
+        touch.ud['chunk_start'] = 0
+        touch.ud['line'] = self._new_line(group, touch.ud['color'], stroke.segment(0))
         return True
     
     def on_touch_move(self, touch):
-        if 'line' in touch.ud:
-            touch.ud['line'].points += [touch.x, touch.y]
+        if 'line' not in touch.ud:
+            return
+        
+        stroke = touch.ud['stroke']
+        if not stroke.append(touch.x - self.x, touch.y - self.y):
+            return
+        
+        # Only the current chunk is re-uploaded; once full, it is left
+        # as-is and a new chunk continues from its last point.
+        start = touch.ud['chunk_start']
+        if len(stroke) - start > self.chunk_points:
+            start = len(stroke) - 2
+            touch.ud['chunk_start'] = start
+            touch.ud['line'] = self._new_line(
+                touch.ud['group'], touch.ud['color'], stroke.segment(start)
+            )
+        else:
+            touch.ud['line'].points = stroke.segment(start)
+    
+    def on_touch_up(self, touch):
+        buffer = touch.ud.pop('stroke', None)
+        if buffer is None:
+            return False
+        
+        stroke = Stroke.create(touch.ud['color'], self.line_width, buffer.points())
+        self.history.add(stroke)
+        self._bake_stroke(stroke)
+        self._live.remove(touch.ud.pop('group'))
+        touch.ud.pop('line', None)
+        return True
+    
+    def undo(self):
+        if self.history.undo() is not None:
+            self._render_history()
+    
+    def redo(self):
+        stroke = self.history.redo()
+        if stroke is not None:
+            self._bake_stroke(stroke)
     
     def clear_canvas(self):
-        self.canvas.clear()
-        self._update_bg()
+        self._live.clear()
+        self.history.clear()
+        self._render_history()
+    
+    def save_strokes(self, filename: str) -> bool:
+        """Save the vector stroke log"""
+        try:
+            self.history.save(filename)
+            return True
+        except Exception as e:
+            print(f"Stroke save error: {e}")
+            return False
+    
+    def load_strokes(self, filename: str) -> bool:
+        """Replace the artwork with a saved stroke log"""
+        try:
+            history = StrokeLog.load(filename)
+        except Exception as e:
+            print(f"Stroke load error: {e}")
+            return False
+        self._live.clear()
+        self.history = history
+        self.history.size = self._layer.size
+        self._render_history()
+        return True
     
     def export(self, filename: str) -> bool:
-        """Export to PNG"""
+        """Export to PNG (blocking)"""
         try:
-            self.export_to_png(filename)
+            width, height = self._layer.size
+            encode_png(self._layer.pixels, width, height, filename)
             return True
         except Exception as e:
             print(f"Export error: {e}")
             return False
+    
+    def export_async(self, filename: str, on_progress=None, on_done=None):
+        """
+        Read the layer back once, then compress on a worker thread.
+        Callbacks run on the worker thread.
+        """
+        width, height = self._layer.size
+        export_async(self._layer.pixels, width, height, filename, on_progress, on_done)
+    
+    def export_supersampled(self, filename: str, scale: float = 2, tile_size: int = 1024,
+                            on_progress=None, on_done=None, on_error=None):
+        """
+        Re-render the stroke log at `scale`x, one tile per frame, while a
+        worker thread streams finished bands into the PNG. Rendering stops
+        as soon as the encoder gives up; on_error gets the reason.
+        """
+        width = int(self._layer.size[0] * scale)
+        height = int(self._layer.size[1] * scale)
+        job = TiledExportJob(filename, width, height, on_progress, on_done, on_error)
+        strokes = list(self.history)
+        bounds = [stroke.bounds() for stroke in strokes]
+        tiles = iter([(top, x) for top in range(0, height, tile_size)
+                                for x in range(0, width, tile_size)])
+        fbo = Fbo(size=(tile_size, tile_size))
+        
+        def render_next(dt):
+            if job.finished:
+                return  # encoder failed (I/O error, disk full...): on_done/on_error have run
+            if not job.accepting():
+                Clock.schedule_once(render_next, 0)
+                return
+            try:
+                top, x = next(tiles)
+            except StopIteration:
+                return
+            
+            tile_w = min(tile_size, width - x)
+            rows = min(tile_size, height - top)
+            y0 = height - top - rows  # GL origin is bottom-left
+            left, right = x / scale, (x + tile_w) / scale
+            bottom, top_edge = y0 / scale, (y0 + rows) / scale
+            
+            try:
+                with fbo:
+                    ClearColor(*self.bg_color)
+                    ClearBuffers()
+                    PushMatrix()
+                    Translate(-x, -y0)
+                    Scale(scale, scale, 1)
+                    for stroke, (bx0, by0, bx1, by1) in zip(strokes, bounds):
+                        r = stroke.width
+                        if bx1 + r < left or bx0 - r > right or by1 + r < bottom or by0 - r > top_edge:
+                            continue
+                        self._add_stroke_instructions(stroke)
+                    PopMatrix()
+                fbo.draw()
+                fbo.clear()
+                
+                pixels = fbo.pixels
+                stride = tile_size * 4
+                tile = b''.join(pixels[r * stride:r * stride + tile_w * 4] for r in range(rows))
+            except Exception as e:
+                print(f"Tile render error: {e}")
+                job.fail(e)
+                return
+            
+            job.put_tile(x, tile_w, rows, tile, x + tile_w >= width)
+            Clock.schedule_once(render_next, 0)
+        
+        Clock.schedule_once(render_next, 0)
 
 
 # ===========================================================
@@ -217,6 +426,65 @@ class BaseScreen(Screen):
     def show_error(self, message: str):
         ErrorHandler.show_error_popup(self, message)
     
+    def ask_password(self, title: str, on_password: Callable[[str], None], confirm: bool = False,
+                     message: str = None):
+        """Password popup; on_password(password) runs on the UI thread"""
+        content = BoxLayout(orientation='vertical', spacing=10, padding=15)
+        if message:
+            content.add_widget(Label(text=message, color=(1, 0.4, 0.4, 1), font_size='12sp'))
+        pw_input = Factory.CyberInput(password=True, hint_text='Password')
+        content.add_widget(pw_input)
+        repeat_input = None
+        if confirm:
+            repeat_input = Factory.CyberInput(password=True, hint_text='Repeat password')
+            content.add_widget(repeat_input)
+        
+        popup = Popup(
+            title=title,
+            content=content,
+            size_hint=(0.7, (0.4 if confirm else 0.3) + (0.1 if message else 0)),
+            background_color=(0.05, 0.05, 0.1, 0.95)
+        )
+        
+        def submit(*args):
+            password = pw_input.text
+            if not password:
+                return
+            if repeat_input is not None and repeat_input.text != password:
+                self.show_error("Passwords don't match")
+                return
+            popup.dismiss()
+            on_password(password)
+        
+        pw_input.bind(on_text_validate=submit)
+        btn_box = BoxLayout(spacing=10, size_hint_y=0.6)
+        btn_box.add_widget(Factory.NeonButton(text='Cancel', on_press=popup.dismiss))
+        btn_box.add_widget(Factory.NeonButtonPrimary(text='OK', on_press=submit))
+        content.add_widget(btn_box)
+        popup.open()
+    
+    def unlock_wallet(self, then: Callable[[], None]):
+        """Run `then` now if the wallet can sign, else once it is unlocked"""
+        if not wallet_manager.is_locked:
+            return then()
+        
+        def on_password(password):
+            self.show_loading("Unlocking...")
+            
+            def done(error):
+                def finish(dt):
+                    self.hide_loading()
+                    if error:
+                        self.show_error(f"Unlock failed: {error}")
+                    else:
+                        then()
+                Clock.schedule_once(finish, 0)
+            
+            # The KDF takes up to seconds on slow devices: never on the UI thread
+            wallet_manager.unlock_async(password, done)
+        
+        self.ask_password('Unlock Wallet', on_password)
+    
     def animate_entry(self, widgets, delay=0.1):
         """Animate widgets on screen entry"""
         for i, widget in enumerate(widgets):
@@ -292,10 +560,17 @@ class HomeScreen(BaseScreen):
 # Paint Screen
 # ===========================================================
 class PaintScreen(BaseScreen):
+    export_scale = 1  # >1 renders the stroke log supersampled, in tiles
+    
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'paint'
+        self._exporting = False
+        self._unlock_asked = False
+        self.mint_queue = get_mint_queue(wallet_manager)
         self._build_ui()
+        self.mint_queue.add_listener(self._on_job_update)
+        self.mint_queue.add_progress_listener(self._on_upload_progress)
     
     def _build_ui(self):
         layout = BoxLayout(orientation='vertical')
@@ -305,9 +580,11 @@ class PaintScreen(BaseScreen):
         
         back_btn = Factory.BackBtn(on_press=lambda x: self._go_back())
         title = Label(text='Create Art', font_size='18sp', bold=True, color=(1,1,1,1))
+        self.queue_label = Label(text='', font_size='13sp', color=(0.5, 0.8, 1, 1), size_hint_x=0.4)
         
         toolbar.add_widget(back_btn)
         toolbar.add_widget(title)
+        toolbar.add_widget(self.queue_label)
         
         # Paint area
         self.paint_area = PaintWidget(size_hint=(1, 0.75))
@@ -329,9 +606,13 @@ class PaintScreen(BaseScreen):
         # Bottom controls
         controls = BoxLayout(size_hint=(1, 0.12), padding=10, spacing=10)
         
+        undo_btn = Factory.NeonButton(text='Undo', on_press=lambda x: self.paint_area.undo())
+        redo_btn = Factory.NeonButton(text='Redo', on_press=lambda x: self.paint_area.redo())
         clear_btn = Factory.NeonButton(text='Clear', on_press=lambda x: self.paint_area.clear_canvas())
         self.save_btn = Factory.NeonButtonPrimary(text='Save & Mint', on_press=self._save_and_mint)
         
+        controls.add_widget(undo_btn)
+        controls.add_widget(redo_btn)
         controls.add_widget(clear_btn)
         controls.add_widget(self.save_btn)
         
@@ -347,88 +628,100 @@ class PaintScreen(BaseScreen):
     
     @log_execution
     def _save_and_mint(self, instance):
-        """Handle save and mint flow"""
-        if self.save_btn.text != "Save & Mint":
+        """Export the artwork and hand it to the mint queue"""
+        if self._exporting:
             return
+        if wallet_manager.is_locked:
+            # Minting signs a transaction: unlock first, then start over
+            return self.unlock_wallet(lambda: self._save_and_mint(instance))
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f"vanta_art_{timestamp}.png"
+        suffix = 1
+        while Path(filename).exists():
+            filename = f"vanta_art_{timestamp}_{suffix}.png"
+            suffix += 1
+        strokes_file = str(Path(filename).with_suffix('.vnts'))
         
+        self._exporting = True
         self.save_btn.text = "Saving..."
         
-        if not self.paint_area.export(filename):
-            self.show_error("Failed to save image")
-            self.save_btn.text = "Save & Mint"
-            return
-        
-        self.save_btn.text = "Uploading..."
+        # Vector copy so the artwork can be re-rendered without the PNG
+        self.paint_area.save_strokes(strokes_file)
         
-        def upload_step():
-            image_uri = ipfs_manager.upload_image(filename)
-            if not image_uri:
-                Clock.schedule_once(lambda dt: self._on_error("IPFS upload failed"), 0)
-                return
-            
-            metadata = ipfs_manager.create_metadata(
-                name=f"Vanta Art #{timestamp}",
-                description=f"Created on {timestamp}",
-                image_uri=image_uri,
-                attributes=[
-                    {"trait_type": "Tool", "value": "Vanta Studio"},
-                    {"trait_type": "Date", "value": timestamp}
-                ]
+        def on_progress(fraction):
+            Clock.schedule_once(
+                lambda dt: setattr(self.save_btn, 'text', f"Saving {fraction:.0%}"), 0
             )
-            
-            metadata_uri = ipfs_manager.upload_metadata(metadata)
-            if not metadata_uri:
-                Clock.schedule_once(lambda dt: self._on_error("Metadata upload failed"), 0)
-                return
-            
-            Clock.schedule_once(lambda dt: self._mint_nft(metadata_uri, filename, timestamp), 0)
         
-        from threading import Thread
-        Thread(target=upload_step, daemon=True).start()
-    
-    def _mint_nft(self, metadata_uri: str, filename: str, timestamp: str):
-        """Mint NFT on blockchain"""
-        self.save_btn.text = "Minting..."
+        failure = {}
         
-        contract_mgr = get_contract_manager(wallet_manager)
-        result = contract_mgr.mint_nft(metadata_uri)
+        def on_error(error):
+            failure['error'] = error  # called just before on_done(False)
         
-        if not result:
-            self._on_error("Minting failed")
-            return
-        
-        self._save_nft_record(result, metadata_uri, filename, timestamp)
+        def on_done(ok):
+            Clock.schedule_once(
+                lambda dt: self._on_exported(ok, filename, strokes_file, timestamp,
+                                             failure.get('error')), 0
+            )
         
-        self.save_btn.text = f"✓ Minted #{result['token_id'][:6]}"
-        Clock.schedule_once(lambda dt: setattr(self.save_btn, 'text', 'Save & Mint'), 3)
+        if self.export_scale > 1:
+            self.paint_area.export_supersampled(
+                filename, self.export_scale, on_progress=on_progress, on_done=on_done,
+                on_error=on_error
+            )
+        else:
+            self.paint_area.export_async(filename, on_progress=on_progress, on_done=on_done)
     
-    def _save_nft_record(self, result: dict, metadata_uri: str, filename: str, timestamp: str):
-        """Save NFT to local database"""
-        record = {
-            'token_id': result['token_id'],
-            'tx_hash': result['tx_hash'],
-            'contract': result.get('contract', 'unknown'),
-            'metadata_uri': metadata_uri,
-            'image_file': filename,
-            'created_at': timestamp,
-            'network': wallet_manager.current_network
-        }
-        
-        db_file = Path('my_nfts.json')
-        try:
-            nfts = json.loads(db_file.read_text()) if db_file.exists() else []
-        except:
-            nfts = []
+    def _on_exported(self, ok: bool, filename: str, strokes_file: str, timestamp: str,
+                     error: Exception = None):
+        """Queue the upload + mint once the PNG is on disk"""
+        self._exporting = False
+        self.save_btn.text = "Save & Mint"
+        if not ok:
+            self.show_error(f"Failed to save image: {error}" if error else "Failed to save image")
+            return
         
-        nfts.insert(0, record)
-        db_file.write_text(json.dumps(nfts, indent=2))
+        self.mint_queue.enqueue(filename, timestamp, strokes_file)
     
-    def _on_error(self, message: str):
-        self.show_error(message)
-        self.save_btn.text = "Save & Mint"
+    def _on_job_update(self, job):
+        Clock.schedule_once(lambda dt: self._show_job_update(job, job.stage, job.error), 0)
+    
+    def _on_upload_progress(self, job, sent: int, total: int):
+        Clock.schedule_once(lambda dt: self._show_upload_progress(sent, total), 0)
+    
+    def _show_upload_progress(self, sent: int, total: int):
+        if self._exporting or not total:
+            return  # the export's own progress has the button
+        if sent >= total:
+            self.save_btn.text = "Save & Mint"
+        else:
+            self.save_btn.text = f"Uploading {sent / total:.0%} ({sent // 1024} / {total // 1024} KB)"
+    
+    def _show_job_update(self, job, stage: str, error: str):
+        count = self.mint_queue.active_count
+        waiting = self.mint_queue.waiting_count
+        if waiting:
+            self.queue_label.text = f"🔒 {waiting} waiting for unlock"
+        else:
+            self.queue_label.text = f"{count} minting" if count else ""
+            self._unlock_asked = False  # ask again next time one has to wait
+        
+        if self.mint_queue.is_waiting(job.id):
+            # e.g. mints resumed after a restart: the queue picks them up
+            # again on unlock, so there is nothing to run afterwards
+            if not self._unlock_asked:
+                self._unlock_asked = True
+                self.unlock_wallet(lambda: None)
+        elif stage == STAGE_FAILED:
+            if not self._exporting:
+                self.save_btn.text = 'Save & Mint'  # may still show upload progress
+            self.show_error(f"Mint #{job.id} failed: {error}")
+        elif stage == STAGE_CONFIRMED and not self._exporting:
+            self.save_btn.text = f"✓ Minted #{(job.token_id or '')[:6]}"
+            Clock.schedule_once(
+                lambda dt: None if self._exporting else setattr(self.save_btn, 'text', 'Save & Mint'), 3
+            )
 
 
 # ===========================================================
@@ -542,8 +835,10 @@ class WalletScreen(BaseScreen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.name = 'wallet'
+        self.balances = get_balance_cache(wallet_manager)
         self._build_ui()
         wallet_manager.add_listener(self._on_wallet_update)
+        self.balances.add_listener(self._on_balance)
     
     def _build_ui(self):
         layout = BoxLayout(orientation='vertical', padding=20, spacing=15)
@@ -579,9 +874,12 @@ class WalletScreen(BaseScreen):
         copy_btn = Factory.NeonButton(text='Copy', on_press=self._copy_address)
         import_btn = Factory.NeonButton(text='Import', on_press=self._show_import)
         refresh_btn = Factory.NeonButton(text='↻', on_press=lambda x: self._refresh(), size_hint=(0.3, 1))
+        # Protect (set a password) / Unlock / Lock, depending on the wallet
+        self.lock_btn = Factory.NeonButton(text='Lock', on_press=self._toggle_lock)
         
         actions.add_widget(copy_btn)
         actions.add_widget(import_btn)
+        actions.add_widget(self.lock_btn)
         actions.add_widget(refresh_btn)
         
         self.net_btn = Factory.NeonButton(
@@ -589,11 +887,20 @@ class WalletScreen(BaseScreen):
             on_press=self._switch_network
         )
         
+        # Cycles through the HD wallet's known accounts
+        self.account_btn = Factory.NeonButton(text='👤 #0', on_press=self._switch_account)
+        switches = BoxLayout(spacing=10)
+        switches.add_widget(self.net_btn)
+        switches.add_widget(self.account_btn)
+        
         card.add_widget(Label(text='BALANCE', color=(0.5, 0.5, 0.6, 1), font_size='12sp', size_hint_y=0.15))
         card.add_widget(self.balance_label)
         card.add_widget(self.addr_label)
+        # Shown while the recovery phrase / key is on disk unencrypted
+        self.plaintext_label = Label(text='', color=(1, 0.4, 0.4, 1), font_size='11sp', size_hint_y=0.15)
+        card.add_widget(self.plaintext_label)
         card.add_widget(actions)
-        card.add_widget(self.net_btn)
+        card.add_widget(switches)
         
         history = BoxLayout(orientation='vertical', size_hint=(1, 0.4))
         history.add_widget(Label(text='Recent Activity', color=(0, 1, 1, 1), font_size='16sp', bold=True))
@@ -613,15 +920,39 @@ class WalletScreen(BaseScreen):
         self.manager.current = 'home'
     
     def on_enter(self):
+        # New blocks refresh the balance while the screen is open
+        self.balances.live = True
         self._refresh()
     
+    def on_leave(self):
+        self.balances.live = False
+    
     def _refresh(self):
+        """Show the cached balance now; the fresh one arrives via _on_balance"""
+        self._show_balance()
+        self.balances.refresh()
+    
+    def _show_balance(self):
         addr = wallet_manager.address
         self.addr_label.text = wallet_manager.get_short_address(8) if addr else "No wallet"
+        self.account_btn.text = f"👤 #{wallet_manager.account_index}"
+        if not wallet_manager.is_encrypted:
+            self.lock_btn.text = 'Protect'
+            self.plaintext_label.text = '⚠️ Wallet is NOT password protected: tap Protect'
+        else:
+            self.plaintext_label.text = ''
+            self.lock_btn.text = 'Unlock' if wallet_manager.is_locked else 'Lock'
         
-        balance = wallet_manager.get_balance()
+        entry = self.balances.get()
         symbol = wallet_manager.get_network_config().symbol
-        self.balance_label.text = f"{balance:.4f} {symbol}"
+        if entry is None:
+            self.balance_label.text = f"-.---- {symbol}"
+        else:
+            self.balance_label.text = f"{entry.balance:.4f} {symbol}"
+    
+    def _on_balance(self, entry):
+        if entry.network == wallet_manager.current_network and entry.address == wallet_manager.address:
+            Clock.schedule_once(lambda dt: self._show_balance(), 0)
     
     def _on_wallet_update(self):
         Clock.schedule_once(lambda dt: self._refresh(), 0)
@@ -638,18 +969,74 @@ class WalletScreen(BaseScreen):
         idx = networks.index(current)
         next_net = networks[(idx + 1) % len(networks)]
         
-        if wallet_manager.set_network(next_net):
-            self.net_btn.text = f"⛓ {next_net.upper()}"
-            self._refresh()
+        # The first switch to a network may import web3 and build its provider
+        instance.disabled = True
+        self.net_btn.text = f"⛓ {next_net.upper()}..."
+        
+        def switch():
+            wallet_manager.set_network(next_net)
+            Clock.schedule_once(lambda dt: self._on_network_switched(), 0)
+        
+        threading.Thread(target=switch, daemon=True).start()
+    
+    def _on_network_switched(self):
+        self.net_btn.disabled = False
+        self.net_btn.text = f"⛓ {wallet_manager.current_network.upper()}"
+        self._refresh()
+    
+    def _switch_account(self, instance):
+        indexes = [a["index"] for a in wallet_manager.list_accounts()]
+        current = indexes.index(wallet_manager.account_index) if wallet_manager.account_index in indexes else -1
+        # Derived keys are cached: no thread needed
+        wallet_manager.switch_account(indexes[(current + 1) % len(indexes)])
+    
+    def _toggle_lock(self, instance):
+        if not wallet_manager.is_encrypted:
+            self.ask_protect()
+        elif wallet_manager.is_locked:
+            self.unlock_wallet(self._refresh)
+        else:
+            wallet_manager.lock()
+    
+    def ask_protect(self):
+        """Ask for a password to encrypt an unprotected wallet"""
+        self.ask_password('Protect Wallet', self._protect, confirm=True,
+                          message='Your recovery phrase is stored unencrypted.\nSet a password to protect it.')
+    
+    def _protect(self, password: str):
+        """Replace the plaintext wallet file with an encrypted keystore"""
+        self.show_loading("Encrypting...")
+        
+        def run():
+            try:
+                wallet_manager.set_password(password)
+                error = None
+            except Exception as e:
+                error = str(e)
+            Clock.schedule_once(lambda dt: self._on_protected(error), 0)
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _on_protected(self, error: Optional[str]):
+        self.hide_loading()
+        if error:
+            self.show_error(f"Encryption failed: {error}")
+        self._refresh()
     
     def _show_import(self, instance):
         content = BoxLayout(orientation='vertical', spacing=10, padding=15)
         
-        content.add_widget(Label(text='Enter Private Key:', color=(1,1,1,1), halign='left'))
+        content.add_widget(Label(text='Enter Private Key or Recovery Phrase:', color=(1,1,1,1), halign='left'))
         
         key_input = Factory.CyberInput(password=True)
         content.add_widget(key_input)
         
+        # Imported keys go straight into an encrypted keystore
+        pw_input = Factory.CyberInput(password=True, hint_text='New password')
+        repeat_input = Factory.CyberInput(password=True, hint_text='Repeat password')
+        content.add_widget(pw_input)
+        content.add_widget(repeat_input)
+        
         warning = Label(
             text='⚠️ Never share your private key with anyone!',
             color=(1, 0.4, 0.4, 1),
@@ -662,31 +1049,33 @@ class WalletScreen(BaseScreen):
         popup = Popup(
             title='Import Wallet',
             content=content,
-            size_hint=(0.85, 0.45),
+            size_hint=(0.85, 0.6),
             background_color=(0.05, 0.05, 0.1, 0.95)
         )
         
         def do_import(btn):
-            pk = key_input.text.strip()
-            if pk.startswith('0x'):
-                pk = pk[2:]
+            secret = key_input.text.strip()
+            password = pw_input.text
+            if not secret or not password:
+                return
+            if repeat_input.text != password:
+                self.show_error("Passwords don't match")
+                return
+            is_phrase = len(secret.split()) > 1
             
-            try:
-                from eth_account import Account
-                account = Account.from_key(pk)
-                
-                data = {"private_key": account.key.hex(), "address": account.address}
-                Path('vanta_wallet.json').write_text(json.dumps(data))
-                
-                global wallet_manager
-                wallet_manager = WalletManager()
-                wallet_manager.add_listener(self._on_wallet_update)
-                
-                popup.dismiss()
-                self._refresh()
-                
-            except Exception as e:
-                ErrorHandler.show_error_popup(self, f"Invalid key: {e}")
+            # Encryption (and, for a phrase, account discovery) is slow
+            def run():
+                try:
+                    if is_phrase:
+                        wallet_manager.import_mnemonic(secret, password)
+                    else:
+                        wallet_manager.import_private_key(secret, password)
+                except Exception as e:
+                    message = f"Invalid {'phrase' if is_phrase else 'key'}: {e}"
+                    Clock.schedule_once(lambda dt: self.show_error(message), 0)
+            
+            threading.Thread(target=run, daemon=True).start()
+            popup.dismiss()
         
         btn_box.add_widget(Factory.NeonButton(text='Cancel', on_press=popup.dismiss))
         btn_box.add_widget(Factory.NeonButtonPrimary(text='Import', on_press=do_import))
@@ -706,6 +1095,31 @@ class VantaApp(App):
         sm.add_widget(SellScreen())
         sm.add_widget(WalletScreen())
         return sm
+    
+    def on_start(self):
+        # Wallet loading, web3 imports and RPC probes wait until the first
+        # frame is on screen, and then run off the UI thread
+        Window.bind(on_flip=self._after_first_frame)
+    
+    def _after_first_frame(self, *args):
+        Window.unbind(on_flip=self._after_first_frame)
+        threading.Thread(target=self._warm_up, name="vanta-warm-up", daemon=True).start()
+    
+    def _warm_up(self):
+        from block_watcher import get_block_watcher
+        from receipt_tracker import get_receipt_tracker
+        
+        wallet_manager.warm_up()
+        if not wallet_manager.is_encrypted:
+            # New (or old plaintext) wallet: ask for a password straight away
+            Clock.schedule_once(lambda dt: self.root.get_screen('wallet').ask_protect(), 0)
+        # One new-head stream drives balance refreshes and receipt checks
+        watcher = get_block_watcher(wallet_manager)
+        watcher.add_listener(get_balance_cache(wallet_manager).on_new_block)
+        watcher.add_listener(get_receipt_tracker(wallet_manager).on_new_block)
+        watcher.start()
+        # Pick up mints interrupted by the last shutdown
+        get_mint_queue(wallet_manager).resume()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,353 @@
+"""
+Vanta - Mint Queue
+Durable, resumable export → IPFS → mint pipeline backed by SQLite
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from tx_manager import TxJob, TxState
+
+# Checkpoints, in order. A job resumes from the last one it reached.
+STAGE_EXPORTED = "exported"
+STAGE_IMAGE_UPLOADED = "image_uploaded"
+STAGE_METADATA_UPLOADED = "metadata_uploaded"
+STAGE_SUBMITTED = "submitted"
+STAGE_CONFIRMED = "confirmed"
+STAGE_FAILED = "failed"
+
+FINAL_STAGES = (STAGE_CONFIRMED, STAGE_FAILED)
+
+NFT_DB_FILE = Path("my_nfts.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mint_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stage TEXT NOT NULL,
+    image_file TEXT NOT NULL,
+    strokes_file TEXT,
+    timestamp TEXT NOT NULL,
+    network TEXT NOT NULL,
+    image_uri TEXT,
+    metadata_uri TEXT,
+    tx_hash TEXT,
+    token_id TEXT,
+    contract TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class MintQueueError(Exception):
+    """Mint pipeline stage error"""
+    pass
+
+
+@dataclass
+class MintJob:
+    id: int
+    stage: str
+    image_file: str
+    strokes_file: Optional[str]
+    timestamp: str
+    network: str
+    image_uri: Optional[str] = None
+    metadata_uri: Optional[str] = None
+    tx_hash: Optional[str] = None
+    token_id: Optional[str] = None
+    contract: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def is_final(self) -> bool:
+        return self.stage in FINAL_STAGES
+
+
+_JOB_FIELDS = [f.name for f in fields(MintJob)]
+
+
+class MintQueue:
+    """
+    Every artwork is a row with per-stage checkpoints. Uploads for
+    several artworks run concurrently on a bounded pool; the chain step
+    is handed to the TransactionManager. Unfinished jobs are picked up
+    again by resume() after a restart. A job that reaches the signing
+    step while the wallet is locked waits, and continues once it is
+    unlocked.
+    """
+
+    def __init__(self, wallet_manager, db_path: str = "mint_queue.db", max_workers: int = 3):
+        self.wm = wallet_manager
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(_SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._record_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vanta-mint")
+        self._listeners: List[Callable[[MintJob], None]] = []
+        self._progress_listeners: List[Callable[[MintJob, int, int], None]] = []
+        self._active: Dict[int, MintJob] = {}
+        self._waiting: Dict[int, MintJob] = {}
+        wallet_manager.add_listener(self._on_wallet_change)
+
+    def add_listener(self, callback: Callable[[MintJob], None]):
+        """Called on a worker thread whenever a job reaches a new stage"""
+        self._listeners.append(callback)
+
+    def add_progress_listener(self, callback: Callable[[MintJob, int, int], None]):
+        """Called on a worker thread with (job, bytes sent, total) while uploading"""
+        self._progress_listeners.append(callback)
+
+    def _notify(self, job: MintJob):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"Listener error: {e}")
+
+    def _notify_progress(self, job: MintJob, sent: int, total: int):
+        for listener in self._progress_listeners:
+            try:
+                listener(job, sent, total)
+            except Exception as e:
+                print(f"Listener error: {e}")
+
+    # ---------- Persistence ----------
+
+    def _row_to_job(self, row: sqlite3.Row) -> MintJob:
+        return MintJob(**{k: row[k] for k in _JOB_FIELDS})
+
+    def _checkpoint(self, job: MintJob, stage: str, **values) -> None:
+        job.stage = stage
+        job.updated_at = time.time()
+        for key, value in values.items():
+            setattr(job, key, value)
+        columns = ["stage", "updated_at", *values.keys()]
+        with self._lock:
+            self._db.execute(
+                f"UPDATE mint_jobs SET {', '.join(c + ' = ?' for c in columns)} WHERE id = ?",
+                [getattr(job, c) for c in columns] + [job.id],
+            )
+            self._db.commit()
+            if job.is_final:
+                self._active.pop(job.id, None)
+        self._notify(job)
+
+    def jobs(self, include_final: bool = False) -> List[MintJob]:
+        with self._lock:
+            if include_final:
+                rows = self._db.execute("SELECT * FROM mint_jobs ORDER BY id").fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT * FROM mint_jobs WHERE stage NOT IN (?, ?) ORDER BY id", FINAL_STAGES
+                ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    @property
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+    @property
+    def waiting_count(self) -> int:
+        """Jobs held until the wallet is unlocked"""
+        with self._lock:
+            return len(self._waiting)
+
+    def is_waiting(self, job_id: int) -> bool:
+        with self._lock:
+            return job_id in self._waiting
+
+    # ---------- Public API ----------
+
+    def enqueue(self, image_file: str, timestamp: str, strokes_file: str = None) -> MintJob:
+        """Add an exported artwork and start working on it"""
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO mint_jobs (stage, image_file, strokes_file, timestamp, network,"
+                " created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (STAGE_EXPORTED, image_file, strokes_file, timestamp, self.wm.current_network, now, now),
+            )
+            self._db.commit()
+            row = self._db.execute("SELECT * FROM mint_jobs WHERE id = ?", (cur.lastrowid,)).fetchone()
+        job = self._row_to_job(row)
+        self._notify(job)
+        self._schedule(job)
+        return job
+
+    def resume(self) -> int:
+        """Restart every unfinished job; returns how many were resumed"""
+        jobs = [j for j in self.jobs() if j.id not in self._active and j.id not in self._waiting]
+        for job in jobs:
+            print(f"🔁 Resuming mint job #{job.id} at '{job.stage}'")
+            self._schedule(job)
+        return len(jobs)
+
+    def retry(self, job_id: int) -> bool:
+        """Re-run a failed job from its last good checkpoint"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM mint_jobs WHERE id = ?", (job_id,)).fetchone()
+        if not row or row["stage"] != STAGE_FAILED:
+            return False
+        job = self._row_to_job(row)
+        if job.tx_hash:
+            stage = STAGE_SUBMITTED
+        elif job.metadata_uri:
+            stage = STAGE_METADATA_UPLOADED
+        elif job.image_uri:
+            stage = STAGE_IMAGE_UPLOADED
+        else:
+            stage = STAGE_EXPORTED
+        self._checkpoint(job, stage, error=None)
+        self._schedule(job)
+        return True
+
+    # ---------- Pipeline ----------
+
+    def _schedule(self, job: MintJob) -> None:
+        with self._lock:
+            self._active[job.id] = job
+        self._executor.submit(self._advance, job)
+
+    def _advance(self, job: MintJob) -> None:
+        # Imported on the worker: these pull in requests and web3
+        from ipfs_manager import ipfs_manager
+        from nft_contract import mint_nft_async, watch_mint
+
+        try:
+            if job.stage == STAGE_EXPORTED:
+                if not Path(job.image_file).exists():
+                    raise MintQueueError(f"Image missing: {job.image_file}")
+                # Image and metadata go up together in one CAR
+                uris = ipfs_manager.upload_bundle(
+                    job.image_file, **self._metadata_fields(job),
+                    on_progress=lambda sent, total: self._notify_progress(job, sent, total)
+                )
+                if not uris:
+                    raise MintQueueError("IPFS upload failed")
+                image_uri, metadata_uri = uris
+                self._checkpoint(job, STAGE_METADATA_UPLOADED, image_uri=image_uri,
+                                 metadata_uri=metadata_uri)
+
+            if job.stage == STAGE_IMAGE_UPLOADED:
+                # Job checkpointed by the two-request pipeline
+                metadata = ipfs_manager.create_metadata(image_uri=job.image_uri, **self._metadata_fields(job))
+                metadata_uri = ipfs_manager.upload_metadata(metadata)
+                if not metadata_uri:
+                    raise MintQueueError("Metadata upload failed")
+                self._checkpoint(job, STAGE_METADATA_UPLOADED, metadata_uri=metadata_uri)
+
+            # Always on the network the job was queued for, whatever the wallet is on now
+            if job.stage == STAGE_METADATA_UPLOADED:
+                if self.wm.is_locked:
+                    return self._wait_for_unlock(job)
+                mint_nft_async(self.wm, job.metadata_uri, on_update=lambda tx: self._on_tx(job, tx),
+                               network=job.network)
+            elif job.stage == STAGE_SUBMITTED:
+                watch_mint(self.wm, job.tx_hash, on_update=lambda tx: self._on_tx(job, tx),
+                           network=job.network)
+        except Exception as e:
+            print(f"❌ Mint job #{job.id} failed: {e}")
+            self._checkpoint(job, STAGE_FAILED, error=str(e))
+
+    @staticmethod
+    def _metadata_fields(job: MintJob) -> Dict:
+        return {
+            "name": f"Vanta Art #{job.timestamp}",
+            "description": f"Created on {job.timestamp}",
+            "attributes": [
+                {"trait_type": "Tool", "value": "Vanta Studio"},
+                {"trait_type": "Date", "value": job.timestamp}
+            ],
+        }
+
+    def _on_tx(self, job: MintJob, tx: TxJob) -> None:
+        if (tx.state in (TxState.SENDING, TxState.PENDING) and tx.tx_hash
+                and (job.stage != STAGE_SUBMITTED or tx.tx_hash != job.tx_hash)):
+            # Saved before the broadcast, so resume() watches the tx instead
+            # of minting again; re-saved after a speed-up
+            self._checkpoint(job, STAGE_SUBMITTED, tx_hash=tx.tx_hash)
+        elif tx.state == TxState.CONFIRMED:
+            result = tx.result
+            self._checkpoint(
+                job, STAGE_CONFIRMED,
+                tx_hash=result["tx_hash"],
+                token_id=result["token_id"],
+                contract=result.get("contract", "unknown"),
+            )
+            self._save_nft_record(job)
+        elif tx.state == TxState.FAILED:
+            if not tx.tx_hash and job.stage == STAGE_METADATA_UPLOADED and self.wm.is_locked:
+                # Locked between the check and signing: nothing was sent
+                return self._wait_for_unlock(job)
+            # No hash means it was never broadcast: retry() mints again
+            self._checkpoint(job, STAGE_FAILED, error=tx.error, tx_hash=tx.tx_hash)
+
+    def _wait_for_unlock(self, job: MintJob) -> None:
+        """Hold a job that needs a signature until the wallet is unlocked"""
+        print(f"🔒 Mint job #{job.id} waiting for the wallet to be unlocked")
+        with self._lock:
+            self._active.pop(job.id, None)
+            self._waiting[job.id] = job
+        self._notify(job)
+        # Unlocked while we were parking it
+        self._on_wallet_change()
+
+    def _on_wallet_change(self) -> None:
+        with self._lock:
+            if not self._waiting:
+                return
+        if self.wm.is_locked:
+            return
+        with self._lock:
+            jobs = list(self._waiting.values())
+            self._waiting.clear()
+        for job in jobs:
+            print(f"🔁 Resuming mint job #{job.id} after unlock")
+            self._schedule(job)
+
+    def _save_nft_record(self, job: MintJob) -> None:
+        """Save NFT to local database"""
+        record = {
+            'token_id': job.token_id,
+            'tx_hash': job.tx_hash,
+            'contract': job.contract,
+            'metadata_uri': job.metadata_uri,
+            'image_file': job.image_file,
+            'strokes_file': job.strokes_file,
+            'created_at': job.timestamp,
+            'network': job.network
+        }
+
+        with self._record_lock:
+            try:
+                nfts = json.loads(NFT_DB_FILE.read_text()) if NFT_DB_FILE.exists() else []
+            except Exception:
+                nfts = []
+
+            nfts.insert(0, record)
+            NFT_DB_FILE.write_text(json.dumps(nfts, indent=2))
+
+
+_mint_queue: Optional[MintQueue] = None
+
+
+def get_mint_queue(wallet_manager) -> MintQueue:
+    global _mint_queue
+    if _mint_queue is None:
+        _mint_queue = MintQueue(wallet_manager)
+    return _mint_queue
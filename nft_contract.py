@@ -3,11 +3,18 @@ Vanta - NFT Smart Contract Manager
 Real contract interaction with Polygon/Ethereum
 """
 from web3 import Web3
+from eth_abi import encode as abi_encode
 from eth_account import Account
-from typing import Optional, Dict
+from eth_utils import function_abi_to_4byte_selector
+from typing import Optional, Dict, Tuple
 import json
+import threading
 import time
 
+from fee_oracle import get_fee_oracle
+from tx_manager import TxJob, get_tx_manager
+from wallet_manager import NonceKey
+
 # ABI کامل ERC721
 ERC721_ABI = [
     {
@@ -59,12 +66,15 @@ class NFTContractManager:
         self.w3 = None
         self.contract = None
         self.contract_address = None
+        self._selectors: Dict[str, bytes] = {}
+        self._input_types: Dict[str, list] = {}
         self.connect()
     
     def connect(self):
         """Connect to Web3"""
+        # No probe: get_web3() hands back the cached provider, the first call fails over
         self.w3 = self.wm.get_web3()
-        if self.w3 and self.w3.is_connected():
+        if self.w3:
             print("✅ Connected to blockchain")
             self._load_contract()
         else:
@@ -80,13 +90,64 @@ class NFTContractManager:
                     abi=ERC721_ABI
                 )
                 self.contract_address = addr
+                for entry in ERC721_ABI:
+                    if entry.get("type") == "function":
+                        self._selectors[entry["name"]] = function_abi_to_4byte_selector(entry)
+                        self._input_types[entry["name"]] = [i["type"] for i in entry["inputs"]]
                 print(f"📜 Contract loaded: {addr[:10]}...")
             except Exception as e:
                 print(f"❌ Contract load failed: {e}")
     
+    def build_mint_tx(self, metadata_uri: str, to_address: str = None) -> Optional[Tuple[dict, NonceKey]]:
+        """Build the unsigned mintNFT transaction: (tx, nonce key)"""
+        if not self.w3 or not self.wm.address or not self.contract:
+            print("❌ Wallet or contract not connected")
+            return None
+        
+        recipient = to_address or self.wm.address
+        print(f"🎨 Minting NFT to {recipient[:10]}...")
+        print(f"📋 Metadata: {metadata_uri[:30]}...")
+        
+        tx = {
+            'from': self.wm.address,
+            'to': self.contract.address,
+            'value': 0,
+            'data': self._encode_call("mintNFT", Web3.to_checksum_address(recipient), metadata_uri),
+            'chainId': self.wm.get_chain_id(),
+        }
+        oracle = get_fee_oracle(self.wm)
+        tx['gas'] = oracle.gas_limit(self._gas_key("mintNFT"), lambda: self.w3.eth.estimate_gas(tx))
+        tx.update(oracle.tx_fee_params(w3=self.w3))
+        
+        # Allocated last: nothing after this can fail and leak the nonce
+        nonce_key, tx['nonce'] = self.wm.nonces.allocate()
+        return tx, nonce_key
+    
+    def mint_result(self, tx_hash: str, receipt, network: str = None) -> Optional[Dict]:
+        """Turn a successful mint receipt on `network` (default: current) into the NFT record fields"""
+        if receipt.status != 1:
+            print("❌ Transaction failed")
+            # Possibly out of gas: estimate again next time
+            get_fee_oracle(self.wm).invalidate_gas(self._gas_key("mintNFT"))
+            return None
+        
+        # Get token ID from event (simplified)
+        token_id = receipt.blockNumber
+        
+        print(f"✅ Minted! Token ID: {token_id}")
+        print(f"🔗 Tx: {tx_hash[:20]}...")
+        
+        contract = CONTRACT_ADDRESSES.get(network) if network else self.contract_address
+        return {
+            "tx_hash": tx_hash,
+            "token_id": str(token_id),
+            "contract": contract,
+            "explorer": f"https://{self._get_explorer(network)}/tx/{tx_hash}"
+        }
+    
     def mint_nft(self, metadata_uri: str, to_address: str = None) -> Optional[Dict]:
-        """Mint NFT with metadata URI"""
-        if not self.w3 or not self.wm.account:
+        """Mint NFT with metadata URI (blocking; see mint_nft_async)"""
+        if not self.w3 or not self.wm.address:
             print("❌ Wallet not connected")
             return None
         
@@ -95,56 +156,45 @@ class NFTContractManager:
             print("⚠️ No contract - using mock mode")
             return self._mock_mint(metadata_uri)
         
-        recipient = to_address or self.wm.address
-        
+        nonce, nonce_key = None, None
         try:
-            print(f"🎨 Minting NFT to {recipient[:10]}...")
-            print(f"📋 Metadata: {metadata_uri[:30]}...")
-            
-            # Build transaction
-            tx = self.contract.functions.mintNFT(
-                Web3.to_checksum_address(recipient),
-                metadata_uri
-            ).build_transaction({
-                'from': self.wm.address,
-                'nonce': self.w3.eth.get_transaction_count(self.wm.address),
-                'gas': 300000,
-                'gasPrice': self.w3.to_wei('30', 'gwei'),
-                'chainId': self.wm.get_chain_id()
-            })
+            built = self.build_mint_tx(metadata_uri, to_address)
+            if not built:
+                return None
+            tx, nonce_key = built
+            nonce = tx['nonce']
             
             # Sign
-            signed = self.wm.account.sign_transaction(tx)
+            signed = self.wm.sign_transaction(tx)
+            if not signed:
+                self.wm.nonces.release(nonce, nonce_key)
+                return None
             
             # Send
-            tx_hash = self.w3.eth.send_raw_transaction(signed.rawTransaction)
+            tx_hash = self.w3.eth.send_raw_transaction(signed)
+            nonce = None  # broadcast: the nonce is spent
             print(f"⏳ Waiting for confirmation...")
             
             # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-            
-            if receipt.status == 1:
-                # Get token ID from event (simplified)
-                token_id = receipt.blockNumber
-                
-                print(f"✅ Minted! Token ID: {token_id}")
-                print(f"🔗 Tx: {tx_hash.hex()[:20]}...")
-                
-                return {
-                    "tx_hash": tx_hash.hex(),
-                    "token_id": str(token_id),
-                    "contract": self.contract_address,
-                    "explorer": f"https://{self._get_explorer()}/tx/{tx_hash.hex()}"
-                }
-            else:
-                print("❌ Transaction failed")
+            receipt = self.wm.wait_for_receipt(tx_hash.hex(), timeout=120)
+            if receipt is None:
+                # Possibly still pending: keep the nonce reserved
+                print(f"⚠️ No receipt yet for {tx_hash.hex()}")
                 return None
+            self.wm.nonces.confirm(tx['nonce'], nonce_key)
+            return self.mint_result(tx_hash.hex(), receipt)
                 
         except Exception as e:
             print(f"❌ Mint failed: {e}")
+            if nonce is not None:
+                # Never sent: hand it back so it doesn't leave a gap
+                self.wm.nonces.release(nonce, nonce_key)
+            if nonce_key is not None:
+                self.wm.nonces.resync(nonce_key)
             return None
     
-    def _mock_mint(self, metadata_uri: str) -> Dict:
+    @staticmethod
+    def _mock_mint(metadata_uri: str) -> Dict:
         """Mock mint for testing"""
         time.sleep(1)
         mock_tx = "0x" + "b" * 64
@@ -159,11 +209,109 @@ class NFTContractManager:
             "explorer": "https://example.com"
         }
     
-    def _get_explorer(self) -> str:
-        if self.wm.current_network == "polygon":
+    def _encode_call(self, function: str, *args) -> str:
+        """Calldata from the cached selector, skipping web3's ABI lookup"""
+        data = self._selectors[function] + abi_encode(self._input_types[function], args)
+        return "0x" + data.hex()
+    
+    def _gas_key(self, function: str) -> str:
+        return f"{self.contract_address}:{function}"
+    
+    def _get_explorer(self, network: str = None) -> str:
+        if (network or self.wm.current_network) == "polygon":
             return "polygonscan.com"
         return "etherscan.io"
 
 
-def get_contract_manager(wallet_manager):
-    return NFTContractManager(wallet_manager)
\ No newline at end of file
+class ContractRegistry:
+    """
+    Keeps one warm NFTContractManager per network. A manager is rebuilt
+    only when the wallet switches network (its provider is replaced) or
+    the address in CONTRACT_ADDRESSES changes.
+    """
+    
+    def __init__(self, wallet_manager):
+        self.wm = wallet_manager
+        self._lock = threading.Lock()
+        self._managers: Dict[str, NFTContractManager] = {}
+        self._network = wallet_manager.current_network
+        wallet_manager.add_listener(self._on_wallet_change)
+    
+    def _on_wallet_change(self):
+        network = self.wm.current_network
+        with self._lock:
+            if network != self._network:
+                self._managers.clear()
+                self._network = network
+    
+    def get(self) -> NFTContractManager:
+        network = self.wm.current_network
+        address = CONTRACT_ADDRESSES.get(network)
+        with self._lock:
+            mgr = self._managers.get(network)
+            if mgr is not None and mgr.w3 is not None and mgr.contract_address == address:
+                return mgr
+        
+        mgr = NFTContractManager(self.wm)
+        with self._lock:
+            self._managers[network] = mgr
+        return mgr
+    
+    def invalidate(self, network: str = None):
+        with self._lock:
+            if network is None:
+                self._managers.clear()
+            else:
+                self._managers.pop(network, None)
+
+
+_registry: Optional[ContractRegistry] = None
+
+
+def get_contract_manager(wallet_manager) -> NFTContractManager:
+    global _registry
+    if _registry is None:
+        _registry = ContractRegistry(wallet_manager)
+    return _registry.get()
+
+
+def mint_nft_async(wallet_manager, metadata_uri: str, on_update=None,
+                   to_address: str = None, network: str = None) -> TxJob:
+    """
+    Mint without blocking the caller. Connection, build, signing,
+    sending and receipt polling all happen on TransactionManager
+    workers; on_update(job) is called on each state change. With
+    `network` set, the job fails unless the wallet is on that network.
+    """
+    tx_manager = get_tx_manager(wallet_manager)
+    network = network or wallet_manager.current_network
+    
+    if not CONTRACT_ADDRESSES.get(network):
+        print("⚠️ No contract - using mock mode")
+        return tx_manager.submit_local(
+            lambda: NFTContractManager._mock_mint(metadata_uri),
+            on_update=on_update,
+            label="mint"
+        )
+    
+    state = {}
+    
+    def build():
+        state['mgr'] = get_contract_manager(wallet_manager)
+        return state['mgr'].build_mint_tx(metadata_uri, to_address)
+    
+    def finalize(tx_hash, receipt):
+        return state['mgr'].mint_result(tx_hash, receipt, network)
+    
+    return tx_manager.submit(build, finalize, on_update=on_update, label="mint", network=network)
+
+
+def watch_mint(wallet_manager, tx_hash: str, on_update=None, network: str = None) -> TxJob:
+    """Resume confirmation tracking for a mint sent on `network` in an earlier session"""
+    network = network or wallet_manager.current_network
+    
+    def finalize(tx_hash, receipt):
+        return get_contract_manager(wallet_manager).mint_result(tx_hash, receipt, network)
+    
+    return get_tx_manager(wallet_manager).watch(tx_hash, finalize, on_update=on_update,
+                                                label="mint", network=network)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+Vanta - Local Pin Server
+Stand-in for a pinning service that runs inside the app: speaks
+NFT.Storage's /upload (raw files and CARs) and keeps every block on
+disk, so the whole upload pipeline can run and be load-tested offline
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+from ipfs_car import CarError, read_car
+from ipfs_cid import UnixFSFile, cid_str
+
+DATA_DIR = Path("ipfs_blocks")
+
+
+class BlockStore:
+    """One file per block under blocks/, one empty marker per root under pins/"""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.blocks_dir = data_dir / "blocks"
+        self.pins_dir = data_dir / "pins"
+        self.blocks_dir.mkdir(parents=True, exist_ok=True)
+        self.pins_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, cid: bytes, block: bytes) -> None:
+        path = self.blocks_dir / cid_str(cid)
+        if path.exists():
+            return
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(block)
+        os.replace(tmp, path)  # readers never see half a block
+
+    def get(self, cid: str) -> Optional[bytes]:
+        path = self.blocks_dir / cid
+        return path.read_bytes() if path.exists() else None
+
+    def has(self, cid: str) -> bool:
+        return (self.blocks_dir / cid).exists()
+
+    def pin(self, cid: str) -> None:
+        (self.pins_dir / cid).touch()
+
+    def is_pinned(self, cid: str) -> bool:
+        return (self.pins_dir / cid).exists()
+
+
+class LocalPinServer:
+    """
+    Runs on a daemon thread. POST /upload takes a raw file (imported with
+    the same UnixFS settings as ipfs_cid) or, as application/car, a CAR
+    whose blocks are checked against their CIDs; both answer like
+    NFT.Storage. GET /block/<cid> serves a stored block.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, port: int = 0):
+        self.store = BlockStore(data_dir)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                                        name="vanta-pin-server")
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self) -> "LocalPinServer":
+        self._thread.start()
+        print(f"📌 Local pin server on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def import_raw(self, stream) -> str:
+        importer = UnixFSFile(on_block=self.store.put)
+        for data in iter(lambda: stream.read(64 * 1024), b""):
+            importer.update(data)
+        cid = cid_str(importer.finish())
+        self.store.pin(cid)
+        return cid
+
+    def import_car(self, stream) -> str:
+        root, sections = read_car(stream)
+        for cid, block in sections:
+            self.store.put(cid, block)
+        root = cid_str(root)
+        if not self.store.has(root):
+            raise CarError("Root block missing")
+        self.store.pin(root)
+        return root
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/upload":
+                    return self._reply(404, {"ok": False, "error": {"message": "Not found"}})
+                body = _Body(self.rfile, int(self.headers.get("Content-Length", 0)))
+                try:
+                    if self.headers.get("Content-Type") == "application/car":
+                        cid = server.import_car(body)
+                    else:
+                        cid = server.import_raw(body)
+                except (CarError, ValueError) as e:
+                    self.close_connection = True
+                    return self._reply(400, {"ok": False, "error": {"message": str(e)}})
+                self._reply(200, {"ok": True, "value": {"cid": cid}})
+
+            def do_GET(self):
+                cid = self.path.rsplit("/", 1)[-1]
+                block = server.store.get(cid) if self.path.startswith("/block/") else None
+                if block is None:
+                    return self._reply(404, {"ok": False, "error": {"message": "Not found"}})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.ipld.raw")
+                self.send_header("Content-Length", str(len(block)))
+                self.end_headers()
+                self.wfile.write(block)
+
+            def _reply(self, status: int, response: dict):
+                data = json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+class _Body:
+    """Request body limited to Content-Length"""
+
+    def __init__(self, rfile, length: int):
+        self.rfile = rfile
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.rfile.read(size) if size else b""
+        self.remaining -= len(data)
+        return data
+
+
+_pin_server: Optional[LocalPinServer] = None
+_pin_server_lock = threading.Lock()
+
+
+def get_local_pin_server(data_dir: Path = DATA_DIR) -> LocalPinServer:
+    """The app's local pin server, started on first use"""
+    global _pin_server
+    with _pin_server_lock:
+        if _pin_server is None:
+            _pin_server = LocalPinServer(data_dir).start()
+        return _pin_server
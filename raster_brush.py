@@ -0,0 +1,163 @@
+"""
+Vanta - Raster Brush
+NumPy renderer for stroke logs (headless, no GL context needed)
+"""
+from typing import Iterable, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from stroke_log import Stroke, StrokeLog
+
+DEFAULT_BACKGROUND = (0.03, 0.03, 0.05, 1)
+
+# Max pixel x segment pairs evaluated per NumPy batch (~4 MB per float32 temp)
+BATCH_ELEMENTS = 1 << 20
+# Longer segments are split so every segment fits a small fixed stamp
+SEGMENT_LENGTH = 8.0
+
+
+class RasterBrush:
+    """
+    Renders strokes into an RGBA float32 canvas, matching kivy Line with
+    cap='round', joint='round': every pixel whose center is within
+    `width` of the polyline is covered (kivy draws a Line 2 * width
+    thick, without antialiasing; pass antialias=True for soft edges).
+
+    Each segment is evaluated against a small pixel stamp, all segments
+    of a batch at once; coverage is max-combined and the stroke is
+    composited once, so overlapping segments never double-blend.
+    """
+
+    def __init__(self, size: Tuple[int, int], scale: float = 1.0,
+                 background: Sequence[float] = DEFAULT_BACKGROUND,
+                 antialias: bool = False):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy is required for RasterBrush")
+        self.scale = scale
+        self.width = max(int(round(size[0] * scale)), 1)
+        self.height = max(int(round(size[1] * scale)), 1)
+        self.antialias = antialias
+        self.canvas = np.empty((self.height, self.width, 4), dtype=np.float32)
+        self.canvas[:] = np.asarray(background, dtype=np.float32)
+
+    def draw(self, stroke: Stroke) -> None:
+        pts = np.frombuffer(stroke.points, dtype=np.float32).reshape(-1, 2) * self.scale
+        if not len(pts):
+            return
+        # GL origin is bottom-left; canvas rows run top to bottom
+        pts[:, 1] = self.height - pts[:, 1]
+        radius = stroke.width * self.scale
+        pad = radius + 1.0
+
+        x0 = max(int(np.floor(pts[:, 0].min() - pad)), 0)
+        y0 = max(int(np.floor(pts[:, 1].min() - pad)), 0)
+        x1 = min(int(np.ceil(pts[:, 0].max() + pad)), self.width)
+        y1 = min(int(np.ceil(pts[:, 1].max() + pad)), self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        if len(pts) == 1:
+            a, b = pts, pts
+        else:
+            a, b = _split_segments(pts[:-1], pts[1:], SEGMENT_LENGTH)
+
+        coverage = np.zeros((y1 - y0, x1 - x0), dtype=np.float32)
+        extent = float(np.abs(b - a).max()) if len(pts) > 1 else 0.0
+        window = int(np.ceil(extent + 2 * pad)) + 1
+        per_batch = max(BATCH_ELEMENTS // (window * window), 1)
+        for start in range(0, len(a), per_batch):
+            self._cover_batch(coverage, x0, y0, a[start:start + per_batch],
+                              b[start:start + per_batch], radius, window)
+
+        alpha = coverage * stroke.color[3]
+        alpha = alpha[..., None]
+        color = np.asarray(stroke.color, dtype=np.float32)
+        color[3] = 1.0
+        region = self.canvas[y0:y1, x0:x1]
+        region *= 1.0 - alpha
+        region += color * alpha
+
+    def _cover_batch(self, coverage, x0: int, y0: int, a, b, radius: float, window: int) -> None:
+        """
+        Evaluate every segment against its own window x window pixel
+        stamp at once, then max-scatter into the stroke's coverage.
+        """
+        pad = radius + 1.0
+        h, w = coverage.shape
+        # Stamp origin per segment, in coverage coordinates
+        ox = np.floor(np.minimum(a[:, 0], b[:, 0]) - pad).astype(np.int32) - x0
+        oy = np.floor(np.minimum(a[:, 1], b[:, 1]) - pad).astype(np.int32) - y0
+        grid = np.arange(window, dtype=np.int32)
+        ix = (ox[:, None, None] + grid[None, None, :]).reshape(len(a), 1, window)
+        iy = (oy[:, None, None] + grid[None, :, None]).reshape(len(a), window, 1)
+        ix = np.broadcast_to(ix, (len(a), window, window)).reshape(len(a), -1)
+        iy = np.broadcast_to(iy, (len(a), window, window)).reshape(len(a), -1)
+
+        ax, ay = a[:, 0:1] - x0, a[:, 1:2] - y0
+        dx, dy = b[:, 0:1] - a[:, 0:1], b[:, 1:2] - a[:, 1:2]
+        length_sq = dx * dx + dy * dy
+        length_sq[length_sq == 0] = 1.0
+
+        # Projection of each pixel center onto its segment, clamped to the ends
+        px = ix + np.float32(0.5)
+        py = iy + np.float32(0.5)
+        t = ((px - ax) * dx + (py - ay) * dy) / length_sq
+        np.clip(t, 0.0, 1.0, out=t)
+        ex = px - (ax + t * dx)
+        ey = py - (ay + t * dy)
+        dist = np.sqrt(ex * ex + ey * ey)
+
+        if self.antialias:
+            cov = np.clip(radius + 0.5 - dist, 0.0, 1.0)
+        else:
+            cov = (dist <= radius).astype(np.float32)
+
+        keep = (cov > 0) & (ix >= 0) & (ix < w) & (iy >= 0) & (iy < h)
+        np.maximum.at(coverage.reshape(-1), iy[keep] * w + ix[keep], cov[keep])
+
+    def draw_all(self, strokes: Iterable[Stroke]) -> None:
+        for stroke in strokes:
+            self.draw(stroke)
+
+    def to_rgba8(self):
+        """(height, width, 4) uint8, rows top to bottom"""
+        return (np.clip(self.canvas, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+
+def render_log(log: StrokeLog, scale: float = 1.0,
+               size: Optional[Tuple[int, int]] = None,
+               background: Sequence[float] = DEFAULT_BACKGROUND,
+               antialias: bool = False):
+    """Render every visible stroke; returns a uint8 RGBA array"""
+    brush = RasterBrush(size or log.size, scale, background, antialias)
+    brush.draw_all(log)
+    return brush.to_rgba8()
+
+
+def render_png(log: StrokeLog, filename: str, scale: float = 1.0, **kwargs) -> None:
+    """Render a stroke log straight to a PNG file"""
+    from art_export import encode_png
+    pixels = render_log(log, scale, **kwargs)
+    height, width = pixels.shape[:2]
+    encode_png(pixels.tobytes(), width, height, filename, bottom_up=False)
+
+
+def _split_segments(a, b, max_length: float):
+    """Subdivide segments longer than max_length into equal pieces"""
+    lengths = np.hypot(b[:, 0] - a[:, 0], b[:, 1] - a[:, 1])
+    pieces = np.maximum(np.ceil(lengths / max_length).astype(np.int64), 1)
+    if (pieces == 1).all():
+        return a, b
+    seg = np.repeat(np.arange(len(a)), pieces)
+    # Index of each piece within its segment
+    k = np.arange(len(seg)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    n = pieces[seg].astype(np.float32)
+    d = (b - a)[seg]
+    start = a[seg] + d * (k / n)[:, None]
+    end = a[seg] + d * ((k + 1) / n)[:, None]
+    return start.astype(np.float32), end.astype(np.float32)
@@ -0,0 +1,221 @@
+"""
+Vanta - Receipt Tracker
+Resolves every pending transaction receipt from one shared check per block
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class _Tracked:
+    tx_hash: str
+    network: str
+    waiters: List[Future] = field(default_factory=list)
+    # Looked up directly (e.g. sent before a restart) until a lookup misses
+    # it on an endpoint that also returned the blocks scanned so far
+    check_directly: bool = True
+
+
+class ReceiptTracker:
+    """
+    Registered hashes are checked together, once per new block and
+    network, however many there are:
+
+    - new blocks since the last check are fetched in one batch
+      (eth_getBlockByNumber, hashes only) and scanned for tracked hashes;
+    - receipts are fetched, in one batch, only for hashes that landed,
+      plus hashes block scanning can't vouch for yet.
+
+    With no new block there is no RPC at all. Heads come from
+    on_new_block (wire it to the BlockWatcher); for a network without
+    recent heads (the watcher only follows the current one), the tracker
+    asks for eth_blockNumber every `poll_interval` seconds.
+    """
+
+    def __init__(self, wallet_manager, poll_interval: float = 3.0,
+                 idle_poll_interval: float = 30.0, max_scan: int = 32):
+        self.wm = wallet_manager
+        self.poll_interval = poll_interval
+        # While new blocks are being reported, timed checks are only a safety net
+        self.idle_poll_interval = idle_poll_interval
+        # Further behind than this, direct receipt lookups beat scanning blocks
+        self.max_scan = max_scan
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _Tracked] = {}
+        self._heads: Dict[str, int] = {}
+        self._scanned: Dict[str, int] = {}
+        self._wake = threading.Event()
+        self._last_block_at: Dict[str, float] = {}
+        self._polled_at: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, tx_hash: str, network: str = None) -> Future:
+        """Future resolving to the receipt once the transaction is mined"""
+        future: Future = Future()
+        key = tx_hash.lower()
+        with self._lock:
+            tracked = self._pending.get(key)
+            if tracked is None:
+                tracked = self._pending[key] = _Tracked(tx_hash, network or self.wm.current_network)
+            tracked.waiters.append(future)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="vanta-receipts", daemon=True)
+                self._thread.start()
+        return future
+
+    def untrack(self, tx_hash: str, future: Future = None) -> None:
+        """Stop waiting (one waiter, or all of them) and cancel the futures"""
+        key = tx_hash.lower()
+        with self._lock:
+            tracked = self._pending.get(key)
+            if tracked is None:
+                return
+            dropped = [f for f in tracked.waiters if future is None or f is future]
+            tracked.waiters = [f for f in tracked.waiters if f not in dropped]
+            if not tracked.waiters:
+                del self._pending[key]
+        for f in dropped:
+            f.cancel()
+
+    def on_new_block(self, network: str, number: int) -> None:
+        """BlockWatcher listener"""
+        with self._lock:
+            self._heads[network] = max(number, self._heads.get(network, -1))
+            self._last_block_at[network] = time.monotonic()
+        self._wake.set()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # ---------- Checking ----------
+
+    def _streaming(self, network: str) -> bool:
+        """Whether new heads are being reported for `network` (call with the lock held)"""
+        return time.monotonic() - self._last_block_at.get(network, 0.0) < self.idle_poll_interval
+
+    def _loop(self) -> None:
+        timeout = self.poll_interval
+        while True:
+            self._wake.wait(timeout)
+            self._wake.clear()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                by_network: Dict[str, List[_Tracked]] = {}
+                for tracked in self._pending.values():
+                    by_network.setdefault(tracked.network, []).append(tracked)
+                # Any network without a head stream is polled on the short interval
+                streaming = all(self._streaming(n) for n in by_network)
+            timeout = self.idle_poll_interval if streaming else self.poll_interval
+            for network, items in by_network.items():
+                try:
+                    self._check(network, items)
+                except Exception as e:
+                    print(f"Receipt check error ({network}): {e}")
+
+    def _check(self, network: str, items: List[_Tracked]) -> None:
+        w3 = self.wm.get_web3_for(network)
+        now = time.monotonic()
+        with self._lock:
+            head = self._heads.get(network) if self._streaming(network) else None
+            if head is None and now - self._polled_at.get(network, 0.0) < self.poll_interval:
+                return  # woken by another network's head; not due for a poll yet
+        if head is None:
+            # No head stream for this network (e.g. a mint resumed on a
+            # network the wallet isn't on): poll it
+            self._polled_at[network] = now
+            head = w3.eth.block_number
+            with self._lock:
+                self._heads[network] = max(head, self._heads.get(network, -1))
+
+        last = self._scanned.get(network)
+        if last is None or head - last > self.max_scan:
+            # Too far behind to scan: look everything up directly and fetch
+            # just the head block, as the new starting point
+            blocks: Sequence[int] = [head]
+            direct = items
+        else:
+            blocks = range(last + 1, head + 1)
+            direct = [t for t in items if t.check_directly]
+        if not blocks and not direct:
+            return
+
+        calls = [("eth_getBlockByNumber", [hex(n), False]) for n in blocks]
+        calls += [("eth_getTransactionReceipt", [t.tx_hash]) for t in direct]
+        results = _batch(w3, calls)
+
+        wanted = {t.tx_hash.lower(): t for t in items}
+        landed = set()
+        # Only blocks this endpoint returned count as scanned
+        scanned = last
+        fetched = False
+        for number, block in zip(blocks, results):
+            if block is None:
+                break  # this endpoint hasn't got the block yet; rescan from here
+            landed.update(h.lower() for h in block["transactions"] if h.lower() in wanted)
+            scanned, fetched = number, True
+
+        receipts = {}
+        for tracked, raw in zip(direct, results[len(blocks):]):
+            if raw:
+                receipts[tracked.tx_hash.lower()] = raw
+            elif fetched:
+                # Not mined up to `scanned` on an endpoint that has that
+                # block: scanning from there on will find it. Otherwise
+                # (e.g. a lagging endpoint) keep looking it up directly.
+                tracked.check_directly = False
+        missing = [h for h in landed if h not in receipts]
+        if missing:
+            for h, raw in zip(missing, _batch(w3, [("eth_getTransactionReceipt", [wanted[h].tx_hash])
+                                                   for h in missing])):
+                if raw:
+                    receipts[h] = raw
+        if scanned is not None:
+            self._scanned[network] = scanned
+
+        for key, raw in receipts.items():
+            self._resolve(key, _format_receipt(raw))
+
+    def _resolve(self, key: str, receipt) -> None:
+        with self._lock:
+            tracked = self._pending.pop(key, None)
+        if tracked is None:
+            return
+        for future in tracked.waiters:
+            if not future.done():
+                future.set_result(receipt)
+
+
+def _format_receipt(raw: dict):
+    """Raw JSON receipt -> what w3.eth.get_transaction_receipt returns"""
+    from web3._utils.method_formatters import receipt_formatter
+    from web3.datastructures import AttributeDict
+    return AttributeDict.recursive(receipt_formatter(raw))
+
+
+def _batch(w3, calls: List[Tuple[str, Any]]) -> List[Any]:
+    """One batch request when the provider supports it"""
+    if not calls:
+        return []
+    batch = getattr(w3.provider, "batch", None)
+    if batch is not None:
+        return batch(calls)
+    return [w3.provider.make_request(method, params).get("result") for method, params in calls]
+
+
+_receipt_tracker: Optional[ReceiptTracker] = None
+
+
+def get_receipt_tracker(wallet_manager) -> ReceiptTracker:
+    global _receipt_tracker
+    if _receipt_tracker is None:
+        _receipt_tracker = ReceiptTracker(wallet_manager)
+    return _receipt_tracker
@@ -0,0 +1,302 @@
+"""
+Vanta - RPC Transport
+JSON-RPC providers that share one pooled keep-alive session
+"""
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from web3 import HTTPProvider
+from web3._utils.encoding import Web3JsonEncoder
+from web3.types import RPCEndpoint, RPCResponse
+
+from utils import pooled_session
+
+DEFAULT_TIMEOUT = 10
+# Many public nodes reject larger batches
+MAX_BATCH = 50
+
+
+class RPCError(Exception):
+    """JSON-RPC error response"""
+    pass
+
+
+class PooledHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider posting through a session we own. web3's own session
+    cache is keyed per thread, so every worker thread would otherwise
+    open (and TLS-handshake) its own connections.
+    """
+
+    def __init__(self, endpoint_uri: str, session=None, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(endpoint_uri, request_kwargs={'timeout': timeout})
+        self.session = session or pooled_session()
+
+    def make_request(self, method: RPCEndpoint, params) -> RPCResponse:
+        data = self.encode_rpc_request(method, params)
+        response = self.session.post(self.endpoint_uri, data=data, **self.get_request_kwargs())
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+# JSON-RPC errors worth retrying on another endpoint (rate limits)
+RETRYABLE_RPC_CODES = {-32005, 429}
+
+
+@dataclass
+class EndpointStats:
+    url: str
+    latency: float = 0.0        # EWMA of successful request time, seconds
+    error_rate: float = 0.0     # EWMA of failures, 0..1
+    samples: int = 0
+    failures: int = 0           # consecutive
+    down_until: float = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+class EndpointRouter:
+    """
+    Ranks a network's endpoints by EWMA latency, penalised by their
+    recent error rate. An endpoint that fails `max_failures` times in a
+    row is benched for an exponentially growing cooldown. Health probes
+    (eth_blockNumber on every endpoint) run in the background, at most
+    every `probe_interval` seconds, triggered by traffic.
+    """
+
+    def __init__(self, urls: List[str], session=None, timeout: float = DEFAULT_TIMEOUT,
+                 alpha: float = 0.3, max_failures: int = 2, cooldown: float = 15.0,
+                 probe_interval: float = 60.0, unknown_latency: float = 0.5):
+        if not urls:
+            raise ValueError("EndpointRouter needs at least one URL")
+        self.session = session or pooled_session()
+        self.timeout = timeout
+        self.alpha = alpha
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.unknown_latency = unknown_latency
+        self.endpoints = [EndpointStats(url) for url in urls]
+        self._lock = threading.Lock()
+        self._probing = False
+        self._last_probe = 0.0
+
+    def _score(self, index: int, ep: EndpointStats) -> float:
+        latency = ep.latency if ep.samples else self.unknown_latency
+        # Index breaks ties, so unmeasured endpoints keep the configured order
+        return latency * (1.0 + 4.0 * ep.error_rate) + index * 1e-6
+
+    def ranked(self) -> List[EndpointStats]:
+        """Healthy endpoints best first, then benched ones as a last resort"""
+        with self._lock:
+            scored = sorted(enumerate(self.endpoints), key=lambda p: self._score(*p))
+            healthy = [ep for _, ep in scored if ep.healthy]
+            benched = sorted((ep for _, ep in scored if not ep.healthy), key=lambda ep: ep.down_until)
+        return healthy + benched
+
+    def record(self, ep: EndpointStats, elapsed: float, ok: bool) -> None:
+        a = self.alpha
+        with self._lock:
+            ep.error_rate = a * (0.0 if ok else 1.0) + (1 - a) * ep.error_rate
+            if ok:
+                ep.latency = elapsed if not ep.samples else a * elapsed + (1 - a) * ep.latency
+                ep.samples += 1
+                ep.failures = 0
+                ep.down_until = 0.0
+            else:
+                ep.failures += 1
+                if ep.failures >= self.max_failures:
+                    backoff = self.cooldown * 2 ** min(ep.failures - self.max_failures, 4)
+                    ep.down_until = time.monotonic() + backoff
+
+    def post(self, data: bytes, **kwargs) -> dict:
+        """Send one encoded request, failing over until an endpoint answers"""
+        self.maybe_probe()
+        last_error: Optional[Exception] = None
+        for ep in self.ranked():
+            start = time.perf_counter()
+            try:
+                response = self.session.post(ep.url, data=data, timeout=self.timeout, **kwargs)
+                response.raise_for_status()
+                result = json.loads(response.content)
+            except (requests.RequestException, ValueError) as e:
+                self.record(ep, time.perf_counter() - start, ok=False)
+                last_error = e
+                continue
+            if _is_retryable(result):
+                self.record(ep, time.perf_counter() - start, ok=False)
+                last_error = ConnectionError(f"{ep.url}: {result['error']}")
+                continue
+            self.record(ep, time.perf_counter() - start, ok=True)
+            return result
+        raise last_error or ConnectionError("No RPC endpoint available")
+
+    # ---------- Health probes ----------
+
+    def maybe_probe(self) -> None:
+        with self._lock:
+            if self._probing or time.monotonic() - self._last_probe < self.probe_interval:
+                return
+            self._probing = True
+            self._last_probe = time.monotonic()
+        threading.Thread(target=self.probe, name="vanta-rpc-probe", daemon=True).start()
+
+    def probe(self) -> None:
+        """Measure every endpoint once, in parallel"""
+        payload = json.dumps({"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []})
+
+        def check(ep: EndpointStats):
+            start = time.perf_counter()
+            try:
+                response = self.session.post(ep.url, data=payload, timeout=self.timeout,
+                                             headers={"Content-Type": "application/json"})
+                response.raise_for_status()
+                ok = "result" in response.json()
+            except (requests.RequestException, ValueError):
+                ok = False
+            self.record(ep, time.perf_counter() - start, ok)
+
+        try:
+            threads = [threading.Thread(target=check, args=(ep,), daemon=True) for ep in self.endpoints]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            with self._lock:
+                self._probing = False
+                self._last_probe = time.monotonic()
+
+    def stats(self) -> List[Dict]:
+        with self._lock:
+            return [dict(url=ep.url, latency_ms=round(ep.latency * 1000, 1),
+                         error_rate=round(ep.error_rate, 3), healthy=ep.healthy)
+                    for ep in self.endpoints]
+
+
+def _is_retryable(result) -> bool:
+    if isinstance(result, list):
+        return any(_is_retryable(r) for r in result)
+    error = result.get("error") if isinstance(result, dict) else None
+    if not error:
+        return False
+    message = str(error.get("message", "")).lower()
+    return error.get("code") in RETRYABLE_RPC_CODES or "rate limit" in message or "too many requests" in message
+
+
+class RPCBatcher:
+    """
+    Coalesces JSON-RPC calls into batch POSTs. A call made while no
+    request is in flight goes out at once; calls made (from any thread)
+    while one is in flight queue up and leave together as one batch
+    when it returns, sent by one of the waiting callers. Batches leave
+    in call order, so a caller never sends for calls made after its own.
+    call_many() sends an explicit batch.
+    """
+
+    def __init__(self, router: EndpointRouter, max_batch: int = MAX_BATCH):
+        self.router = router
+        self.max_batch = max_batch
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sent = threading.Condition(self._lock)
+        self._queue: List[Tuple[dict, Future]] = []
+        self._sending = False
+
+    def _payload(self, method: str, params) -> dict:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+    def request(self, method: str, params) -> dict:
+        """Full JSON-RPC response for one call"""
+        future: Future = Future()
+        with self._lock:
+            self._queue.append((self._payload(method, params), future))
+        while True:
+            with self._lock:
+                while not future.done() and self._sending:
+                    self._sent.wait()
+                if future.done():
+                    break
+                # Nothing in flight and our call still queued: send the
+                # oldest batch (ours, or one ahead of it)
+                self._sending = True
+                items = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+            try:
+                self._send(items)
+            finally:
+                for _, pending in items:
+                    if not pending.done():  # _send died on a BaseException
+                        pending.set_exception(RPCError("Batch request aborted"))
+                with self._lock:
+                    self._sending = False
+                    self._sent.notify_all()
+        return future.result()
+
+    def _send(self, items: List[Tuple[dict, Future]]) -> None:
+        headers = {"Content-Type": "application/json"}
+        try:
+            if len(items) == 1:
+                payload, future = items[0]
+                future.set_result(self.router.post(json.dumps(payload, cls=Web3JsonEncoder), headers=headers))
+                return
+            responses = self.router.post(json.dumps([p for p, _ in items], cls=Web3JsonEncoder),
+                                         headers=headers)
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if not isinstance(responses, list):
+            # Endpoint refused the batch: answer the calls one by one
+            for item in items:
+                self._send([item])
+            return
+        by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+        for payload, future in items:
+            response = by_id.get(payload["id"])
+            if response is None:
+                future.set_exception(RPCError(f"No response for {payload['method']}"))
+            else:
+                future.set_result(response)
+
+    def call_many(self, calls: Sequence[Tuple[str, Any]]) -> List[Any]:
+        """Send [(method, params), ...] in one round trip; returns the results"""
+        items = [(self._payload(method, params), Future()) for method, params in calls]
+        for start in range(0, len(items), self.max_batch):
+            self._send(items[start:start + self.max_batch])
+        results = []
+        for payload, future in items:
+            response = future.result()
+            if response.get("error"):
+                raise RPCError(f"{payload['method']}: {response['error']}")
+            results.append(response.get("result"))
+        return results
+
+
+class RoutedHTTPProvider(PooledHTTPProvider):
+    """
+    Provider that sends each request to the best endpoint of a network,
+    batching concurrent calls.
+    """
+
+    def __init__(self, urls: List[str], session=None, timeout: float = DEFAULT_TIMEOUT, **router_kwargs):
+        super().__init__(urls[0], session=session, timeout=timeout)
+        self.router = EndpointRouter(urls, self.session, timeout, **router_kwargs)
+        self.batcher = RPCBatcher(self.router)
+
+    def make_request(self, method: RPCEndpoint, params) -> RPCResponse:
+        return self.batcher.request(method, params)
+
+    def batch(self, calls: Sequence[Tuple[str, Any]]) -> List[Any]:
+        """Raw results of several calls, one HTTP request"""
+        return self.batcher.call_many(calls)
@@ -0,0 +1,146 @@
+"""
+Vanta - Storage Backends
+Where IPFSManager pins content: NFT.Storage, any node speaking the
+IPFS HTTP API, or the bundled local pin server
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+CAR_TYPE = "application/car"
+
+NFT_STORAGE_URL = "https://api.nft.storage/upload"
+IPFS_API_URL = "http://127.0.0.1:5001"
+
+
+class StorageBackend(ABC):
+    """
+    One pinning service. post() sends a raw file or (content_type CAR_TYPE)
+    a CAR over the given requests session; cid() reads where it was
+    stored from a successful response. Rate limiting, retries and
+    progress are IPFSManager's job.
+    """
+    name = "storage"
+
+    def __init__(self, url: str):
+        self.url = url
+
+    @abstractmethod
+    def post(self, session, body, length: int, content_type: Optional[str], timeout: Tuple[float, float]):
+        ...
+
+    @abstractmethod
+    def cid(self, response, content_type: Optional[str]) -> str:
+        ...
+
+
+class NFTStorageBackend(StorageBackend):
+    """NFT.Storage /upload: the body as-is, CARs included"""
+    name = "nft.storage"
+
+    def __init__(self, key: str, url: str = NFT_STORAGE_URL):
+        super().__init__(url)
+        self.key = key
+
+    def post(self, session, body, length: int, content_type: Optional[str], timeout: Tuple[float, float]):
+        headers = {
+            "Authorization": f"Bearer {self.key}",
+            "Accept": "application/json"
+        }
+        if content_type:
+            headers["Content-Type"] = content_type
+        return session.post(self.url, headers=headers, data=body, timeout=timeout)
+
+    def cid(self, response, content_type: Optional[str]) -> str:
+        return response.json()['value']['cid']
+
+
+class IPFSHTTPBackend(StorageBackend):
+    """
+    IPFS HTTP API (Kubo, or a hosted node): files through /api/v0/add
+    with the same CIDv1 / raw-leaves / 1 MiB chunk settings as ipfs_cid,
+    CARs through /api/v0/dag/import. Kubo links at most 174 chunks per
+    node, so files over 174 MiB get a different CID than the local one.
+    """
+    name = "ipfs"
+
+    def __init__(self, url: str = IPFS_API_URL, auth: Tuple[str, str] = None):
+        super().__init__(url.rstrip("/"))
+        self.auth = auth
+
+    def post(self, session, body, length: int, content_type: Optional[str], timeout: Tuple[float, float]):
+        if content_type == CAR_TYPE:
+            endpoint = f"{self.url}/api/v0/dag/import?pin-roots=true"
+        else:
+            endpoint = (f"{self.url}/api/v0/add?cid-version=1&raw-leaves=true"
+                        f"&chunker=size-1048576&pin=true&progress=false")
+        form = _MultipartFile(body, length)
+        return session.post(endpoint, data=form, auth=self.auth, timeout=timeout,
+                            headers={"Content-Type": form.content_type})
+
+    def cid(self, response, content_type: Optional[str]) -> str:
+        if content_type != CAR_TYPE:
+            return response.json()["Hash"]
+        # dag/import streams one JSON object per line; the root is in one of them
+        for line in response.text.splitlines():
+            root = json.loads(line).get("Root") if line.strip() else None
+            if root:
+                if root.get("PinErrorMsg"):
+                    raise ValueError(f"Pin failed: {root['PinErrorMsg']}")
+                return root["Cid"]["/"]
+        raise ValueError("No root in dag/import response")
+
+
+class LocalBackend(NFTStorageBackend):
+    """The bundled pin server (pin_server.py), started on first use"""
+    name = "local"
+
+    def __init__(self):
+        from pin_server import get_local_pin_server
+        super().__init__(key="local", url=f"{get_local_pin_server().url}/upload")
+
+
+def backend_from_env(nft_storage_key: Optional[str]) -> Optional[StorageBackend]:
+    """
+    VANTA_STORAGE picks the backend: "nft.storage" (the default, needs a
+    key), "ipfs" (at VANTA_IPFS_API), "local" or "mock". None means mock:
+    CIDs are computed but nothing is stored.
+    """
+    name = os.environ.get("VANTA_STORAGE", "nft.storage").lower()
+    if name == "ipfs":
+        return IPFSHTTPBackend(os.environ.get("VANTA_IPFS_API", IPFS_API_URL))
+    if name == "local":
+        return LocalBackend()
+    if name == "nft.storage" and nft_storage_key:
+        return NFTStorageBackend(nft_storage_key)
+    return None
+
+
+class _MultipartFile:
+    """multipart/form-data wrapper around one streamed file, length known up front"""
+
+    def __init__(self, body, length: int):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        head = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="file"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self._parts = [io.BytesIO(head), body, io.BytesIO(tail)]
+        self.length = len(head) + length + len(tail)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def read(self, size: int = -1) -> bytes:
+        while self._parts:
+            data = self._parts[0].read(size)
+            if data:
+                return data
+            self._parts.pop(0)
+        return b""
+
@@ -0,0 +1,67 @@
+"""
+Vanta - Stroke Buffer
+Append-only point storage for live brush strokes
+"""
+from array import array
+from typing import List
+
+
+class StrokeBuffer:
+    """
+    Growable float32 buffer of x, y pairs for one stroke.
+
+    Storage is preallocated and doubled when full, so appending a point
+    never copies the points already recorded. Points closer than
+    `min_distance` to the last kept point are dropped.
+    """
+
+    def __init__(self, min_distance: float = 2.0, capacity: int = 256):
+        self.min_distance = min_distance
+        self._min_dist_sq = min_distance * min_distance
+        self._data = array('f', bytes(4 * 2 * max(capacity, 1)))
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data) // 2
+
+    def append(self, x: float, y: float) -> bool:
+        """Add a point; returns False when it was filtered out"""
+        n = self._count
+        if n:
+            dx = x - self._data[2 * n - 2]
+            dy = y - self._data[2 * n - 1]
+            if dx * dx + dy * dy < self._min_dist_sq:
+                return False
+
+        if 2 * n + 2 > len(self._data):
+            self._grow()
+
+        self._data[2 * n] = x
+        self._data[2 * n + 1] = y
+        self._count = n + 1
+        return True
+
+    def _grow(self) -> None:
+        """Double capacity in place (amortized O(1) per append)"""
+        self._data.extend(array('f', bytes(len(self._data) * 4)))
+
+    def last(self) -> tuple:
+        """Last kept point"""
+        n = self._count
+        return self._data[2 * n - 2], self._data[2 * n - 1]
+
+    def segment(self, start: int, end: int = None) -> List[float]:
+        """Flat [x0, y0, x1, y1, ...] list for points [start, end)"""
+        end = self._count if end is None else min(end, self._count)
+        return self._data[2 * start:2 * end].tolist()
+
+    def points(self) -> array:
+        """Flat float32 copy of every kept point"""
+        return self._data[:2 * self._count]
+
+    def clear(self) -> None:
+        self._count = 0
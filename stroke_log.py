@@ -0,0 +1,175 @@
+"""
+Vanta - Stroke Log
+Compact stroke history with undo/redo and binary serialization
+"""
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+MAGIC = b'VNTS'
+VERSION = 1
+
+# magic, version, reserved, canvas width, canvas height, stroke count
+_FILE_HEADER = struct.Struct('<4sHHffI')
+# point count of one stroke record
+_RECORD_HEADER = struct.Struct('<I')
+
+_STYLE_FIELDS = 5  # r, g, b, a, width
+
+
+class StrokeLogError(Exception):
+    """Stroke log decode error"""
+    pass
+
+
+class Stroke:
+    """
+    One finished stroke as a single float32 array:
+    [r, g, b, a, width, x0, y0, x1, y1, ...] in widget-local coordinates.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data: array):
+        self._data = data
+
+    @classmethod
+    def create(cls, color: Sequence[float], width: float,
+               points: Union[array, Sequence[float]]) -> 'Stroke':
+        data = array('f', (*color[:4], width))
+        data.extend(points if isinstance(points, array) else array('f', points))
+        return cls(data)
+
+    @property
+    def color(self) -> Tuple[float, float, float, float]:
+        return tuple(self._data[:4])
+
+    @property
+    def width(self) -> float:
+        return self._data[4]
+
+    @property
+    def points(self) -> array:
+        """Flat float32 [x0, y0, x1, y1, ...]"""
+        return self._data[_STYLE_FIELDS:]
+
+    def __len__(self) -> int:
+        return (len(self._data) - _STYLE_FIELDS) // 2
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(min_x, min_y, max_x, max_y) of the stroke centerline"""
+        pts = self.points
+        xs, ys = pts[0::2], pts[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate in-memory footprint"""
+        return sys.getsizeof(self) + sys.getsizeof(self._data)
+
+
+class StrokeLog:
+    """
+    Ordered stroke history. strokes[:cursor] are visible; the rest is
+    the redo stack, discarded as soon as a new stroke is added.
+    """
+
+    def __init__(self, size: Tuple[float, float] = (0, 0)):
+        self.size = size
+        self._strokes: List[Stroke] = []
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return self._cursor
+
+    def __iter__(self) -> Iterator[Stroke]:
+        for i in range(self._cursor):
+            yield self._strokes[i]
+
+    @property
+    def can_undo(self) -> bool:
+        return self._cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self._cursor < len(self._strokes)
+
+    def add(self, stroke: Stroke) -> None:
+        del self._strokes[self._cursor:]
+        self._strokes.append(stroke)
+        self._cursor += 1
+
+    def undo(self) -> Optional[Stroke]:
+        """Hide the last visible stroke and return it"""
+        if not self.can_undo:
+            return None
+        self._cursor -= 1
+        return self._strokes[self._cursor]
+
+    def redo(self) -> Optional[Stroke]:
+        """Re-show the next undone stroke and return it"""
+        if not self.can_redo:
+            return None
+        self._cursor += 1
+        return self._strokes[self._cursor - 1]
+
+    def clear(self) -> None:
+        self._strokes = []
+        self._cursor = 0
+
+    def memory_usage(self) -> int:
+        """Approximate bytes held by all records, including the redo stack"""
+        return sys.getsizeof(self._strokes) + sum(s.nbytes for s in self._strokes)
+
+    # ---------- Serialization ----------
+
+    def to_bytes(self) -> bytes:
+        """Encode visible strokes (little-endian float32)"""
+        parts = [_FILE_HEADER.pack(MAGIC, VERSION, 0, self.size[0], self.size[1], self._cursor)]
+        for stroke in self:
+            data = stroke._data
+            if sys.byteorder != 'little':
+                data = array('f', data)
+                data.byteswap()
+            parts.append(_RECORD_HEADER.pack(len(stroke)))
+            parts.append(data.tobytes())
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> 'StrokeLog':
+        try:
+            magic, version, _, width, height, count = _FILE_HEADER.unpack_from(raw, 0)
+        except struct.error as e:
+            raise StrokeLogError(f"Truncated header: {e}")
+        if magic != MAGIC:
+            raise StrokeLogError("Not a Vanta stroke file")
+        if version != VERSION:
+            raise StrokeLogError(f"Unsupported version: {version}")
+
+        log = cls((width, height))
+        offset = _FILE_HEADER.size
+        view = memoryview(raw)
+        for _ in range(count):
+            try:
+                (n_points,) = _RECORD_HEADER.unpack_from(raw, offset)
+            except struct.error as e:
+                raise StrokeLogError(f"Truncated record: {e}")
+            offset += _RECORD_HEADER.size
+            end = offset + 4 * (_STYLE_FIELDS + 2 * n_points)
+            if end > len(raw):
+                raise StrokeLogError("Truncated stroke data")
+            data = array('f')
+            data.frombytes(view[offset:end])
+            if sys.byteorder != 'little':
+                data.byteswap()
+            log.add(Stroke(data))
+            offset = end
+        return log
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'StrokeLog':
+        return cls.from_bytes(Path(path).read_bytes())
@@ -0,0 +1,21 @@
+"""
+Vanta - Test Setup
+The app modules and the benchmark stand-ins (rpc_stub, pin_stub) on
+sys.path, and a scratch working directory so pin indexes and wallet
+files stay out of the repo.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "benchmarks"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,91 @@
+"""
+Vanta - Pin Index Tests
+Content already pinned is not uploaded again, against the local
+pinning-service stub
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from ipfs_cid import file_cid
+from ipfs_manager import IPFSManager, PinIndex
+from pin_stub import PinStub
+from storage_backends import NFTStorageBackend
+
+IMAGE_SIZE = 50_000
+
+
+@pytest.fixture
+def stub():
+    stub = PinStub().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def image():
+    path = Path("art.png")
+    path.write_bytes(os.urandom(IMAGE_SIZE))
+    return str(path)
+
+
+def _manager(stub):
+    return IPFSManager(NFTStorageBackend("test", url=stub.url))
+
+
+def test_same_image_is_uploaded_once(stub, image):
+    m = _manager(stub)
+    uri = m.upload_image(image)
+    assert uri and uri.startswith("ipfs://")
+    assert stub.requests == 1
+
+    stub.reset()
+    assert m.upload_image(image) == uri
+    assert stub.requests == 0
+
+
+def test_identical_metadata_is_uploaded_once(stub):
+    m = _manager(stub)
+    metadata = m.create_metadata("Art", "test", "ipfs://bafyimage")
+    uri = m.upload_metadata(metadata)
+    assert uri
+
+    stub.reset()
+    assert m.upload_metadata(dict(metadata)) == uri
+    assert stub.requests == 0
+
+
+def test_bundle_skips_a_pinned_image(stub, image):
+    m = _manager(stub)
+    image_uri = m.upload_image(image)
+
+    stub.reset()
+    result = m.upload_bundle(image, "Art", "new description")
+    assert result is not None
+    assert result[0] == image_uri
+    # Only the new metadata went out, not the image again
+    assert stub.requests == 1
+    assert stub.bytes_received < IMAGE_SIZE
+
+
+def test_pins_survive_a_restart(stub, image):
+    uri = _manager(stub).upload_image(image)
+
+    stub.reset()
+    assert _manager(stub).upload_image(image) == uri
+    assert stub.requests == 0
+
+
+def test_pins_are_kept_per_backend(stub, image):
+    uri = _manager(stub).upload_image(image)
+
+    other = _manager(stub)
+    other.backend.name = "other"
+    stub.reset()
+    assert other.upload_image(image) == uri  # same content, same CID
+    assert stub.requests == 1
+
+    pins = PinIndex()
+    assert pins.get(file_cid(image), "nft.storage") == uri
+    assert pins.get(file_cid(image), "other") == uri
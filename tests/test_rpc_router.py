@@ -0,0 +1,123 @@
+"""
+Vanta - RPC Routing Tests
+Failover and latency ranking of EndpointRouter, and request batching,
+against the local JSON-RPC stub
+"""
+import json
+import socket
+
+import pytest
+from web3 import Web3
+
+from rpc import EndpointRouter, RoutedHTTPProvider
+from rpc_stub import RPCStub
+
+HEADERS = {"Content-Type": "application/json"}
+# No background health probes: every request the stubs see is the test's own
+NO_PROBES = float("inf")
+
+
+def _payload(method="eth_blockNumber", params=()):
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": list(params)})
+
+
+@pytest.fixture
+def dead_url():
+    """A local port nothing listens on: connections are refused at once"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def stubs():
+    started = []
+
+    def start(**kwargs):
+        stub = RPCStub(**kwargs).start()
+        started.append(stub)
+        return stub
+
+    yield start
+    for stub in started:
+        stub.stop()
+
+
+def test_fails_over_to_the_next_endpoint(stubs, dead_url):
+    stub = stubs()
+    router = EndpointRouter([dead_url, stub.url], probe_interval=NO_PROBES, timeout=2)
+
+    response = router.post(_payload(), headers=HEADERS)
+
+    assert int(response["result"], 16) == stub.block_number
+    dead, alive = router.endpoints
+    assert dead.failures == 1 and alive.failures == 0
+    assert stub.requests == 1
+
+
+def test_failed_endpoint_is_demoted(stubs, dead_url):
+    stub = stubs()
+    router = EndpointRouter([dead_url, stub.url], probe_interval=NO_PROBES, timeout=2)
+
+    router.post(_payload(), headers=HEADERS)
+
+    # Its error rate now ranks it behind the endpoint that answered
+    assert [ep.url for ep in router.ranked()] == [stub.url, dead_url]
+    for _ in range(3):
+        router.post(_payload(), headers=HEADERS)
+    assert router.endpoints[0].failures == 1
+    assert stub.requests == 4
+
+
+def test_benches_an_endpoint_after_max_failures(stubs, dead_url):
+    stub = stubs()
+    router = EndpointRouter([dead_url, stub.url], max_failures=1, cooldown=60,
+                            probe_interval=NO_PROBES, timeout=2)
+
+    router.post(_payload(), headers=HEADERS)
+
+    dead = router.endpoints[0]
+    assert not dead.healthy
+    assert dead.down_until > 0
+    # Benched endpoints are only a last resort
+    assert router.ranked()[-1] is dead
+
+
+def test_prefers_the_faster_endpoint(stubs):
+    slow, fast = stubs(latency=0.05), stubs()
+    router = EndpointRouter([slow.url, fast.url], probe_interval=NO_PROBES)
+
+    router.probe()
+
+    assert router.ranked()[0].url == fast.url
+    for _ in range(5):
+        router.post(_payload(), headers=HEADERS)
+    assert fast.requests == 1 + 5
+    assert slow.requests == 1  # the probe only
+
+
+def test_all_endpoints_down_raises(dead_url):
+    router = EndpointRouter([dead_url], probe_interval=NO_PROBES, timeout=2)
+
+    with pytest.raises(Exception):
+        router.post(_payload(), headers=HEADERS)
+
+
+def test_batch_is_one_http_request(stubs):
+    stub = stubs()
+    provider = RoutedHTTPProvider([stub.url], probe_interval=NO_PROBES)
+
+    results = provider.batch([("eth_blockNumber", []), ("eth_chainId", []), ("eth_blockNumber", [])])
+
+    assert int(results[0], 16) == stub.block_number
+    assert int(results[1], 16) == 137
+    assert stub.requests == 1
+
+
+def test_web3_calls_fail_over(stubs, dead_url):
+    stub = stubs()
+    w3 = Web3(RoutedHTTPProvider([dead_url, stub.url], probe_interval=NO_PROBES, timeout=2))
+
+    assert w3.eth.block_number == stub.block_number
+    assert w3.eth.chain_id == 137
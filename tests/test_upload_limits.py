@@ -0,0 +1,84 @@
+"""
+Vanta - Upload Rate Limit Tests
+Per-host upload slots and 429 backoff in IPFSManager.upload_many,
+against the local pinning-service stub
+"""
+import os
+from pathlib import Path
+
+import pytest
+import requests
+
+import ipfs_manager
+from ipfs_manager import IPFSManager, _retry_after
+from pin_stub import PinStub
+from storage_backends import NFTStorageBackend
+
+FILE_SIZE = 20_000
+
+
+@pytest.fixture
+def stub():
+    stub = PinStub(latency=0.1).start()
+    yield stub
+    stub.stop()
+
+
+def _images(count):
+    paths = []
+    for i in range(count):
+        path = Path(f"art_{i}.png")
+        path.write_bytes(os.urandom(FILE_SIZE))
+        paths.append(str(path))
+    return paths
+
+
+def _manager(stub, max_per_host):
+    m = IPFSManager(NFTStorageBackend("test", url=stub.url))
+    m.max_per_host = max_per_host
+    return m
+
+
+def test_workers_share_the_per_host_limit(stub):
+    paths = _images(8)
+    results = dict(_manager(stub, max_per_host=2).upload_many(paths, workers=8))
+
+    assert sorted(results) == sorted(paths)
+    assert all(results.values())
+    assert stub.peak_in_flight == 2
+    assert stub.rejected == 0
+
+
+def test_rate_limited_uploads_back_off_and_finish(stub, monkeypatch):
+    # Three in flight against a cap of two: every round has a 429
+    monkeypatch.setattr(ipfs_manager, "RATE_LIMIT_RETRIES", 20)
+    stub.max_concurrent, stub.retry_after = 2, 0.05
+    paths = _images(6)
+    results = dict(_manager(stub, max_per_host=3).upload_many(paths, workers=6))
+
+    assert stub.rejected > 0
+    assert all(results.get(path) for path in paths)
+    assert stub.requests == len(paths)
+
+
+def test_upload_gives_up_after_the_retries(stub, monkeypatch):
+    monkeypatch.setattr(ipfs_manager, "RATE_LIMIT_RETRIES", 2)
+    monkeypatch.setattr(ipfs_manager, "BACKOFF_BASE", 0.01)
+    stub.max_concurrent = -1  # every request is over the cap
+    path, = _images(1)
+
+    assert _manager(stub, max_per_host=1).upload_image(path) is None
+    assert stub.rejected == 3
+
+
+def _response(headers):
+    response = requests.Response()
+    response.headers.update(headers)
+    return response
+
+
+def test_retry_after_header():
+    assert _retry_after(_response({"Retry-After": "1.5"})) == 1.5
+    assert _retry_after(_response({"Retry-After": "-3"})) == 0.0
+    assert _retry_after(_response({"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+    assert _retry_after(_response({})) is None
@@ -0,0 +1,354 @@
+"""
+Vanta - Transaction Manager
+Runs the build → sign → send → confirm lifecycle off the UI thread
+"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fee_oracle import get_fee_oracle
+from receipt_tracker import get_receipt_tracker
+
+FEE_FIELDS = ('gasPrice', 'maxFeePerGas', 'maxPriorityFeePerGas')
+
+
+class TxState(Enum):
+    QUEUED = "queued"
+    BUILDING = "building"
+    SIGNING = "signing"
+    SENDING = "sending"
+    PENDING = "pending"
+    CONFIRMED = "confirmed"
+    FAILED = "failed"
+
+    @property
+    def is_final(self) -> bool:
+        return self in (TxState.CONFIRMED, TxState.FAILED)
+
+
+@dataclass
+class TxJob:
+    """One transaction moving through the lifecycle"""
+    id: int
+    label: str
+    network: str
+    state: TxState = TxState.QUEUED
+    tx_hash: Optional[str] = None
+    receipt: Any = None
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    nonce: Optional[int] = None
+    # NonceManager counter the nonce came from
+    nonce_key: Optional[Tuple[str, str]] = None
+    created_at: float = field(default_factory=time.time)
+    sent_at: Optional[float] = None
+    # Every broadcast version of this nonce, oldest first (speed-ups add more)
+    tx_hashes: List[str] = field(default_factory=list)
+    bumped_at: Optional[float] = None
+    bumps: int = 0
+
+    tx: Optional[dict] = field(default=None, repr=False)
+    build: Optional[Callable[[], Optional[Tuple[dict, Optional[Tuple[str, str]]]]]] = field(default=None, repr=False)
+    finalize: Optional[Callable[[str, Any], Optional[Dict]]] = field(default=None, repr=False)
+    on_update: Optional[Callable[["TxJob"], None]] = field(default=None, repr=False)
+
+
+class TransactionManager:
+    """
+    Owns transaction state on worker threads. The UI thread only ever
+    calls submit(); every state change is reported through the job's
+    on_update callback, which runs on a worker thread (marshal to the
+    UI with Clock.schedule_once).
+
+    Receipts come from the shared ReceiptTracker; the manager's own
+    watchdog only handles timeouts and speed-ups, without any RPC.
+    """
+
+    def __init__(self, wallet_manager, max_workers: int = 2,
+                 poll_interval: float = 3.0, confirm_timeout: float = 300.0,
+                 stuck_after: Optional[float] = 60.0, max_bumps: int = 3):
+        self.wm = wallet_manager
+        self.receipts = get_receipt_tracker(wallet_manager)
+        self.poll_interval = poll_interval
+        self.confirm_timeout = confirm_timeout
+        # Pending longer than this (seconds, None = never) -> automatic speed-up
+        self.stuck_after = stuck_after
+        self.max_bumps = max_bumps
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vanta-tx")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending: Dict[int, TxJob] = {}
+        self._watchdog: Optional[threading.Thread] = None
+        self._receipt_waits: Dict[int, List[Tuple[str, Future]]] = {}
+
+    # ---------- Submission ----------
+
+    def submit(self, build: Callable[[], Optional[Tuple[dict, Optional[Tuple[str, str]]]]],
+               finalize: Optional[Callable[[str, Any], Optional[Dict]]] = None,
+               on_update: Optional[Callable[[TxJob], None]] = None,
+               label: str = "tx", network: Optional[str] = None) -> TxJob:
+        """
+        Queue a transaction. `build` returns (unsigned tx dict, nonce key
+        from wm.nonces.allocate()), or None to fail, and runs on a worker;
+        `finalize(tx_hash, receipt)` turns
+        a successful receipt into the job result. The job fails if the
+        wallet is not on `network` (default: the current one) when it runs.
+        """
+        job = TxJob(next(self._ids), label, network or self.wm.current_network,
+                    build=build, finalize=finalize, on_update=on_update)
+        self._emit(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def submit_local(self, fn: Callable[[], Optional[Dict]],
+                     on_update: Optional[Callable[[TxJob], None]] = None,
+                     label: str = "local") -> TxJob:
+        """Run a non-chain step (e.g. mock mint) with the same lifecycle"""
+        job = TxJob(next(self._ids), label, self.wm.current_network, on_update=on_update)
+        self._emit(job)
+
+        def run():
+            try:
+                result = fn()
+            except Exception as e:
+                return self._fail(job, str(e))
+            if result is None:
+                return self._fail(job, "no result")
+            job.result = result
+            job.tx_hash = result.get("tx_hash")
+            self._set_state(job, TxState.CONFIRMED)
+
+        self._executor.submit(run)
+        return job
+
+    def watch(self, tx_hash: str,
+              finalize: Optional[Callable[[str, Any], Optional[Dict]]] = None,
+              on_update: Optional[Callable[[TxJob], None]] = None,
+              label: str = "tx", network: Optional[str] = None) -> TxJob:
+        """Track a transaction sent earlier (e.g. before an app restart) on `network`"""
+        job = TxJob(next(self._ids), label, network or self.wm.current_network,
+                    tx_hash=tx_hash, sent_at=time.time(), tx_hashes=[tx_hash],
+                    finalize=finalize, on_update=on_update)
+        with self._lock:
+            self._pending[job.id] = job
+        self._set_state(job, TxState.PENDING)
+        self._track(job, tx_hash)
+        self._ensure_watchdog()
+        return job
+
+    def speed_up(self, job: TxJob, speed: str = "fast") -> None:
+        """
+        Re-broadcast a pending transaction with the same nonce and bumped
+        fees (runs on a worker). Whichever version is mined resolves the job.
+        """
+        self._executor.submit(self._replace, job, speed)
+
+    # ---------- Lifecycle ----------
+
+    def _run(self, job: TxJob) -> None:
+        try:
+            if job.network != self.wm.current_network:
+                return self._fail(job, f"wallet is on {self.wm.current_network}, not {job.network}")
+            self._set_state(job, TxState.BUILDING)
+            built = job.build()
+            if not built:
+                return self._fail(job, "build failed")
+            tx, job.nonce_key = built
+            job.nonce = tx.get('nonce')
+            job.tx = tx
+
+            self._set_state(job, TxState.SIGNING)
+            signed = self.wm.sign_transaction(tx)
+            if not signed:
+                self._release_nonce(job)
+                return self._fail(job, "wallet locked" if self.wm.is_locked else "signing failed")
+
+            # Known before broadcast: listeners checkpoint it on SENDING, so
+            # a crash right after sending can't lose track of the tx
+            from web3 import Web3
+            job.tx_hash = Web3.keccak(signed).hex()
+            self._set_state(job, TxState.SENDING)
+            tx_hash = self.wm.send_transaction(signed)
+            if not tx_hash:
+                # Nonce too low, already known, node hiccup...: trust the node again
+                job.tx_hash = None
+                self._release_nonce(job)
+                self.wm.nonces.resync(job.nonce_key)
+                return self._fail(job, "send failed")
+        except Exception as e:
+            job.tx_hash = None
+            self._release_nonce(job)
+            return self._fail(job, str(e))
+
+        job.tx_hash = tx_hash
+        job.tx_hashes.append(tx_hash)
+        job.sent_at = time.time()
+        print(f"⏳ {job.label} sent: {tx_hash[:20]}...")
+        with self._lock:
+            self._pending[job.id] = job
+        self._set_state(job, TxState.PENDING)
+        self._track(job, tx_hash)
+        self._ensure_watchdog()
+
+    def _track(self, job: TxJob, tx_hash: str) -> None:
+        """Resolve the job when this version of it is mined"""
+        future = self.receipts.track(tx_hash, job.network)
+        with self._lock:
+            self._receipt_waits.setdefault(job.id, []).append((tx_hash, future))
+
+        def done(f):
+            if not f.cancelled():
+                self._on_receipt(job, tx_hash, f.result())
+
+        future.add_done_callback(done)
+
+    def _ensure_watchdog(self) -> None:
+        with self._lock:
+            if self._watchdog and self._watchdog.is_alive():
+                return
+            self._watchdog = threading.Thread(target=self._watchdog_loop, name="vanta-tx-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def _watchdog_loop(self) -> None:
+        """Time out or speed up jobs still pending, until none are left"""
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                jobs = list(self._pending.values())
+                if not jobs:
+                    self._watchdog = None
+                    return
+            now = time.time()
+            for job in jobs:
+                if now - job.sent_at > self.confirm_timeout:
+                    self._resolve(job, None, "confirmation timeout")
+                elif (self.stuck_after is not None and job.bumps < self.max_bumps
+                      and now - (job.bumped_at or job.sent_at) > self.stuck_after):
+                    self._replace(job, "fast")
+
+    def _on_receipt(self, job: TxJob, tx_hash: str, receipt) -> None:
+        with self._lock:
+            if job.id not in self._pending:
+                return  # another version was mined first, or timed out
+        job.tx_hash = tx_hash
+        if receipt.status != 1:
+            # Cached gas limits may be too low now (e.g. longer token URIs)
+            get_fee_oracle(self.wm).invalidate_gas()
+            self._resolve(job, receipt, "transaction reverted")
+            return
+        self._resolve(job, receipt, None)
+
+    def _replace(self, job: TxJob, speed: str) -> bool:
+        if job.state != TxState.PENDING:
+            return False
+        if job.network != self.wm.current_network:
+            # Would be signed and sent through the wrong network's provider
+            job.bumped_at = time.time()
+            return False
+        try:
+            w3 = self.wm.get_web3()
+            if w3 is None:
+                raise RuntimeError("No blockchain connection")
+            old = job.tx or self._fetch_tx(w3, job.tx_hash)
+            tx = {k: v for k, v in old.items() if k not in FEE_FIELDS}
+            tx.update(get_fee_oracle(self.wm).replacement_params(old, speed))
+            signed = self.wm.sign_transaction(tx)
+            tx_hash = self.wm.send_transaction(signed) if signed else None
+            if not tx_hash:
+                raise RuntimeError("replacement not accepted")
+        except Exception as e:
+            # The original may have just been mined; the tracker will tell
+            print(f"⚠️ {job.label} speed-up failed: {e}")
+            job.bumped_at = time.time()
+            return False
+
+        job.tx = tx
+        job.tx_hash = tx_hash
+        job.tx_hashes.append(tx_hash)
+        job.bumped_at = time.time()
+        job.bumps += 1
+        print(f"🚀 {job.label} sped up (x{job.bumps}): {tx_hash[:20]}...")
+        self._emit(job)
+        self._track(job, tx_hash)
+        return True
+
+    @staticmethod
+    def _fetch_tx(w3, tx_hash: str) -> dict:
+        """Rebuild a signable tx dict from a transaction the node knows"""
+        sent = w3.eth.get_transaction(tx_hash)
+        tx = {
+            'to': sent['to'],
+            'value': sent['value'],
+            'data': sent['input'],
+            'gas': sent['gas'],
+            'nonce': sent['nonce'],
+        }
+        if sent.get('chainId') is not None:
+            tx['chainId'] = sent['chainId']
+        if sent.get('maxFeePerGas') is not None:
+            tx['maxFeePerGas'] = sent['maxFeePerGas']
+            tx['maxPriorityFeePerGas'] = sent['maxPriorityFeePerGas']
+        else:
+            tx['gasPrice'] = sent['gasPrice']
+        return tx
+
+    def _release_nonce(self, job: TxJob) -> None:
+        if job.nonce is not None:
+            self.wm.nonces.release(job.nonce, job.nonce_key)
+            job.nonce = None
+
+    def _resolve(self, job: TxJob, receipt, error: Optional[str]) -> None:
+        with self._lock:
+            if self._pending.pop(job.id, None) is None:
+                return
+            waits = self._receipt_waits.pop(job.id, [])
+        for tx_hash, future in waits:
+            self.receipts.untrack(tx_hash, future)
+        job.receipt = receipt
+        if receipt is not None and job.nonce is not None:
+            # Mined (even if reverted): the nonce is used up
+            self.wm.nonces.confirm(job.nonce, job.nonce_key)
+        if error:
+            return self._fail(job, error)
+        try:
+            job.result = job.finalize(job.tx_hash, receipt) if job.finalize else {"tx_hash": job.tx_hash}
+        except Exception as e:
+            return self._fail(job, str(e))
+        self._set_state(job, TxState.CONFIRMED)
+
+    def _fail(self, job: TxJob, error: str) -> None:
+        job.error = error
+        print(f"❌ {job.label} failed: {error}")
+        self._set_state(job, TxState.FAILED)
+
+    def _set_state(self, job: TxJob, state: TxState) -> None:
+        job.state = state
+        self._emit(job)
+
+    def _emit(self, job: TxJob) -> None:
+        if job.on_update:
+            try:
+                job.on_update(job)
+            except Exception as e:
+                print(f"Tx listener error: {e}")
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_tx_manager: Optional[TransactionManager] = None
+
+
+def get_tx_manager(wallet_manager) -> TransactionManager:
+    global _tx_manager
+    if _tx_manager is None:
+        _tx_manager = TransactionManager(wallet_manager)
+    return _tx_manager
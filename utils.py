@@ -101,4 +101,16 @@ class Cache:
         now = time.time()
         expired = [k for k, v in cls._cache.items() if v['expires'] < now]
         for k in expired:
-            del cls._cache[k]
\ No newline at end of file
+            del cls._cache[k]
+
+
+def pooled_session(pool_size: int = 16, retries: int = 0):
+    """requests.Session with keep-alive and a larger per-host connection pool"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -3,52 +3,93 @@ Vanta - Wallet Manager (Optimized)
 """
 from __future__ import annotations
 
+import importlib.util
 import json
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Callable
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Dict, Callable, List, Set, Tuple
+from dataclasses import dataclass, field
 
-from eth_account import Account
-from eth_account.signers.local import LocalAccount
+from keystore import (KeySession, KeystoreError, SECRET_MNEMONIC, decrypt_secret,
+                      encrypt_secret, secret_kind)
+from utils import pooled_session
 
-try:
+if TYPE_CHECKING:
+    from eth_account.signers.local import LocalAccount
     from web3 import Web3
-    WEB3_AVAILABLE = True
-except ImportError:
-    WEB3_AVAILABLE = False
 
+# eth_account and web3 take over a second to import on a cold start, so
+# they are only imported when a wallet or connection is first needed
+WEB3_AVAILABLE = importlib.util.find_spec("web3") is not None
 
-Account.enable_unaudited_hdwallet_features()
+
+def _account_class():
+    from eth_account import Account
+    Account.enable_unaudited_hdwallet_features()
+    return Account
+
+
+# BIP-44 Ethereum accounts: m/44'/60'/0'/0/<index>
+HD_BASE_PATH = "m/44'/60'/0'/0"
+# Unused addresses in a row after which account discovery stops
+GAP_LIMIT = 20
+
+# NonceManager counter: (network, address)
+NonceKey = Tuple[str, str]
 
 
 @dataclass
 class NetworkConfig:
     name: str
-    rpc_url: str
+    rpc_urls: List[str]  # tried fastest-first by the endpoint router
     chain_id: int
     symbol: str
     explorer: str
+    ws_urls: List[str] = field(default_factory=list)  # optional, for new-head subscriptions
+    
+    def __post_init__(self):
+        if isinstance(self.rpc_urls, str):
+            self.rpc_urls = [self.rpc_urls]
+    
+    @property
+    def rpc_url(self) -> str:
+        """Primary endpoint"""
+        return self.rpc_urls[0]
 
 
 NETWORKS = {
     "ethereum": NetworkConfig(
         "Ethereum",
-        "https://eth.llamarpc.com",
+        [
+            "https://eth.llamarpc.com",
+            "https://ethereum-rpc.publicnode.com",
+            "https://rpc.ankr.com/eth",
+        ],
         1,
         "ETH",
-        "etherscan.io"
+        "etherscan.io",
+        ["wss://ethereum-rpc.publicnode.com"]
     ),
     "polygon": NetworkConfig(
         "Polygon",
-        "https://polygon-rpc.com",
+        [
+            "https://polygon-rpc.com",
+            "https://polygon-bor-rpc.publicnode.com",
+            "https://rpc.ankr.com/polygon",
+        ],
         137,
         "MATIC",
-        "polygonscan.com"
+        "polygonscan.com",
+        ["wss://polygon-bor-rpc.publicnode.com"]
     ),
     "mumbai": NetworkConfig(
         "Mumbai Testnet",
-        "https://rpc-mumbai.maticvigil.com",
+        [
+            "https://rpc-mumbai.maticvigil.com",
+            "https://rpc.ankr.com/polygon_mumbai",
+        ],
         80001,
         "MATIC",
         "mumbai.polygonscan.com"
@@ -56,11 +97,154 @@ NETWORKS = {
 }
 
 
+def _apply_env_overrides() -> None:
+    """
+    VANTA_RPC_<NETWORK>="url1,url2" replaces that network's endpoints,
+    VANTA_WS_<NETWORK> its websocket endpoints ("" disables them)
+    """
+    for key, config in NETWORKS.items():
+        override = os.environ.get(f"VANTA_RPC_{key.upper()}")
+        if override:
+            config.rpc_urls = [url.strip() for url in override.split(",") if url.strip()]
+        override = os.environ.get(f"VANTA_WS_{key.upper()}")
+        if override is not None:
+            config.ws_urls = [url.strip() for url in override.split(",") if url.strip()]
+
+
+_apply_env_overrides()
+
+
 class WalletError(Exception):
     """Wallet operation error"""
     pass
 
 
+class HDKeyring:
+    """
+    Accounts of one mnemonic. The seed (PBKDF2) and the HD_BASE_PATH
+    node are derived once; after that each account index costs a single
+    child derivation, and derived accounts are cached.
+    """
+    
+    def __init__(self, mnemonic: str, base_path: str = HD_BASE_PATH):
+        from eth_account.hdaccount import seed_from_mnemonic
+        from eth_account.hdaccount.deterministic import HDPath, derive_child_key, hmac_sha512
+        
+        _account_class()
+        self.mnemonic = " ".join(mnemonic.split())
+        self.base_path = base_path
+        master = hmac_sha512(b"Bitcoin seed", seed_from_mnemonic(self.mnemonic, ""))
+        key, chain_code = master[:32], master[32:]
+        for node in HDPath(base_path)._path:
+            key, chain_code = derive_child_key(key, chain_code, node)
+        self._parent = (key, chain_code)
+        self._lock = threading.Lock()
+        self._accounts: Dict[int, LocalAccount] = {}
+    
+    def account(self, index: int) -> LocalAccount:
+        """Account at base_path/index (thread-safe, cached)"""
+        with self._lock:
+            cached = self._accounts.get(index)
+        if cached is not None:
+            return cached
+        
+        from eth_account.hdaccount.deterministic import SoftNode, derive_child_key
+        key, _ = derive_child_key(*self._parent, SoftNode(index))
+        account = _account_class().from_key(key)
+        with self._lock:
+            return self._accounts.setdefault(index, account)
+    
+    def path(self, index: int) -> str:
+        return f"{self.base_path}/{index}"
+
+
+class NonceManager:
+    """
+    Hands out nonces per (network, address) from a local counter, so
+    several signed transactions can be in flight without a round trip
+    each. The counter is seeded from the `pending` block tag and
+    resynced from it whenever a send fails.
+    
+    allocate() returns the (network, address) key along with the nonce;
+    pass it back to release()/confirm()/resync(), so a network or
+    account switch while a tx is in flight can't touch the wrong counter.
+    """
+    
+    def __init__(self, wallet_manager: "WalletManager"):
+        self.wm = wallet_manager
+        self._lock = threading.Lock()
+        self._next: Dict[NonceKey, int] = {}
+        self._gaps: Dict[NonceKey, Set[int]] = {}
+        self._in_flight: Dict[NonceKey, Set[int]] = {}
+    
+    def _key(self) -> NonceKey:
+        return self.wm.current_network, self.wm.address
+    
+    def _fetch(self, key: NonceKey) -> int:
+        network, address = key
+        try:
+            return self.wm.get_web3_for(network).eth.get_transaction_count(address, "pending")
+        except Exception as e:
+            raise WalletError(f"Could not fetch pending nonce: {e}")
+    
+    def allocate(self) -> Tuple[NonceKey, int]:
+        """Reserve the next nonce for the current network and address: (key, nonce)"""
+        key = self._key()
+        with self._lock:
+            if key not in self._next:
+                self._next[key] = self._fetch(key)
+                self._gaps[key] = set()
+                self._in_flight[key] = set()
+            
+            gaps = self._gaps[key]
+            if gaps:
+                # Fill holes left by failed sends first, or later txs stall
+                nonce = min(gaps)
+                gaps.discard(nonce)
+            else:
+                nonce = self._next[key]
+                self._next[key] += 1
+            self._in_flight[key].add(nonce)
+            return key, nonce
+    
+    def release(self, nonce: int, key: NonceKey) -> None:
+        """Give back a nonce whose transaction was never broadcast"""
+        with self._lock:
+            if key not in self._next:
+                return
+            self._in_flight[key].discard(nonce)
+            if nonce == self._next[key] - 1:
+                self._next[key] -= 1
+            elif nonce < self._next[key]:
+                self._gaps[key].add(nonce)
+    
+    def confirm(self, nonce: int, key: NonceKey) -> None:
+        """Mark a nonce as mined"""
+        with self._lock:
+            if key in self._in_flight:
+                self._in_flight[key].discard(nonce)
+    
+    def resync(self, key: Optional[NonceKey] = None) -> Optional[int]:
+        """Reset a counter (default: the current one) from the node's pending nonce"""
+        key = key or self._key()
+        with self._lock:
+            try:
+                chain_next = self._fetch(key)
+            except WalletError as e:
+                print(f"⚠️ Nonce resync failed: {e}")
+                self._next.pop(key, None)
+                return None
+            self._next[key] = chain_next
+            self._gaps[key] = set()
+            self._in_flight[key] = {n for n in self._in_flight.get(key, ()) if n < chain_next}
+            return chain_next
+    
+    def pending(self, key: Optional[NonceKey] = None) -> int:
+        """Nonces handed out but not yet confirmed"""
+        with self._lock:
+            return len(self._in_flight.get(key or self._key(), ()))
+
+
 class WalletManager:
     _instance = None
     
@@ -74,16 +258,37 @@ class WalletManager:
         if self._initialized:
             return
             
+        self._account_loaded = False
+        self._address = ""
+        self._is_hd = False
+        self._account_index = 0
+        # HD account index -> address, known without unlocking
+        self._addresses: Dict[int, str] = {}
+        # Plaintext wallets only; an encrypted wallet's unlocked key or
+        # keyring lives in self.session
         self._account: Optional[LocalAccount] = None
+        self._keyring: Optional[HDKeyring] = None
+        self._keystore: Optional[Dict] = None
+        self.session = KeySession(on_expire=self._on_session_expired)
+        self._derive_pool: Optional[ThreadPoolExecutor] = None
+        self._account_lock = threading.RLock()
         self._current_network = "polygon"
         self._web3: Optional[Web3] = None
+        # One lazily built provider per network, all on one keep-alive session
+        self._providers: Dict[str, Web3] = {}
+        self._session = None
         self._listeners: list[Callable] = []
+        self.nonces = NonceManager(self)
         
+        # Nothing is read or connected here: see warm_up()
         self._wallet_file = Path("vanta_wallet.json")
-        self._load_or_create()
-        self._connect_web3()
         self._initialized = True
     
+    def warm_up(self) -> None:
+        """Load the wallet and connect. Blocking; run it off the UI thread."""
+        self._ensure_account()
+        self._current_web3()
+    
     def add_listener(self, callback: Callable):
         """Add state change listener"""
         self._listeners.append(callback)
@@ -96,38 +301,332 @@ class WalletManager:
             except Exception as e:
                 print(f"Listener error: {e}")
     
+    def _ensure_account(self) -> None:
+        with self._account_lock:
+            if not self._account_loaded:
+                self._load_or_create()
+                self._account_loaded = True
+    
     def _load_or_create(self) -> None:
         """Load existing wallet or create new one"""
+        Account = _account_class()
         if self._wallet_file.exists():
             try:
                 data = json.loads(self._wallet_file.read_text(encoding="utf-8"))
+                if data.get("keystore"):
+                    # Only addresses until unlock(): no KDF at startup
+                    self._keystore = data["keystore"]
+                    self._is_hd = secret_kind(self._keystore) == SECRET_MNEMONIC
+                    self._addresses = {int(i): a for i, a in (data.get("addresses") or {}).items()}
+                    self._account_index = data.get("account_index", 0)
+                    self._address = data.get("address", "")
+                    print(f"🔒 Encrypted wallet: {self._address[:12]}...")
+                    return
+                if data.get("mnemonic"):
+                    keyring = HDKeyring(data["mnemonic"])
+                    addresses = data.get("addresses") or {
+                        i: keyring.account(i).address for i in data.get("accounts") or [0]}
+                    self._use_keyring(keyring, data.get("account_index", 0),
+                                      {int(i): a for i, a in addresses.items()})
+                    print(f"✅ HD wallet loaded: {self._address[:12]}... (#{self._account_index})")
+                    return
                 pk = data.get("private_key")
                 if pk:
-                    self._account = Account.from_key(pk)
-                    print(f"✅ Wallet loaded: {self.address[:12]}...")
+                    self._use_key(Account.from_key(pk))
+                    print(f"✅ Wallet loaded: {self._address[:12]}...")
                     return
             except Exception as e:
                 print(f"⚠️ Wallet load error: {e}")
         
-        # Create new
-        self._account = Account.create()
+        # Create new: owner-only plaintext until set_password, which the
+        # app asks for as soon as it sees an unencrypted wallet
+        _, mnemonic = Account.create_with_mnemonic()
+        self._use_keyring(HDKeyring(mnemonic))
         self._save()
-        print(f"🆕 New wallet: {self.address[:12]}...")
+        print(f"🆕 New wallet: {self._address[:12]}...")
+    
+    def _use_keyring(self, keyring: HDKeyring, index: int = 0,
+                     addresses: Optional[Dict[int, str]] = None) -> None:
+        """Hold a plaintext HD wallet"""
+        self._keystore = None
+        self._keyring, self._account = keyring, None
+        self._is_hd = True
+        self._account_index = index
+        self._addresses = dict(addresses or {})
+        self._addresses.setdefault(index, keyring.account(index).address)
+        self._address = self._addresses[index]
+    
+    def _use_key(self, account: LocalAccount) -> None:
+        """Hold a plaintext single-key wallet"""
+        self._keystore = None
+        self._keyring, self._account = None, account
+        self._is_hd = False
+        self._account_index = 0
+        self._addresses = {}
+        self._address = account.address
     
     def _save(self) -> None:
         """Persist wallet securely"""
-        if self._account:
-            data = {
-                "private_key": self._account.key.hex(),
-                "address": self.address,
-                "created_at": str(Path().stat().st_ctime)
-            }
-            # Set restrictive permissions (Unix)
-            self._wallet_file.write_text(json.dumps(data), encoding="utf-8")
+        if self._keystore is not None:
+            data = {"keystore": self._keystore}
+        elif self._keyring is not None:
+            data = {"mnemonic": self._keyring.mnemonic}
+        elif self._account is not None:
+            data = {"private_key": self._account.key.hex()}
+        else:
+            return
+        if self._is_hd:
+            data["account_index"] = self._account_index
+            data["addresses"] = {str(i): a for i, a in sorted(self._addresses.items())}
+        data["address"] = self._address
+        data["created_at"] = str(Path().stat().st_ctime)
+        # Owner-only from the moment the file exists, not chmod'ed afterwards
+        fd = os.open(self._wallet_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(data))
+        try:
+            os.chmod(self._wallet_file, 0o600)  # files written before this change
+        except:
+            pass  # Windows doesn't support Unix permissions
+        if self._keystore is None:
+            print("⚠️ Wallet stored UNENCRYPTED: set a password to protect it")
+    
+    # ---------- Keystore ----------
+    
+    @property
+    def is_encrypted(self) -> bool:
+        self._ensure_account()
+        return self._keystore is not None
+    
+    @property
+    def is_locked(self) -> bool:
+        """True while an encrypted wallet's keys aren't in memory"""
+        return self.is_encrypted and not self.session.is_open
+    
+    def _unlocked(self):
+        """The wallet's HDKeyring or LocalAccount; None while locked"""
+        self._ensure_account()
+        if self._keystore is None:
+            return self._keyring or self._account
+        return self.session.get()
+    
+    def unlock(self, password: str) -> None:
+        """Decrypt the keystore into the session. Blocking (KDF): see unlock_async."""
+        self._ensure_account()
+        keystore = self._keystore
+        if keystore is None:
+            return
+        secret = decrypt_secret(keystore, password)
+        if self._is_hd:
+            unlocked = HDKeyring(secret.decode("utf-8"))
+            address = unlocked.account(self._account_index).address
+        else:
+            unlocked = _account_class().from_key(secret)
+            address = unlocked.address
+        if address != self._address:
+            raise KeystoreError("Keystore does not match the wallet address")
+        self.session.open(unlocked)
+        print("🔓 Wallet unlocked")
+        self._notify()
+    
+    def unlock_async(self, password: str, callback: Callable[[Optional[str]], None]) -> None:
+        """unlock() on a worker; callback(error or None) runs on that worker"""
+        def run():
+            try:
+                self.unlock(password)
+            except Exception as e:
+                return callback(str(e) or type(e).__name__)
+            callback(None)
+        
+        threading.Thread(target=run, name="vanta-unlock", daemon=True).start()
+    
+    def lock(self) -> None:
+        """Drop the decrypted keys now (no-op for plaintext wallets)"""
+        self.session.lock()
+    
+    def _on_session_expired(self) -> None:
+        print("🔒 Wallet locked")
+        self._notify()
+    
+    def set_password(self, password: str, profile: str = None) -> None:
+        """
+        Encrypt the wallet with `password`, replacing the plaintext file
+        (or re-encrypt it with a new one). `profile` picks the KDF cost,
+        see keystore.KDF_PROFILES. Blocking (KDF).
+        """
+        unlocked = self._unlocked()
+        if unlocked is None:
+            raise WalletError("Wallet is locked")
+        keystore = self._encrypt(unlocked, password, profile)
+        with self._account_lock:
+            self._keystore = keystore
+            self._keyring, self._account = None, None
+            self._save()
+        self.session.open(unlocked)
+        print("🔐 Wallet encrypted")
+        self._notify()
+    
+    @staticmethod
+    def _encrypt(unlocked, password: str, profile: str = None) -> Dict:
+        if isinstance(unlocked, HDKeyring):
+            return encrypt_secret(unlocked.mnemonic.encode("utf-8"), password, profile,
+                                  kind=SECRET_MNEMONIC)
+        return encrypt_secret(unlocked.key, password, profile, address=unlocked.address)
+    
+    # ---------- Accounts ----------
+    
+    @property
+    def is_hd(self) -> bool:
+        self._ensure_account()
+        return self._is_hd
+    
+    @property
+    def account_index(self) -> int:
+        return self._account_index
+    
+    def list_accounts(self) -> List[Dict]:
+        """Known accounts of the wallet: [{"index", "address", "path"}]"""
+        self._ensure_account()
+        if not self._is_hd:
+            return [{"index": 0, "address": self._address, "path": None}]
+        return [{"index": i, "address": a, "path": f"{HD_BASE_PATH}/{i}"}
+                for i, a in sorted(self._addresses.items())]
+    
+    def switch_account(self, index: int) -> bool:
+        """
+        Make another HD account current. No RPC, and no unlock for
+        accounts already known; new indexes are derived (cached).
+        """
+        self._ensure_account()
+        if not self._is_hd:
+            print("❌ Not an HD wallet")
+            return False
+        address = self._addresses.get(index)
+        if address is None:
+            keyring = self._unlocked()
+            if keyring is None:
+                print("🔒 Unlock the wallet to add accounts")
+                return False
+            address = keyring.account(index).address
+        with self._account_lock:
+            self._account_index = index
+            self._addresses[index] = address
+            self._address = address
+            self._save()
+        self._notify()
+        print(f"👤 Account #{index}: {address[:12]}...")
+        return True
+    
+    def add_account(self) -> int:
+        """Derive the next unused index and switch to it"""
+        self._ensure_account()
+        if not self._is_hd:
+            raise WalletError("Not an HD wallet")
+        index = max(self._addresses) + 1
+        if not self.switch_account(index):
+            raise WalletError("Wallet is locked")
+        return index
+    
+    def import_mnemonic(self, mnemonic: str, password: str = None,
+                        discover: bool = True) -> List[int]:
+        """
+        Replace the wallet with an HD wallet from a mnemonic, encrypted
+        right away when a password is given. With discover, accounts
+        that were ever used are found. Blocking; returns the known
+        account indexes.
+        """
+        from eth_account.hdaccount import Mnemonic
+        
+        words = " ".join(mnemonic.lower().split())
+        if not Mnemonic("english").is_mnemonic_valid(words):
+            raise WalletError("Invalid mnemonic")
+        keyring = HDKeyring(words)
+        self._replace_wallet(keyring, password)
+        if discover:
             try:
-                os.chmod(self._wallet_file, 0o600)
-            except:
-                pass  # Windows doesn't support Unix permissions
+                self.discover_accounts()
+            except Exception as e:
+                print(f"⚠️ Account discovery failed: {e}")
+        self._notify()
+        return sorted(self._addresses)
+    
+    def import_private_key(self, private_key: str, password: str = None) -> str:
+        """Replace the wallet with a single-key wallet (encrypted if a password is given)"""
+        account = _account_class().from_key(private_key)
+        self._replace_wallet(account, password)
+        self._notify()
+        return account.address
+    
+    def _replace_wallet(self, unlocked, password: Optional[str]) -> None:
+        # Encrypt before touching the file, so plaintext never hits disk
+        keystore = self._encrypt(unlocked, password) if password else None
+        with self._account_lock:
+            self.session.lock()
+            if isinstance(unlocked, HDKeyring):
+                self._use_keyring(unlocked)
+            else:
+                self._use_key(unlocked)
+            self._account_loaded = True
+            if keystore is not None:
+                self._keystore = keystore
+                self._keyring, self._account = None, None
+                self.session.open(unlocked)
+            self._save()
+    
+    def discover_accounts(self, gap_limit: int = GAP_LIMIT, network: str = None) -> List[int]:
+        """
+        Gap-limit scan: derive indexes a window of `gap_limit` at a time
+        in a worker pool and check each window's nonces and balances in
+        one batched request, until `gap_limit` unused indexes in a row.
+        The next window is derived while the current one is on the wire.
+        Used indexes are added to the known accounts; returns them.
+        """
+        self._ensure_account()
+        if not self._is_hd:
+            return [0]
+        keyring = self._unlocked()
+        if keyring is None:
+            raise WalletError("Wallet is locked")
+        w3 = self._provider_for(network or self._current_network)
+        if self._derive_pool is None:
+            self._derive_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vanta-derive")
+        
+        futures: Dict[int, Future] = {}
+        
+        def derive(indexes):
+            for i in indexes:
+                if i not in futures:
+                    futures[i] = self._derive_pool.submit(keyring.account, i)
+        
+        used: List[int] = []
+        last_used = -1
+        start, end = 0, gap_limit
+        derive(range(start, end))
+        while start < end:
+            accounts = [futures[i].result() for i in range(start, end)]
+            # Speculative: most scans need at least one more window
+            derive(range(end, end + gap_limit))
+            calls = []
+            for account in accounts:
+                calls.append(("eth_getTransactionCount", [account.address, "latest"]))
+                calls.append(("eth_getBalance", [account.address, "latest"]))
+            results = w3.provider.batch(calls)
+            for offset in range(len(accounts)):
+                nonce, balance = results[2 * offset], results[2 * offset + 1]
+                if int(nonce, 16) or int(balance, 16):
+                    used.append(start + offset)
+                    last_used = start + offset
+            start, end = end, last_used + 1 + gap_limit
+            derive(range(start, end))
+        for future in futures.values():
+            future.cancel()  # speculative window nobody needs
+        
+        with self._account_lock:
+            for index in used:
+                self._addresses[index] = keyring.account(index).address
+            self._save()
+        print(f"🔎 Found {len(used)} used account(s)")
+        return used
     
     def _connect_web3(self) -> None:
         """Connect to blockchain"""
@@ -136,25 +635,52 @@ class WalletManager:
             return
         
         try:
-            config = NETWORKS[self._current_network]
-            self._web3 = Web3(Web3.HTTPProvider(config.rpc_url, request_kwargs={'timeout': 10}))
-            
-            if self._web3.is_connected():
-                print(f"✅ Connected to {config.name}")
-            else:
-                print(f"⚠️ Connection failed to {config.name}")
-                self._web3 = None
+            # No probe: an unreachable node fails over (or errors) on the
+            # first real call, as after set_network
+            self._web3 = self._provider_for(self._current_network)
+            print(f"✅ Using {NETWORKS[self._current_network].name}")
         except Exception as e:
             print(f"❌ Web3 error: {e}")
             self._web3 = None
     
+    def _provider_for(self, network: str) -> Web3:
+        """Kept for the app's lifetime, so switching back is a pointer swap"""
+        w3 = self._providers.get(network)
+        if w3 is None:
+            from web3 import Web3
+            from rpc import RoutedHTTPProvider
+            
+            if self._session is None:
+                self._session = pooled_session()
+            config = NETWORKS[network]
+            w3 = Web3(RoutedHTTPProvider(config.rpc_urls, session=self._session))
+            self._providers[network] = w3
+        return w3
+    
+    def get_web3_for(self, network: str) -> Web3:
+        """Provider of any network, without switching or probing"""
+        return self._provider_for(network)
+    
+    def _current_web3(self) -> Optional[Web3]:
+        """Current provider, built on first use; never probes the node"""
+        if self._web3 is None:
+            self._connect_web3()
+        return self._web3
+    
     @property
     def address(self) -> str:
-        return self._account.address if self._account else ""
+        """Current address; known even while the wallet is locked"""
+        if not self._account_loaded:
+            self._ensure_account()
+        return self._address
     
     @property
     def account(self) -> Optional[LocalAccount]:
-        return self._account
+        """Signing account; None while locked. Each use keeps the session alive."""
+        unlocked = self._unlocked()
+        if isinstance(unlocked, HDKeyring):
+            return unlocked.account(self._account_index)
+        return unlocked
     
     @property
     def is_connected(self) -> bool:
@@ -167,60 +693,102 @@ class WalletManager:
     def get_network_config(self) -> NetworkConfig:
         return NETWORKS[self._current_network]
     
+    def get_chain_id(self) -> int:
+        return NETWORKS[self._current_network].chain_id
+    
     def set_network(self, network: str) -> bool:
-        """Switch network with validation"""
+        """Switch network: a pointer swap to its cached provider, no probe"""
         if network not in NETWORKS:
             print(f"❌ Unknown network: {network}")
             return False
         
-        old_network = self._current_network
         self._current_network = network
-        self._connect_web3()
-        
-        if self.is_connected or network == old_network:
-            self._notify()
-            print(f"🌐 Switched to {NETWORKS[network].name}")
-            return True
-        
-        # Revert on failure
-        self._current_network = old_network
-        self._connect_web3()
-        return False
+        # A dead node shows up (and fails over) on the first real call
+        self._web3 = self._provider_for(network) if WEB3_AVAILABLE else None
+        self._notify()
+        print(f"🌐 Switched to {NETWORKS[network].name}")
+        return True
     
     def get_balance(self) -> float:
         """Get balance in native token"""
-        if not self.is_connected or not self._account:
+        # No is_connected probe first: a failed call costs the same round trip
+        w3 = self._current_web3()
+        if w3 is None or not self.address:
             return 0.0
         
         try:
-            balance_wei = self._web3.eth.get_balance(self.address)
-            return float(self._web3.from_wei(balance_wei, 'ether'))
+            balance_wei = w3.eth.get_balance(self.address)
+            return float(w3.from_wei(balance_wei, 'ether'))
         except Exception as e:
             print(f"Balance error: {e}")
             return 0.0
     
     def get_web3(self) -> Optional[Web3]:
-        """Get Web3 instance (may be None)"""
-        if not self.is_connected:
-            self._connect_web3()
-        return self._web3
+        """Get Web3 instance (may be None); no probe, the first real call fails over"""
+        return self._current_web3()
     
-    def get_transaction_count(self) -> int:
-        """Get nonce for transactions"""
-        if not self.is_connected:
-            return 0
+    def get_transaction_count(self, block_identifier: str = "pending") -> Optional[int]:
+        """Get nonce for transactions (None if the node can't be reached)"""
+        w3 = self._current_web3()
+        if w3 is None:
+            return None
         try:
-            return self._web3.eth.get_transaction_count(self.address)
-        except:
-            return 0
+            return w3.eth.get_transaction_count(self.address, block_identifier)
+        except Exception as e:
+            print(f"Nonce error: {e}")
+            return None
+    
+    def get_account_state(self, network: str = None, address: str = None) -> Dict:
+        """
+        Balance, pending nonce and block number of `address` (default: the
+        current one) on one network in a single batched request. Raises on
+        RPC failure.
+        """
+        network = network or self._current_network
+        address = address or self.address
+        w3 = self._provider_for(network)
+        balance, nonce, block = w3.provider.batch([
+            ("eth_getBalance", [address, "latest"]),
+            ("eth_getTransactionCount", [address, "pending"]),
+            ("eth_blockNumber", []),
+        ])
+        return {
+            "network": network,
+            "address": address,
+            "balance": float(w3.from_wei(int(balance, 16), 'ether')),
+            "nonce": int(nonce, 16),
+            "block": int(block, 16),
+            "symbol": NETWORKS[network].symbol,
+        }
+    
+    def get_portfolio(self) -> Dict[str, Dict]:
+        """
+        get_account_state() for every network in NETWORKS, all at once:
+        one round trip per network, run in parallel. Networks that fail
+        map to {"error": ...}.
+        """
+        if not WEB3_AVAILABLE or not self.address:
+            return {}
+        
+        def fetch(network: str) -> Dict:
+            try:
+                return self.get_account_state(network)
+            except Exception as e:
+                return {"network": network, "error": str(e)}
+        
+        with ThreadPoolExecutor(max_workers=len(NETWORKS), thread_name_prefix="vanta-portfolio") as pool:
+            return {state["network"]: state for state in pool.map(fetch, NETWORKS)}
     
     def sign_transaction(self, tx_dict: dict) -> Optional[bytes]:
         """Sign transaction with private key"""
-        if not self._account:
+        account = self.account
+        if not account:
+            if self.is_locked:
+                print("🔒 Wallet locked: unlock to sign")
             return None
         
         try:
-            signed = self._account.sign_transaction(tx_dict)
+            signed = account.sign_transaction(tx_dict)
             return signed.rawTransaction
         except Exception as e:
             print(f"Signing error: {e}")
@@ -228,25 +796,30 @@ class WalletManager:
     
     def send_transaction(self, signed_tx: bytes) -> Optional[str]:
         """Send signed transaction"""
-        if not self.is_connected or not signed_tx:
+        w3 = self._current_web3()
+        if w3 is None or not signed_tx:
             return None
         
         try:
-            tx_hash = self._web3.eth.send_raw_transaction(signed_tx)
+            tx_hash = w3.eth.send_raw_transaction(signed_tx)
             return tx_hash.hex()
         except Exception as e:
             print(f"Send error: {e}")
             return None
     
     def wait_for_receipt(self, tx_hash: str, timeout: int = 120):
-        """Wait for transaction confirmation"""
-        if not self.is_connected:
+        """Wait for transaction confirmation (checked with every other pending hash, once per block)"""
+        if self._current_web3() is None:
             return None
         
+        from receipt_tracker import get_receipt_tracker
+        tracker = get_receipt_tracker(self)
+        future = tracker.track(tx_hash, self._current_network)
         try:
-            return self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+            return future.result(timeout=timeout)
         except Exception as e:
-            print(f"Wait error: {e}")
+            tracker.untrack(tx_hash, future)
+            print(f"Wait error: {e or type(e).__name__}")
             return None
     
     def get_short_address(self, chars: int = 6) -> str:
@@ -262,7 +835,8 @@ class WalletManager:
             return address.startswith("0x") and len(address) == 42
         
         try:
-            return self._web3.is_address(address)
+            from web3 import Web3
+            return Web3.is_address(address)
         except:
             return False
 